@@ -0,0 +1,115 @@
+# benchmarks/connection_bench.py - Open-per-query vs pooled connection throughput
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import config
+from database.connection import DatabaseConnection, close_all
+from database.setup import create_tables
+from core.inventory import InventoryManager
+from core.checkout import CheckoutManager
+
+SAMPLE_CSV = config.DATA_DIR / 'imports' / 'tallerdatabase1.csv'
+
+
+class PerQueryConnection(DatabaseConnection):
+    """The old behaviour: a fresh sqlite3 connection (and commit) per statement"""
+
+    @contextmanager
+    def get_connection(self):
+        conn = sqlite3.connect(str(self.db_path))
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self, immediate=False):
+        yield None
+
+    def execute(self, query, params=()):
+        with self.get_connection() as conn:
+            cursor = conn.execute(query, params)
+            conn.commit()
+            return cursor
+
+    def executemany(self, query, seq_of_params):
+        with self.get_connection() as conn:
+            cursor = conn.executemany(query, seq_of_params)
+            conn.commit()
+            return cursor
+
+    def fetchall(self, query, params=()):
+        with self.get_connection() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def fetchone(self, query, params=()):
+        with self.get_connection() as conn:
+            return conn.execute(query, params).fetchone()
+
+
+def ops_per_sec(func, seconds):
+    """Call func repeatedly for about `seconds` and return calls per second"""
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        func()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def run(db_class, seconds):
+    """Measure checkout+checkin, search and summary with the given connection class"""
+    inventory = InventoryManager()
+    checkout = CheckoutManager()
+    inventory.db = db_class()
+    checkout.db = db_class()
+
+    item = inventory.search_items("combinacion")[0]
+
+    def checkout_cycle():
+        checkout.checkout_item(item['id'], 'Juan Pérez', 1, 'field', 'BENCH')
+        checkout.checkin_item(item['id'], employee_name='Juan Pérez')
+
+    return {
+        'checkout+checkin': ops_per_sec(checkout_cycle, seconds),
+        'search': ops_per_sec(lambda: inventory.search_items("llave"), seconds),
+        'summary': ops_per_sec(inventory.get_summary, seconds),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-query and pooled connections')
+    parser.add_argument('--seconds', type=float, default=2.0,
+                        help='time spent on each operation')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Point the standard database at a scratch copy
+        config.DATABASE_CONFIG['standard']['path'] = Path(tmp) / 'bench.db'
+        db = DatabaseConnection()
+        create_tables(db)
+        InventoryManager().import_csv(SAMPLE_CSV)
+
+        before = run(PerQueryConnection, args.seconds)
+        after = run(DatabaseConnection, args.seconds)
+        close_all()
+
+    print(f"\n{'Operation':<18} {'Before ops/s':>14} {'After ops/s':>14} {'Speedup':>9}")
+    print("-" * 58)
+    for name in before:
+        print(f"{name:<18} {before[name]:>14.0f} {after[name]:>14.0f} "
+              f"{after[name] / before[name]:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# benchmarks/generator.py - Deterministic workshop-scale test data
+import argparse
+import csv
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.text import normalize_name
+
+# (tool, equipment type, size family)
+TOOLS = [
+    ('Llave Combinación', 'Herramienta Manual', 'mm'),
+    ('Llave Española', 'Herramienta Manual', 'mm'),
+    ('Llave de Tubo', 'Herramienta Manual', 'mm'),
+    ('Llave Allen', 'Herramienta Manual', 'mm'),
+    ('Llave Perica', 'Herramienta Manual', 'in'),
+    ('Dado Hexagonal', 'Herramienta Manual', 'mm'),
+    ('Destornillador Plano', 'Herramienta Manual', 'in'),
+    ('Destornillador Phillips', 'Herramienta Manual', 'phillips'),
+    ('Martillo de Bola', 'Herramienta Manual', 'oz'),
+    ('Martillo de Uña', 'Herramienta Manual', 'oz'),
+    ('Pinza de Presión', 'Herramienta Manual', 'in'),
+    ('Pinza de Corte', 'Herramienta Manual', 'in'),
+    ('Pinza Pelacables', 'Eléctrica', 'in'),
+    ('Multímetro Digital', 'Eléctrica', None),
+    ('Pinza Amperimétrica', 'Eléctrica', None),
+    ('Taladro Percutor', 'Herramienta Eléctrica', 'w'),
+    ('Esmeriladora Angular', 'Herramienta Eléctrica', 'w'),
+    ('Sierra Circular', 'Herramienta Eléctrica', 'w'),
+    ('Rotomartillo', 'Herramienta Eléctrica', 'w'),
+    ('Broca para Concreto', 'Consumible', 'mm'),
+    ('Broca para Metal', 'Consumible', 'mm'),
+    ('Disco de Corte', 'Consumible', 'in'),
+    ('Flexómetro', 'Medición', 'm'),
+    ('Nivel de Burbuja', 'Medición', 'cm'),
+    ('Calibrador Vernier', 'Medición', 'mm'),
+    ('Torquímetro', 'Herramienta Manual', 'nm'),
+    ('Gato Hidráulico', 'Equipo de Taller', 't'),
+    ('Extractor de Poleas', 'Equipo de Taller', 'in'),
+    ('Careta para Soldar', 'Seguridad', None),
+    ('Guantes de Carnaza', 'Seguridad', None),
+    ('Lentes de Seguridad', 'Seguridad', None),
+    ('Arnés de Seguridad', 'Seguridad', None),
+]
+
+SIZES = {
+    'mm': [f"{n} mm" for n in (6, 8, 10, 12, 13, 14, 17, 19, 21, 24, 27, 30, 32)],
+    'in': ['1/4"', '3/8"', '1/2"', '5/8"', '3/4"', '6"', '8"', '10"', '12"'],
+    'phillips': ['PH0', 'PH1', 'PH2', 'PH3'],
+    'oz': ['8 oz', '16 oz', '20 oz', '24 oz'],
+    'w': ['500 W', '750 W', '900 W', '1200 W', '2000 W'],
+    'm': ['3 m', '5 m', '8 m', '10 m'],
+    'cm': ['30 cm', '60 cm', '120 cm'],
+    'nm': ['40 Nm', '200 Nm', '350 Nm'],
+    't': ['2 t', '3 t', '12 t', '20 t'],
+}
+
+BRANDS = ['Truper', 'Surtek', 'Urrea', 'Pretul', 'Stanley', 'Bosch', 'Makita',
+          'DeWalt', 'Milwaukee', 'Knipex', 'Bahco', 'Fluke', 'Santul', 'Foy']
+
+NOTES = ['', '', '', '', 'Revisar estado', 'Uso exclusivo taller', 'Calibrado 2023',
+         'Falta estuche', 'Préstamo con autorización']
+
+FIRST_NAMES = ['Juan', 'María', 'Carlos', 'Ana', 'Luis', 'José', 'Laura', 'Pedro',
+               'Sofía', 'Miguel', 'Lucía', 'Jorge', 'Elena', 'Andrés', 'Patricia',
+               'Fernando', 'Gabriela', 'Ricardo', 'Verónica', 'Raúl']
+LAST_NAMES = ['Pérez', 'García', 'López', 'Martínez', 'Hernández', 'González',
+              'Rodríguez', 'Sánchez', 'Ramírez', 'Torres', 'Flores', 'Rivera',
+              'Gómez', 'Díaz', 'Morales', 'Castillo', 'Ortiz', 'Ruiz', 'Núñez', 'Vargas']
+DEPARTMENTS = ['Mecánica', 'Eléctrica', 'Mantenimiento', 'Producción', 'Soldadura', 'Almacén']
+LOCATIONS = ['field', 'taller', 'planta 1', 'planta 2', 'obra norte', 'obra sur']
+
+# Histories end here, so the same seed always gives the same dates
+HISTORY_END = datetime(2025, 1, 1, 18, 0, 0)
+
+
+class WorkshopDataGenerator:
+    """Reproducible catalogs, employees and checkout histories.
+
+    Everything comes from one seeded random.Random, so the same seed and
+    sizes give byte-identical CSVs and identical databases on any machine.
+    """
+
+    def __init__(self, seed=42):
+        self.seed = seed
+        self.random = random.Random(seed)
+
+    def catalog_rows(self, count):
+        """Yield `count` CSV rows: Catalog ID, Item Name, Equipment, Brand, Stock, Notes"""
+        rng = self.random
+        for n in range(count):
+            tool, equipment, family = rng.choice(TOOLS)
+            name = f"{tool} {rng.choice(SIZES[family])}" if family else tool
+            # About one in twenty rows has no Catalog ID (matched on name+brand)
+            catalog_id = f"{rng.choice('ABCDEFGHJKLMNPRSTUVWXYZ')}{n:07d}" if rng.random() > 0.05 else ''
+            stock = rng.choice((0, 1, 1, 1, 2, 2, 3, 4, 5, 6, 10, 12, 20, 50))
+            yield [catalog_id, name, equipment, rng.choice(BRANDS), stock, rng.choice(NOTES)]
+
+    def write_catalog(self, path, count):
+        """Write a catalog CSV in the import format and return its path"""
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['Catalog ID', 'Item Name', 'Equipment', 'Brand', 'Stock', 'Notes'])
+            writer.writerows(self.catalog_rows(count))
+        return path
+
+    def employees(self, count):
+        """`count` (employee_name, badge, department) tuples with unique names"""
+        rng = self.random
+        people = []
+        seen = set()
+        while len(people) < count:
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+            if name in seen:
+                name = f"{name} {len(people)}"
+            seen.add(name)
+            people.append((name, f"EMP{len(people) + 100:05d}", rng.choice(DEPARTMENTS)))
+        return people
+
+    def load_employees(self, db, count):
+        """Insert generated employees; returns their ids"""
+        with db.transaction(immediate=True):
+            db.executemany(
+                "INSERT OR IGNORE INTO employees (employee_name, employee_id, department, name_key) "
+                "VALUES (?, ?, ?, ?)",
+                [(name, badge, dept, normalize_name(name)) for name, badge, dept in self.employees(count)]
+            )
+            return [row['id'] for row in db.fetchall("SELECT id FROM employees ORDER BY id")]
+
+    def load_history(self, db, years=3, per_day=50, active=500):
+        """Insert `years` of returned checkouts plus `active` still-open ones.
+
+        Open checkouts take stock from `available`, as a real checkout would.
+        Returns (returned_count, active_count).
+        """
+        rng = self.random
+        employee_ids = [row['id'] for row in db.fetchall("SELECT id FROM employees")]
+        max_item = db.fetchone("SELECT IFNULL(MAX(id), 0) AS id FROM inventory")['id']
+        if not employee_ids or not max_item:
+            raise ValueError("load a catalog and employees first")
+
+        start = HISTORY_END - timedelta(days=365 * years)
+        returned = []
+        day = start
+        while day < HISTORY_END - timedelta(days=1):
+            for _ in range(per_day):
+                taken = day + timedelta(minutes=rng.randrange(7 * 60, 18 * 60))
+                back = taken + timedelta(hours=rng.choice((2, 4, 8, 24, 48, 72, 168)))
+                returned.append((
+                    rng.randint(1, max_item), rng.choice(employee_ids), rng.choice((1, 1, 1, 2, 3)),
+                    taken.strftime('%Y-%m-%d %H:%M:%S'), back.strftime('%Y-%m-%d %H:%M:%S'),
+                    rng.choice(LOCATIONS), f"OT-{rng.randrange(100000):05d}"
+                ))
+            day += timedelta(days=1)
+
+        with db.transaction(immediate=True):
+            db.executemany('''
+                INSERT INTO checkouts
+                (item_id, employee_id, quantity, checkout_date, actual_return, location,
+                 order_number, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 'returned')
+            ''', returned)
+
+            opened = 0
+            attempts = 0
+            while opened < active and attempts < active * 20:
+                attempts += 1
+                item_id = rng.randint(1, max_item)
+                taken = HISTORY_END - timedelta(minutes=rng.randrange(60, 60 * 24 * 30))
+                reserved = db.fetchall(
+                    "UPDATE inventory SET available = available - 1 "
+                    "WHERE id = ? AND available >= 1 RETURNING id",
+                    (item_id,)
+                )
+                if not reserved:
+                    continue
+                db.execute('''
+                    INSERT INTO checkouts
+                    (item_id, employee_id, quantity, outstanding, checkout_date, location,
+                     order_number, status)
+                    VALUES (?, ?, 1, 1, ?, ?, ?, 'active')
+                ''', (item_id, rng.choice(employee_ids), taken.strftime('%Y-%m-%d %H:%M:%S'),
+                      rng.choice(LOCATIONS), f"OT-{rng.randrange(100000):05d}"))
+                opened += 1
+
+        return len(returned), opened
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic catalog CSV')
+    parser.add_argument('output', help='CSV file to write')
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    WorkshopDataGenerator(args.seed).write_catalog(args.output, args.items)
+    print(f"Wrote {args.items} items to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/llm_latency.py - Per-phase latency of the natural-language pipeline
+import argparse
+import io
+import sys
+from contextlib import redirect_stdout
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import config
+from database.connection import DatabaseConnection, close_all
+from database.setup import create_tables
+from core.inventory import InventoryManager
+from benchmarks import lm_stub_server
+
+SAMPLE_CSV = config.DATA_DIR / 'imports' / 'tallerdatabase1.csv'
+
+
+def run(single_call, questions, rounds):
+    """Ask each question `rounds` times (cache off) and return LLMManager timings"""
+    from llm.langchain_integration import LLMManager
+
+    config.LLM_CONFIG['single_call'] = single_call
+    llm = LLMManager()
+    llm.sql_cache = None  # measure the model path, not the cache
+    for _ in range(rounds):
+        for question in questions:
+            llm.process_command(question)
+    return llm.timing_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Two-call vs single-call LLM latency')
+    parser.add_argument('--delay', type=float, default=0.05,
+                        help='simulated model time per completion, in seconds')
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+
+    # Questions no FastPath rule answers, so every round reaches the model
+    questions = ["which tools cost the most", "which department borrows the most drills"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATABASE_CONFIG['standard']['path'] = Path(tmp) / 'bench.db'
+        config.LLM_CONFIG['cache']['path'] = Path(tmp) / 'llm_cache.db'
+        create_tables(DatabaseConnection())
+        InventoryManager().import_csv(SAMPLE_CSV)
+
+        server, url = lm_stub_server.start(delay=args.delay)
+        config.LLM_CONFIG['lm_studio']['url'] = url
+
+        results = {}
+        for label, single_call in (('two calls', False), ('single call', True)):
+            before = lm_stub_server.StubHandler.connections_opened
+            # Keep the pipeline's "Generated SQL" lines out of the report
+            with redirect_stdout(io.StringIO()):
+                results[label] = run(single_call, questions, args.rounds)
+            results[label]['tcp connections'] = (
+                lm_stub_server.StubHandler.connections_opened - before, 0.0
+            )
+
+        server.shutdown()
+        close_all()
+
+    for label, timings in results.items():
+        if 'llm' not in timings:
+            print(f"⚠️ {label}: no question reached the model; pick ones the local rules don't answer")
+
+    for label, timings in results.items():
+        print(f"\n{label}:")
+        for phase, (calls, avg_ms) in sorted(timings.items()):
+            if phase == 'tcp connections':
+                print(f"  {phase:<16} {calls}")
+            else:
+                print(f"  {phase:<16} {calls:>5} calls  {avg_ms:>8.2f} ms avg")
+
+
+if __name__ == "__main__":
+    main()
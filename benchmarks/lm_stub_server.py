@@ -0,0 +1,86 @@
+# benchmarks/lm_stub_server.py - Minimal LM Studio stand-in for local testing
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_SQL = "SELECT item_name, available FROM inventory WHERE available <= 2 LIMIT 5"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers /v1/models and /v1/completions like LM Studio, instantly or with a delay.
+
+    Single-call prompts get {"intent": "QUERY", "sql": CANNED_SQL} unless
+    `answers` maps the user input to another completion text.
+    """
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real server
+    delay = 0.0
+    answers = {}
+    requests_served = 0
+    connections_opened = 0
+
+    def setup(self):
+        super().setup()
+        type(self).connections_opened += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/v1/models':
+            self._reply({'data': [{'id': 'stub-model'}]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        type(self).requests_served += 1
+        time.sleep(self.delay)
+
+        prompt = request.get('prompt', '')
+        if prompt.endswith('JSON:'):
+            user_input = prompt.rsplit('User input: ', 1)[-1][:-len('\nJSON:')]
+            text = self.answers.get(user_input) or json.dumps({'intent': 'QUERY', 'sql': CANNED_SQL})
+        elif prompt.endswith('Category:'):
+            text = ' QUERY'
+        else:
+            text = ' ' + CANNED_SQL
+        self._reply({'choices': [{'text': text}]})
+
+
+def start(port=0, delay=0.0):
+    """Run the stub in a background thread; returns (server, base_url)"""
+    StubHandler.delay = delay
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake LM Studio completions server')
+    parser.add_argument('--port', type=int, default=1234)
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='seconds to wait before each completion (simulated model time)')
+    args = parser.parse_args()
+
+    server, url = start(args.port, args.delay)
+    print(f"Stub LM Studio listening on {url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
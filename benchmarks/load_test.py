@@ -0,0 +1,140 @@
+# benchmarks/load_test.py - Load test for the JSON service (main.py --serve)
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import SERVER_CONFIG
+
+SEARCH_TERMS = ['llave', 'martillo', 'destornillador', 'surtek', 'truper', 'pinza', 'mm']
+
+# (name, weight): roughly a workshop's mix of lookups and checkouts
+MIX = [('search', 60), ('summary', 10), ('active', 10), ('checkout+checkin', 20)]
+
+
+class Client:
+    """One keep-alive HTTP/1.1 connection"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        self.writer.write((
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        ).encode('latin-1') + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+
+async def worker(client, deadline, item_ids, latencies, outcomes):
+    names = [name for name, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    while time.perf_counter() < deadline:
+        name = random.choices(names, weights)[0]
+        start = time.perf_counter()
+        if name == 'search':
+            status, _ = await client.request('GET', f"/search?q={random.choice(SEARCH_TERMS)}")
+        elif name == 'summary':
+            status, _ = await client.request('GET', "/summary")
+        elif name == 'active':
+            status, _ = await client.request('GET', "/active?page_size=25")
+        else:
+            item_id = random.choice(item_ids)
+            status, _ = await client.request('POST', "/checkout", {
+                'employee': 'Load Test', 'lines': [{'item_id': item_id, 'quantity': 1}]
+            })
+            if status == 200:
+                status, _ = await client.request('POST', "/checkin", {'item_id': item_id})
+        latencies.setdefault(name, []).append(time.perf_counter() - start)
+        outcomes[status] = outcomes.get(status, 0) + 1
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run(host, port, concurrency, duration):
+    probe = Client(host, port)
+    _, page = await probe.request('GET', "/search?page_size=500")
+    probe.close()
+    item_ids = [item['id'] for item in page['items']] or [1]
+
+    latencies = {}
+    outcomes = {}
+    clients = [Client(host, port) for _ in range(concurrency)]
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        worker(client, deadline, item_ids, latencies, outcomes) for client in clients
+    ))
+    elapsed = time.perf_counter() - started
+
+    stats_client = Client(host, port)
+    _, server_stats = await stats_client.request('GET', "/stats")
+    stats_client.close()
+    for client in clients:
+        client.close()
+    return latencies, outcomes, elapsed, server_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test a running main.py --serve')
+    parser.add_argument('--host', default=SERVER_CONFIG['host'])
+    parser.add_argument('--port', type=int, default=SERVER_CONFIG['port'])
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds')
+    args = parser.parse_args()
+
+    latencies, outcomes, elapsed, server_stats = asyncio.run(
+        run(args.host, args.port, args.concurrency, args.duration)
+    )
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"\n{args.concurrency} clients for {elapsed:.1f}s: "
+          f"{total} operations, {total / elapsed:.0f} ops/sec")
+    print(f"\n{'operation':<18} {'count':>7} {'p50 ms':>9} {'p99 ms':>9}")
+    everything = []
+    for name, values in sorted(latencies.items()):
+        everything += values
+        print(f"{name:<18} {len(values):>7} {percentile(values, 0.50) * 1000:>9.2f} "
+              f"{percentile(values, 0.99) * 1000:>9.2f}")
+    if everything:
+        print(f"{'all':<18} {len(everything):>7} {percentile(everything, 0.50) * 1000:>9.2f} "
+              f"{percentile(everything, 0.99) * 1000:>9.2f}")
+
+    print(f"\nHTTP statuses: {dict(sorted(outcomes.items()))}")
+    writer = server_stats['writer']
+    print(f"Writer: {writer['writes']} writes in {writer['commits']} commits "
+          f"(avg {writer['average_batch']:.1f}, max {writer['largest_batch']} per commit)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+# benchmarks/suite.py - Repeatable benchmarks with JSON results and regression checks
+import argparse
+import itertools
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import config
+from database.connection import DatabaseConnection, close_all
+from database.instrumentation import query_stats
+from database.setup import create_tables
+from core.inventory import InventoryManager
+from core.checkout import CheckoutManager
+from core.importer import CatalogImporter
+from benchmarks.generator import WorkshopDataGenerator
+
+SEARCH_TERMS = ['llave', 'llave combinacion 13', 'truper', 'broca concreto',
+                'multimetro', 'martillo 16 oz', 'seguridad', 'xyzzy']
+# Misspelled searches answered by the trigram index
+TYPO_TERMS = ['llave combinasion 17', 'surtec', 'destornilador philips', 'martiyo bola',
+              'multimetro fluk', 'esmeriladora angualr']
+
+# Allowed slowdown before a metric counts as a regression (0.15 = 15%)
+DEFAULT_THRESHOLD = 0.15
+THRESHOLDS = {
+    # Single-digit-millisecond timings and tails are noisy on shared machines
+    'active_checkouts_ms': 0.30,
+    'summary_ops': 0.30,
+    'search_p95_ms': 0.30,
+    'checkout_checkin_p95_ms': 0.30,
+    # Measures the generator's bulk insert more than the application
+    'history_rows_per_sec': 0.30,
+}
+
+
+def metric(value, unit, better):
+    return {'value': round(value, 3), 'unit': unit, 'better': better}
+
+
+def timed_ops(func, seconds):
+    """Call func repeatedly for about `seconds`; returns per-call latencies"""
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_suite(workdir, items, employees, years, per_day, active, seed, seconds):
+    """Build a generated database in workdir and measure every operation"""
+    config.DATABASE_CONFIG['standard']['path'] = Path(workdir) / 'bench.db'
+    query_stats.slow_log = Path(workdir) / 'slow_queries.log'
+    generator = WorkshopDataGenerator(seed)
+    catalog = generator.write_catalog(Path(workdir) / 'catalog.csv', items)
+
+    db = DatabaseConnection()
+    create_tables(db)
+    inventory = InventoryManager()
+    checkout = CheckoutManager()
+    results = {}
+
+    # Import: a cold load, then the same file again (all updates)
+    for label in ('import_items_per_sec', 'reimport_items_per_sec'):
+        start = time.perf_counter()
+        summary = CatalogImporter().import_file(catalog)
+        results[label] = metric(summary['processed'] / (time.perf_counter() - start),
+                                'items/s', 'higher')
+
+    generator.load_employees(db, employees)
+    start = time.perf_counter()
+    returned, opened = generator.load_history(db, years, per_day, active)
+    results['history_rows_per_sec'] = metric(
+        (returned + opened) / (time.perf_counter() - start), 'rows/s', 'higher'
+    )
+
+    # Search: a fixed rotation of terms, first page as the CLI shows it
+    terms = itertools.cycle(SEARCH_TERMS)
+    latencies = timed_ops(lambda: inventory.search_page(next(terms)), seconds)
+    results['search_ops'] = metric(len(latencies) / sum(latencies), 'ops/s', 'higher')
+    results['search_p95_ms'] = metric(percentile(latencies, 0.95) * 1000, 'ms', 'lower')
+
+    typos = itertools.cycle(TYPO_TERMS)
+    latencies = timed_ops(lambda: inventory.suggest_items(next(typos)), seconds)
+    results['suggest_p95_ms'] = metric(percentile(latencies, 0.95) * 1000, 'ms', 'lower')
+
+    # Checkout + check-in cycles on items that have stock
+    candidates = [row['id'] for row in db.fetchall(
+        "SELECT id FROM inventory WHERE available >= 1 ORDER BY id LIMIT 200"
+    )]
+    employee_name = generator.employees(1)[0][0]
+    cycle = itertools.cycle(candidates)
+
+    def checkout_cycle():
+        item_id = next(cycle)
+        checkout.checkout_item(item_id, employee_name, 1, 'field', 'BENCH')
+        checkout.checkin_item(item_id, employee_name=employee_name)
+
+    latencies = timed_ops(checkout_cycle, seconds)
+    results['checkout_checkin_ops'] = metric(len(latencies) / sum(latencies), 'ops/s', 'higher')
+    results['checkout_checkin_p95_ms'] = metric(percentile(latencies, 0.95) * 1000, 'ms', 'lower')
+
+    latencies = timed_ops(checkout.get_active_checkouts, seconds)
+    results['active_checkouts_ms'] = metric(statistics.median(latencies) * 1000, 'ms', 'lower')
+
+    latencies = timed_ops(inventory.get_summary, seconds)
+    results['summary_ops'] = metric(len(latencies) / sum(latencies), 'ops/s', 'higher')
+
+    close_all()
+    dataset = {
+        'items': items,
+        'employees': employees,
+        'returned_checkouts': returned,
+        'active_checkouts': opened,
+        'seed': seed
+    }
+    return dataset, results
+
+
+def current_commit():
+    """Short hash of HEAD, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=config.BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, threshold=None):
+    """Rows of (metric, old, new, change, regressed) for metrics in both runs"""
+    rows = []
+    for name, new in current['results'].items():
+        old = baseline['results'].get(name)
+        if not old or not old['value']:
+            continue
+        change = (new['value'] - old['value']) / old['value']
+        limit = threshold if threshold is not None else THRESHOLDS.get(name, DEFAULT_THRESHOLD)
+        worse = -change if new['better'] == 'higher' else change
+        rows.append((name, old['value'], new['value'], change, worse > limit))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite on generated workshop data')
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--employees', type=int, default=200)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--per-day', type=int, default=50, help='checkouts per day of history')
+    parser.add_argument('--active', type=int, default=500, help='checkouts still open')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--seconds', type=float, default=2.0, help='time per timed operation')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--compare', help='baseline results JSON to check for regressions')
+    parser.add_argument('--threshold', type=float,
+                        help=f'allowed slowdown for every metric (default {DEFAULT_THRESHOLD}, '
+                             f'looser for noisy ones)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset, results = run_suite(tmp, args.items, args.employees, args.years,
+                                     args.per_day, args.active, args.seed, args.seconds)
+
+    report = {
+        'commit': current_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'dataset': dataset,
+        'results': results
+    }
+
+    print(f"\n{'Metric':<26} {'Value':>12}  Unit")
+    print("-" * 46)
+    for name, result in results.items():
+        print(f"{name:<26} {result['value']:>12.2f}  {result['unit']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+        if baseline.get('dataset') != dataset:
+            print("\n⚠️ Baseline was measured on a different dataset; comparison is indicative only")
+
+        rows = compare(baseline, report, args.threshold)
+        print(f"\nAgainst {baseline.get('commit') or args.compare}:")
+        print(f"{'Metric':<26} {'Baseline':>12} {'Now':>12} {'Change':>9}")
+        print("-" * 62)
+        for name, old, new, change, regressed in rows:
+            flag = "  ❌ regression" if regressed else ""
+            print(f"{name:<26} {old:>12.2f} {new:>12.2f} {change:>+8.0%}{flag}")
+
+        regressions = [row for row in rows if row[4]]
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond threshold")
+            sys.exit(1)
+        print("\nNo regressions beyond threshold")
+
+
+if __name__ == "__main__":
+    main()
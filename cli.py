@@ -1,32 +1,78 @@
 # cli.py - Enhanced CLI with LLM support
+import shlex
 import sys
+import threading
+import time
 from pathlib import Path
 
 # Add current directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
+from config import FUZZY_CONFIG, PAGINATION_CONFIG, QUERY_STATS
 from core.inventory import InventoryManager
+from database.instrumentation import query_stats
 from core.checkout import CheckoutManager
+from llm.fast_path import FastPath, format_rows
+from ui.pager import page_results
+from utils.timing import StartupProfile
 
-# Try to import LLM support
-try:
-    from llm.langchain_integration import LLMManager
-    LLM_AVAILABLE = True
-except:
-    LLM_AVAILABLE = False
+def load_llm_manager():
+    """Import the LLM stack on first use; None if it isn't installed"""
+    try:
+        from llm.langchain_integration import LLMManager
+    except Exception:
+        return None
+    return LLMManager
 
 class SimpleCLI:
-    def __init__(self):
+    def __init__(self, profile=None):
+        self.profile = profile or StartupProfile(enabled=False)
         self.inventory = InventoryManager()
         self.checkout = CheckoutManager()
+        self.page_size = PAGINATION_CONFIG['page_size']
+        self.fast_path = FastPath()
+        self.federation = None  # created by the first 'federated' command
         self.llm = None
+        self.llm_notice = None
         
-        # Initialize LLM if available
-        if LLM_AVAILABLE:
-            try:
-                self.llm = LLMManager()
-            except:
-                print("⚠️ LLM initialization failed")
+        # Importing requests and probing LM Studio can take seconds, so it
+        # happens in the background; LLM mode turns on when the probe succeeds
+        self.llm_starter = threading.Thread(target=self.start_llm, daemon=True)
+        self.llm_starter.start()
+    
+    def start_llm(self):
+        """Load the LLM stack and probe LM Studio (runs on a background thread)"""
+        start = time.perf_counter()
+        LLMManager = load_llm_manager()
+        self.profile.add('llm import', time.perf_counter() - start)
+        if LLMManager is None:
+            self.llm_notice = "⚠️ LLM module not available - natural language limited to common questions"
+            return
+        
+        try:
+            start = time.perf_counter()
+            llm = LLMManager(fast_path=self.fast_path, probe=False)
+            self.profile.add('llm init', time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            llm.connected = llm.test_connection(verbose=False)
+            self.profile.add('llm probe', time.perf_counter() - start)
+        except Exception:
+            self.llm_notice = "⚠️ LLM initialization failed"
+            return
+        
+        self.llm = llm
+        if llm.connected:
+            self.llm_notice = "🤖 LLM Mode: ENABLED - connected to LM Studio"
+        else:
+            self.llm_notice = "⚠️ LM Studio not connected - start it and type 'llm' to enable natural language queries"
+    
+    def show_llm_notice(self):
+        """Print the background LLM startup result once, between commands"""
+        if self.llm_notice and not self.llm_starter.is_alive():
+            print(self.llm_notice)
+            self.llm_notice = None
+            self.profile.report_background()
     
     def run(self):
         """Run the CLI"""
@@ -37,14 +83,22 @@ class SimpleCLI:
             print("🤖 LLM Mode: ENABLED")
             print("   - Use natural language queries")
             print("   - Or prefix with 'query:' for LLM processing")
+        elif self.llm_starter.is_alive():
+            print("🤖 LLM Mode: STARTING (checking for LM Studio in the background)")
+            print("   - Common questions are answered locally meanwhile")
         else:
             print("🤖 LLM Mode: DISABLED")
             print("   - Start LM Studio to enable natural language queries")
         
         print("\nType 'help' for commands or 'exit' to quit\n")
         
+        self.profile.mark('banner')
+        self.profile.report()
+        
         while True:
             try:
+                self.show_llm_notice()
+                
                 # Show different prompt if LLM is active
                 if self.llm and self.llm.connected:
                     prompt = "🤖 >>> "
@@ -59,6 +113,8 @@ class SimpleCLI:
                 # Handle exit
                 if command.lower() in ['exit', 'quit']:
                     print("Goodbye!")
+                    if self.federation:
+                        self.federation.close()
                     break
                 
                 # Check if it's an LLM query
@@ -72,18 +128,24 @@ class SimpleCLI:
                         print()
                         continue
                     
-                    # Try natural language if it doesn't match any command
-                    command_lower = command.lower()
-                    known_commands = ['help', 'search', 'all', 'summary', 'checkout', 
-                                    'checkin', 'active', 'add', 'import']
-                    
-                    if not any(command_lower.startswith(cmd) for cmd in known_commands):
+                # Try natural language if it doesn't match any command
+                command_lower = command.lower()
+                known_commands = ['help', 'search', 'all', 'summary', 'checkout', 
+                                'checkin', 'active', 'add', 'import', 'pagesize', 'llm',
+                                'stats', 'export', 'analytics', 'archive', 'federated', 'scan']
+                
+                if not any(command_lower.startswith(cmd) for cmd in known_commands):
+                    if self.llm and self.llm.connected:
                         # Might be a natural language query
                         print("🔄 Processing natural language query...")
                         result = self.llm.process_command(command)
                         print(result)
                         print()
                         continue
+                    
+                    # No LLM: common questions still get answered locally
+                    if self.answer_locally(command):
+                        continue
                 
                 # Process regular commands
                 self.process_command(command)
@@ -110,19 +172,14 @@ class SimpleCLI:
         elif command_lower == 'summary':
             self.show_summary()
         
+        elif command_lower == 'summary check':
+            self.check_summary()
+        
         elif command_lower == 'checkout':
             self.checkout_interactive()
         
         elif command_lower.startswith('checkin'):
-            parts = command.split()
-            if len(parts) > 1:
-                try:
-                    item_id = int(parts[1])
-                    self.checkin_item(item_id)
-                except ValueError:
-                    print("Usage: checkin [item_id]")
-            else:
-                print("Usage: checkin [item_id]")
+            self.checkin_item(command.split()[1:])
         
         elif command_lower == 'active':
             self.show_active_checkouts()
@@ -132,20 +189,70 @@ class SimpleCLI:
         
         elif command_lower.startswith('import'):
             parts = command.split(maxsplit=1)
-            if len(parts) > 1:
+            if len(parts) > 1 and '--delta' in parts[1].split():
+                from core.sync import run_sync
+                run_sync(shlex.split(parts[1]))
+            elif len(parts) > 1:
                 filename = parts[1]
                 self.inventory.import_csv(filename)
             else:
-                print("Usage: import [filename.csv]")
+                print("Usage: import [filename.csv] [--delta [--discontinue-missing | --delete-missing]]")
+        
+        elif command_lower.startswith('pagesize'):
+            parts = command.split()
+            try:
+                self.page_size = max(1, int(parts[1]))
+                print(f"Page size: {self.page_size}")
+            except (IndexError, ValueError):
+                print(f"Usage: pagesize [rows] (currently {self.page_size})")
         
         elif command_lower == 'llm':
             self.toggle_llm()
         
+        elif command_lower == 'llm stats':
+            self.show_llm_stats()
+        
+        elif command_lower.startswith('stats'):
+            self.query_stats(command.split()[1:])
+        
+        elif command_lower.startswith('export'):
+            from reports.exporter import run_export
+            run_export(shlex.split(command)[1:])
+        
+        elif command_lower.startswith('analytics'):
+            from reports.analytics import run_report
+            run_report(shlex.split(command)[1:])
+        
+        elif command_lower.startswith('archive'):
+            from database.archive import run_archive
+            run_archive(command.split()[1:])
+        
+        elif command_lower.startswith('federated'):
+            self.federated(command.split(maxsplit=2)[1:])
+        
+        elif command_lower.startswith('scan'):
+            from core.scanner import run_scan
+            run_scan(command.split()[1:])
+        
         else:
             print("Unknown command. Type 'help' for commands.")
         
         print()  # Empty line for readability
     
+    def answer_locally(self, question):
+        """Answer a question with the local rules; False if none applies"""
+        local = self.fast_path.answer(question)
+        if local is None:
+            return False
+        
+        rule, results = local
+        print(f"⚡ Answered locally ({rule})")
+        print(format_rows(results) if results else "No results found.")
+        if self.fast_path.last_truncated:
+            print(f"... (first {self.fast_path.max_rows} rows only)")
+        print()
+        return True
+    
     def show_help(self):
         """Show help"""
         print("\n📋 COMMANDS:")
@@ -153,37 +260,57 @@ class SimpleCLI:
         print("  search [term] - Search for items")
         print("  all          - Show all items")
         print("  summary      - Show inventory summary")
+        print("  summary check - Verify (and repair) summary counters")
         print("  active       - Show active checkouts")
+        print("  analytics [items|employees|departments|locations|idle] [--from DATE] [--to DATE]")
+        print("               - Utilization reports (analytics refresh|rebuild updates them)")
+        print("  federated search [term]|summary|active - Same, across every warehouse database")
         
         print("\n📤 Check Out/In:")
-        print("  checkout     - Check out an item")
-        print("  checkin [id] - Return an item")
+        print("  checkout     - Check out one or more items")
+        print("  checkin [id] [qty] [employee] - Return an item (or part of it)")
+        print("  checkin #[checkout] [qty]     - Return against one checkout")
+        print("  scan [in|out] [location]      - Barcode scanner mode (badge, then Catalog IDs)")
         
         print("\n📝 Management:")
         print("  add          - Add new item")
         print("  import [file]- Import CSV file")
+        print("  import [file] --delta [--discontinue-missing|--delete-missing]")
+        print("              - Write only rows changed since the last delta import")
+        print("  export inventory|active|history [--format csv|jsonl] [--gzip]")
+        print("         [--from DATE] [--to DATE] [--since-last] [--output file]")
         
+        print("\n🤖 Questions:")
         if self.llm and self.llm.connected:
-            print("\n🤖 LLM Queries:")
             print("  query: [text]     - Force LLM processing")
-            print("  Or just type naturally:")
-            print("  - 'show all items with low stock'")
-            print("  - 'what did Juan check out?'")
-            print("  - 'items checked out to field'")
+        print("  Or just type naturally:")
+        print("  - 'show all items with low stock'")
+        print("  - 'what did Juan check out?'")
+        print("  - 'items checked out to field'")
+        if not (self.llm and self.llm.connected):
+            print("  (common questions work offline; start LM Studio for anything else)")
         
         print("\n⚙️ System:")
+        print("  pagesize [n] - Rows per page for search/all/active")
+        print("  archive [days] [--dry-run] - Move old returned checkouts to the archive")
         print("  llm          - Toggle LLM mode")
+        print("  llm stats    - Show question, cache and latency statistics")
+        print("  stats        - Slowest database statements (stats slow|reset|export [file])")
         print("  help         - Show this help")
         print("  exit         - Quit")
     
     def toggle_llm(self):
         """Toggle LLM mode"""
-        if not LLM_AVAILABLE:
-            print("LLM module not available. Check installation.")
+        if self.llm_starter.is_alive():
+            print("Still checking for LM Studio, try again in a moment")
             return
         
         if not self.llm:
-            self.llm = LLMManager()
+            LLMManager = load_llm_manager()
+            if LLMManager is None:
+                print("LLM module not available. Check installation.")
+                return
+            self.llm = LLMManager(fast_path=self.fast_path)
         
         if self.llm.connected:
             self.llm.connected = False
@@ -193,21 +320,121 @@ class SimpleCLI:
             if self.llm.connected:
                 print("🤖 LLM Mode: ENABLED")
     
-    def search_items(self, search_term):
-        """Search and display items"""
-        items = self.inventory.search_items(search_term)
+    def show_llm_stats(self):
+        """Show local-rule, SQL cache and latency statistics"""
+        local = self.fast_path.stats()
+        print("\n⚡ LOCAL ANSWERS:")
+        print(f"Questions: {local['questions']}")
+        print(f"Answered locally: {local['answered_locally']} ({local['absorbed_rate']:.0%})")
+        print(f"Escalated to the LLM: {local['escalated']}")
+        for rule, count in local['by_rule'].items():
+            print(f"  {rule:<20} {count}")
+        
+        stats = self.llm.cache_stats() if self.llm else None
+        if not stats:
+            print("LLM SQL cache not available")
+            return
         
-        if not items:
-            print("No items found")
+        print("\n🤖 LLM SQL CACHE:")
+        print(f"Cached questions: {stats['entries']} (max {stats['max_entries']})")
+        print(f"Hits this session: {stats['session_hits']}")
+        print(f"Misses this session: {stats['session_misses']}")
+        print(f"Hit rate: {stats['session_hit_rate']:.0%}")
+        print(f"Lifetime hits: {stats['lifetime_hits']}")
+        print(f"Generated SQL refused: {self.llm.guard.refused} "
+              f"(over time budget: {self.llm.guard.interrupted})")
+        
+        timings = self.llm.timing_stats()
+        if timings:
+            print("\n⏱️  AVERAGE LATENCY PER PHASE:")
+            for phase, (calls, avg_ms) in sorted(timings.items()):
+                print(f"{phase:<10} {avg_ms:>9.1f} ms  ({calls} calls)")
+    
+    def query_stats(self, args):
+        """Database statement timings: top offenders, slow log, reset, export"""
+        action = args[0].lower() if args else 'top'
+        
+        if action == 'reset':
+            query_stats.reset()
+            print("Query statistics cleared")
+            return
+        
+        if action == 'export':
+            path = args[1] if len(args) > 1 else QUERY_STATS['prometheus_file']
+            if not path:
+                print("Usage: stats export [file.prom] (or set QUERY_STATS['prometheus_file'])")
+                return
+            print(f"Metrics written to {query_stats.export_prometheus(path)}")
+            return
+        
+        if action == 'slow':
+            if not query_stats.slow_queries:
+                print(f"No statements slower than {query_stats.slow_seconds * 1000:.0f} ms")
+                return
+            print(f"\n🐢 SLOW STATEMENTS (last {len(query_stats.slow_queries)}):")
+            for entry in query_stats.slow_queries:
+                print(f"\n{entry['time']}  {entry['ms']:.1f} ms")
+                print(f"  {entry['query'][:200]}")
+                for step in entry['plan']:
+                    print(f"    plan: {step}")
+            return
+        
+        top = query_stats.top(10)
+        if not top:
+            print("No statements recorded yet")
             return
         
-        print(f"\n{'ID':<5} {'Name':<30} {'Brand':<15} {'Avail/Stock':<12}")
-        print("-" * 65)
+        print("\n⏱️  TOP STATEMENTS BY TOTAL TIME:")
+        print(f"{'count':>7} {'total ms':>10} {'avg ms':>8} {'p95 ms':>8}  statement")
+        for row in top:
+            print(f"{row['count']:>7} {row['total_ms']:>10.1f} {row['avg_ms']:>8.2f} "
+                  f"{row['p95_ms']:>8.2f}  {row['query'][:70]}")
+        opened = ", ".join(f"{name}: {count}" for name, count in query_stats.connections_opened.items())
+        print(f"\nConnections opened: {opened or 'none'}")
+        print(f"Slow statements (>{query_stats.slow_seconds * 1000:.0f} ms): {query_stats.slow_total}")
+    
+    def search_items(self, search_term):
+        """Search and display items, one page at a time"""
+        shown = []  # first few ids; fewer than min_hits and suggestions follow
+        
+        def show_page(items, page_number):
+            if len(shown) < FUZZY_CONFIG['min_hits']:
+                shown.extend(item['id'] for item in items)
+            if page_number == 1 and search_term:
+                print("\nBest matches first")
+            print(f"\n{'ID':<5} {'Name':<30} {'Brand':<15} {'Avail/Stock':<12}")
+            print("-" * 65)
+            
+            for item in items:
+                print(f"{item['id']:<5} {item['item_name'][:30]:<30} "
+                      f"{(item['brand'] or '')[:15]:<15} "
+                      f"{item['available']}/{item['stock']}")
+        
+        found = page_results(
+            lambda after: self.inventory.search_page(search_term, self.page_size, after),
+            show_page
+        )
+        if search_term and len(shown) < FUZZY_CONFIG['min_hits']:
+            self.show_suggestions(search_term, exclude=set(shown))
+        elif not found:
+            print("No items found")
+    
+    def show_suggestions(self, search_term, exclude=()):
+        """Closest typo-tolerant matches for a search that found (almost) nothing"""
+        suggestions = self.inventory.suggest_items(search_term, exclude=exclude)
+        if not suggestions:
+            if not exclude:
+                print("No items found")
+            return
         
-        for item in items:
+        print("\n🔎 Did you mean:")
+        print(f"{'ID':<5} {'Name':<30} {'Brand':<15} {'Avail/Stock':<12} {'Match':<5}")
+        print("-" * 72)
+        for item in suggestions:
             print(f"{item['id']:<5} {item['item_name'][:30]:<30} "
                   f"{(item['brand'] or '')[:15]:<15} "
-                  f"{item['available']}/{item['stock']}")
+                  f"{str(item['available']) + '/' + str(item['stock']):<12} "
+                  f"{item['similarity']:.0%}")
     
     def show_summary(self):
         """Show inventory summary"""
@@ -218,60 +445,164 @@ class SimpleCLI:
         print(f"Available: {stats['total_available']}")
         print(f"Low stock items: {stats['low_stock_items']}")
     
-    def checkout_interactive(self):
-        """Interactive checkout"""
-        # Search for item
-        search = input("Search for item: ")
-        items = self.inventory.search_items(search)
-        
-        if not items:
-            print("No items found")
+    def check_summary(self):
+        """Verify the summary counters and repair them if they drifted"""
+        consistent, differences = self.inventory.check_stats()
+        if consistent:
+            print("✅ Summary counters match the inventory")
             return
         
-        # Show items
-        for i, item in enumerate(items[:10], 1):
-            print(f"{i}. {item['item_name']} ({item['brand']}) - Available: {item['available']}")
+        print("⚠️ Summary counters out of sync:")
+        for key, (stored, actual) in differences.items():
+            print(f"   {key}: stored {stored}, actual {actual}")
+        self.inventory.rebuild_stats()
+        print("✅ Summary counters rebuilt")
+    
+    def checkout_interactive(self):
+        """Interactive checkout: build a cart, then submit it as one order"""
+        cart = []
         
-        # Select item
-        try:
-            choice = int(input(f"Select item (1-{min(10, len(items))}): "))
-            item = items[choice - 1]
-        except:
-            print("Invalid selection")
-            return
+        while True:
+            # Search for item
+            if cart:
+                search = input("Search for another item (Enter to finish): ").strip()
+                if not search:
+                    break
+            else:
+                search = input("Search for item: ")
+            items, _ = self.inventory.search_page(search, page_size=10)
+            
+            if not items:
+                print("No items found")
+                if cart:
+                    continue
+                return
+            
+            # Show items
+            for i, item in enumerate(items, 1):
+                print(f"{i}. {item['item_name']} ({item['brand']}) - Available: {item['available']}")
+            
+            # Select item
+            try:
+                choice = int(input(f"Select item (1-{len(items)}): "))
+                item = items[choice - 1]
+                quantity = int(input("Quantity (default 1): ") or "1")
+            except:
+                print("Invalid selection")
+                if cart:
+                    continue
+                return
+            
+            cart.append({'item_id': item['id'], 'quantity': quantity})
+            print(f"🛒 Added {quantity} x {item['item_name']} ({len(cart)} in cart)")
         
         # Get details
         employee = input("Employee name: ")
-        quantity = int(input("Quantity (default 1): ") or "1")
         location = input("Location (default: field): ") or "field"
         order = input("Order number: ")
         
-        # Checkout
-        success, message = self.checkout.checkout_item(
-            item['id'], employee, quantity, location, order
+        # Checkout the whole cart at once
+        success, message, results = self.checkout.checkout_order(
+            order, employee, cart, location
         )
         print(message)
+        if not success:
+            for line in results:
+                print(f"  - {line['item_name'] or line['item_id']}: {line['message']}")
     
-    def checkin_item(self, item_id):
-        """Return an item"""
-        success, message = self.checkout.checkin_item(item_id)
+    def checkin_item(self, args):
+        """checkin <item_id> [quantity] [employee]  or  checkin #<checkout_id> [quantity]"""
+        usage = "Usage: checkin [item_id] [quantity] [employee]  or  checkin #[checkout_id] [quantity]"
+        if not args:
+            print(usage)
+            return
+        
+        quantity = None
+        rest = args[1:]
+        if rest and rest[0].isdigit():
+            quantity = int(rest[0])
+            rest = rest[1:]
+        
+        try:
+            if args[0].startswith('#'):
+                success, message = self.checkout.checkin_checkout(int(args[0][1:]), quantity)
+            else:
+                success, message = self.checkout.checkin_item(
+                    int(args[0]), quantity, " ".join(rest) or None
+                )
+        except ValueError:
+            print(usage)
+            return
         print(message)
     
     def show_active_checkouts(self):
-        """Show active checkouts"""
-        checkouts = self.checkout.get_active_checkouts()
-        
-        if not checkouts:
+        """Show active checkouts, one page at a time"""
+        def show_page(checkouts, page_number):
+            print(f"\n{'ID':<5} {'Item':<25} {'Employee':<20} {'Out':<7} {'Date':<12} {'Checkout':<8}")
+            print("-" * 80)
+            
+            for co in checkouts:
+                date = co['checkout_date'][:10] if co['checkout_date'] else ''
+                out = (str(co['outstanding']) if co['outstanding'] == co['quantity']
+                       else f"{co['outstanding']}/{co['quantity']}")
+                print(f"{co['item_id']:<5} {co['item_name'][:25]:<25} "
+                      f"{co['employee_name'][:20]:<20} {out:<7} {date:<12} #{co['id']}")
+        
+        found = page_results(
+            lambda after: self.checkout.get_active_page(self.page_size, after),
+            show_page
+        )
+        if not found:
             print("No active checkouts")
+    
+    def federated(self, args):
+        """search/summary/active across every configured warehouse database"""
+        from core.federation import FederatedInventory
+        
+        action = args[0].lower() if args else ''
+        if action not in ('search', 'summary', 'active'):
+            print("Usage: federated search [term] | federated summary | federated active")
             return
         
-        print(f"\n{'ID':<5} {'Item':<25} {'Employee':<20} {'Qty':<5} {'Date':<12}")
-        print("-" * 70)
+        # One federation (and worker pool) for the whole session
+        if self.federation is None:
+            self.federation = FederatedInventory()
+        federation = self.federation
+        
+        if action == 'search':
+            items, failures = federation.search_items(args[1] if len(args) > 1 else "")
+            print(f"\n{'Warehouse':<20} {'ID':<6} {'Name':<30} {'Avail/Stock':<12}")
+            print("-" * 72)
+            for item in items:
+                print(f"{item['warehouse'][:20]:<20} {item['id']:<6} "
+                      f"{item['item_name'][:30]:<30} {item['available']}/{item['stock']}")
+            if not items:
+                print("No items found")
+        
+        elif action == 'summary':
+            summaries, failures = federation.get_summary()
+            print(f"\n{'Warehouse':<20} {'Items':>8} {'Stock':>8} {'Available':>10} {'Low':>6}")
+            print("-" * 56)
+            for warehouse, stats in summaries.items():
+                if warehouse == 'total':
+                    print("-" * 56)
+                print(f"{warehouse[:20]:<20} {stats.get('total_items', 0):>8} "
+                      f"{stats.get('total_stock', 0):>8} {stats.get('total_available', 0):>10} "
+                      f"{stats.get('low_stock_items', 0):>6}")
         
-        for co in checkouts:
-            date = co['checkout_date'][:10] if co['checkout_date'] else ''
-            print(f"{co['item_id']:<5} {co['item_name'][:25]:<25} "
-                  f"{co['employee_name'][:20]:<20} {co['quantity']:<5} {date}")
+        else:
+            checkouts, failures = federation.get_active_checkouts()
+            print(f"\n{'Warehouse':<20} {'Item':<25} {'Employee':<20} {'Out':<5} {'Date':<12}")
+            print("-" * 85)
+            for co in checkouts:
+                date = co['checkout_date'][:10] if co['checkout_date'] else ''
+                print(f"{co['warehouse'][:20]:<20} {co['item_name'][:25]:<25} "
+                      f"{co['employee_name'][:20]:<20} {co['outstanding']:<5} {date:<12}")
+            if not checkouts:
+                print("No active checkouts")
+        
+        for warehouse, reason in failures.items():
+            print(f"⚠️ {warehouse} skipped: {reason}")
     
     def add_item(self):
         """Add new item"""
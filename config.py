@@ -4,18 +4,123 @@ from pathlib import Path
 # Base paths
 BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / 'data'
-DATA_DIR.mkdir(exist_ok=True)
 
 # Database settings
 DATABASE_CONFIG = {
     'standard': {
         'path': DATA_DIR / 'inventory.db',
         'name': 'Standard Inventory'
-    }
+    },
+    # More warehouses are searched together by the 'federated' commands:
+    # 'norte': {'path': DATA_DIR / 'norte.db', 'name': 'Taller Norte'},
 }
 
 DEFAULT_DB = 'standard'
 
+# Federated reads across every DATABASE_CONFIG entry (core/federation.py)
+FEDERATION_CONFIG = {
+    'timeout': 2.0,              # seconds a warehouse gets before it is left out
+    'max_results': 100           # merged search / active rows returned
+}
+
+# SQLite connection tuning (applied once per pooled connection)
+DATABASE_SETTINGS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -20000,        # negative = KiB, so ~20 MB page cache
+    'mmap_size': 268435456,      # 256 MB memory-mapped I/O
+    'busy_timeout': 5000,        # ms to wait on a locked database
+    'cached_statements': 256     # prepared statements kept per connection
+}
+
+# Query instrumentation (timings per statement fingerprint, slow-query log)
+QUERY_STATS = {
+    'enabled': True,
+    'slow_query_ms': 100,        # statements slower than this are logged with their plan
+    'slow_log': None,            # e.g. DATA_DIR / 'slow_queries.log' to keep them as JSON lines
+    'samples': 1000,             # recent latencies kept per statement for p95
+    'trace': False,              # echo every statement SQLite runs to stderr
+    'prometheus_file': None,     # e.g. /var/lib/node_exporter/textfile/inventory.prom
+    'prometheus_interval': 15    # seconds between rewrites while --serve runs
+}
+
+# Exports (reports/exporter.py)
+EXPORT_CONFIG = {
+    'directory': DATA_DIR / 'exports',
+    'chunk_size': 5000,          # rows fetched from the cursor at a time
+    'gzip_level': 6              # 9 compresses a few % smaller at about 3x the time
+}
+
+# Archiving of returned checkouts (database/archive.py)
+ARCHIVE_CONFIG = {
+    'after_days': 365,           # returned longer ago than this moves to checkouts_archive
+    'batch_size': 2000           # rows moved per transaction
+}
+
+# CSV import settings
+IMPORT_CONFIG = {
+    'chunk_size': 10000,         # rows per executemany batch
+    'max_reported_rejects': 20   # rejected rows echoed to the console
+}
+
+# Delta catalog sync (import --delta)
+SYNC_CONFIG = {
+    'chunk_size': 5000,          # rows compared and committed per transaction
+    'missing': 'keep'            # items gone from the file: keep, discontinue or delete
+}
+
+# Inventory summary settings
+INVENTORY_CONFIG = {
+    'low_stock_threshold': 2     # items with this many or fewer available
+}
+
+# Typo-tolerant item lookup (core/fuzzy.py)
+FUZZY_CONFIG = {
+    'min_hits': 3,               # searches with fewer results also show suggestions
+    'suggestions': 10,           # suggestions returned
+    'similarity': 0.3,           # minimum trigram similarity for a corrected word
+    'alternatives': 3,           # corrections tried per misspelled word
+    'posting_limit': 1000,       # trigrams in more words than this count as noise
+    'batch_size': 5000           # changed items indexed per transaction
+}
+
+# Barcode scanner mode (core/scanner.py)
+SCAN_CONFIG = {
+    'batch_size': 50,            # scans written per transaction
+    'batch_ms': 200,             # ...or this long after the first unwritten scan
+    'checkout_code': 'OUT',      # scanned to switch to checking out (the default)
+    'checkin_code': 'IN',        # scanned to switch to returns
+    'end_code': 'END',           # leaves scan mode (so does end of input)
+    'location': 'field'
+}
+
+# Batch command mode (main.py --exec)
+BATCH_CONFIG = {
+    'batch_size': 500,           # commands per transaction
+    'batch_ms': 50,              # ...or this long after the first uncommitted one
+    'search_limit': 50           # items returned per search command
+}
+
+# Keyset pagination of item and checkout listings
+PAGINATION_CONFIG = {
+    'page_size': 25              # rows per page (CLI pager and iterators)
+}
+
+# HTTP/JSON service (main.py --serve)
+SERVER_CONFIG = {
+    'host': '127.0.0.1',
+    'port': 8765,
+    'readers': 4,                # reader threads, one SQLite connection each
+    'max_batch': 64,             # writes group-committed in one transaction
+    'batch_window_ms': 0,        # extra wait for more writes to join a commit
+    'max_body_bytes': 64 * 1024 * 1024
+}
+
+# In-process employee directory used by checkouts
+EMPLOYEE_CACHE = {
+    'max_entries': 5000          # LRU bound on cached names and badge codes
+}
+
 # LLM Settings for LM Studio
 LLM_CONFIG = {
     'lm_studio': {
@@ -23,7 +128,25 @@ LLM_CONFIG = {
         'endpoint': '/v1/completions'
     },
     'temperature': 0.1,
-    'max_tokens': 500
+    'max_tokens': 500,
+    # One completion returns intent and SQL together (False = classify, then generate)
+    'single_call': True,
+    'timeouts': {
+        'probe': 2,              # seconds for the /v1/models check
+        'request': 30            # seconds per completion
+    },
+    # Limits on running model-generated SQL (read-only connection)
+    'guard': {
+        'max_rows': 500,         # rows shown before the result is cut off
+        'time_budget': 2.0,      # seconds a query may run
+        'large_table_rows': 50000  # no unindexed scans / cross joins above this
+    },
+    # Generated SQL is cached per question in a side database
+    'cache': {
+        'path': DATA_DIR / 'llm_cache.db',
+        'ttl_seconds': 7 * 24 * 3600,
+        'max_entries': 2000
+    }
 }
 
 # Default employees
@@ -34,6 +157,7 @@ DEFAULT_EMPLOYEES = [
     ('Ana Martínez', 'EMP004', 'Producción')
 ]
 
-# Create necessary directories
-(DATA_DIR / 'exports').mkdir(exist_ok=True)
-(DATA_DIR / 'imports').mkdir(exist_ok=True)
\ No newline at end of file
+def ensure_data_dirs():
+    """Create the data folders (called at startup, never on import)"""
+    for path in (DATA_DIR, EXPORT_CONFIG['directory'], DATA_DIR / 'imports'):
+        path.mkdir(exist_ok=True)
\ No newline at end of file
@@ -0,0 +1,327 @@
+# core/batch.py - Non-interactive command batches: text or JSON Lines in, JSON Lines out
+import argparse
+import json
+import queue
+import shlex
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import BATCH_CONFIG
+from database.connection import DatabaseConnection
+from core.inventory import InventoryManager
+from core.checkout import CheckoutManager
+
+USAGE = {
+    'search': "search TERM...",
+    'checkout': "checkout ITEM_ID [QUANTITY] EMPLOYEE",
+    'checkin': "checkin ITEM_ID [QUANTITY] [EMPLOYEE] | checkin #CHECKOUT_ID [QUANTITY]",
+    'add': "add NAME [BRAND] [EQUIPMENT] [STOCK] [NOTES]",
+    'update-stock': "update-stock ITEM_ID STOCK"
+}
+
+_REQUIRED = object()
+
+
+def parse_command(line):
+    """A command dict ('op' plus its fields) from a JSON object or a text line.
+
+    JSON objects use the field names of the HTTP service ("item_id",
+    "quantity", "employee", "lines", ...); an "id" is echoed back in the
+    result. Text lines follow USAGE, quoted like a shell; "update stock"
+    and "update_stock" work as well as "update-stock". Raises ValueError
+    for a line that can't be understood.
+    """
+    if line[0] in '{[':
+        try:
+            command = json.loads(line)
+        except ValueError:
+            raise ValueError("invalid JSON")
+        if not isinstance(command, dict):
+            raise ValueError("expected a JSON object")
+        command['op'] = _op_name(str(command.get('op') or ''))
+        return command
+
+    words = shlex.split(line)
+    op, args = _op_name(words[0]), words[1:]
+    if op == 'update' and args and args[0].lower() == 'stock':
+        op, args = 'update-stock', args[1:]
+    if op == 'search':
+        return {'op': op, 'q': ' '.join(args)}
+    if op not in USAGE:
+        raise ValueError(f"unknown command {op!r}")
+    try:
+        if op == 'checkout':
+            quantity, rest = 1, args[1:]
+            if len(rest) > 1 and rest[0].isdigit():
+                quantity, rest = int(rest[0]), rest[1:]
+            if not rest:
+                raise ValueError()
+            return {'op': op, 'item_id': int(args[0]), 'quantity': quantity,
+                    'employee': ' '.join(rest)}
+        if op == 'checkin':
+            quantity, rest = None, args[1:]
+            if rest and rest[0].isdigit():
+                quantity, rest = int(rest[0]), rest[1:]
+            if args[0].startswith('#'):
+                return {'op': op, 'checkout_id': int(args[0][1:]), 'quantity': quantity}
+            return {'op': op, 'item_id': int(args[0]), 'quantity': quantity,
+                    'employee': ' '.join(rest) or None}
+        if op == 'add':
+            name, brand, equipment, stock, notes = (args + [''] * 5)[:5]
+            if not name or len(args) > 5:
+                raise ValueError()
+            return {'op': op, 'item_name': name, 'brand': brand, 'equipment': equipment,
+                    'stock': int(stock or 0), 'notes': notes}
+        if op == 'update-stock' and len(args) == 2:
+            return {'op': op, 'item_id': int(args[0]), 'stock': int(args[1])}
+    except (IndexError, ValueError):
+        pass
+    raise ValueError(f"usage: {USAGE[op]}")
+
+
+def _op_name(text):
+    """Command name with spaces and underscores as dashes: 'update_stock' -> 'update-stock'"""
+    return '-'.join(text.lower().replace('_', ' ').split())
+
+
+def _integer(command, key, default=_REQUIRED):
+    """command[key] as a whole number (default when absent)"""
+    value = command.get(key)
+    if value is None:
+        if default is _REQUIRED:
+            raise ValueError(f"need an integer '{key}'")
+        return default
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"'{key}' must be an integer")
+    return value
+
+
+class BatchRunner:
+    """Runs commands batch_size at a time in one transaction per batch.
+
+    One connection serves the whole stream. Each command is a savepoint
+    inside its batch's transaction, so one that fails undoes only itself
+    (as in server/writer.py). A batch also commits batch_ms after its
+    first command, so a client writing a command and waiting for its
+    result isn't left hanging. Results are written, in input order, once
+    their batch has committed: "ok": true means the change is on disk.
+    """
+
+    def __init__(self, db=None, output=None, batch_size=None):
+        self.db = db or DatabaseConnection()
+        self.inventory = InventoryManager(self.db)
+        self.checkout = CheckoutManager(self.db)
+        self.output = output or sys.stdout
+        self.batch_size = batch_size or BATCH_CONFIG['batch_size']
+        self.handlers = {
+            'search': self._search,
+            'checkout': self._checkout,
+            'checkin': self._checkin,
+            'add': self._add,
+            'update-stock': self._update_stock
+        }
+        self.pending = []
+        self.pending_since = None
+        self.summary = {'commands': 0, 'ok': 0, 'failed': 0, 'batches': 0}
+
+    def add(self, line_number, line):
+        """Queue one input line; blank lines and # comments are skipped"""
+        text = line.strip()
+        if not text or text.startswith('#'):
+            return
+        try:
+            command = parse_command(text)
+        except ValueError as e:
+            command = e
+        if not self.pending:
+            self.pending_since = time.monotonic()
+        self.pending.append((line_number, command))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush_due(self):
+        """Seconds until the pending commands should be committed (None if there are none)"""
+        if not self.pending:
+            return None
+        return max(0.0, self.pending_since + BATCH_CONFIG['batch_ms'] / 1000 - time.monotonic())
+
+    def flush(self):
+        """Run the pending commands in one transaction and write their results"""
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+
+        try:
+            with self.db.transaction(immediate=True):
+                results = [self._execute(line_number, command) for line_number, command in batch]
+        except sqlite3.Error as e:
+            # The commit itself failed: none of the batch happened
+            results = [self._result(line_number, command, False, f"Not saved: {e}")
+                       for line_number, command in batch]
+
+        self.summary['batches'] += 1
+        self.summary['commands'] += len(results)
+        for result in results:
+            self.summary['ok' if result['ok'] else 'failed'] += 1
+            self.output.write(json.dumps(result, ensure_ascii=False, default=str) + '\n')
+        self.output.flush()
+
+    def _execute(self, line_number, command):
+        """Run one command in its own savepoint and return its result dict"""
+        if isinstance(command, ValueError):
+            return self._result(line_number, command, False, str(command))
+        handler = self.handlers.get(command['op'])
+        if handler is None:
+            return self._result(line_number, command, False, f"unknown op {command['op']!r}")
+        try:
+            with self.db.transaction():
+                ok, message, data = handler(command)
+        except Exception as e:
+            ok, message, data = False, str(e), {}
+        return self._result(line_number, command, ok, message, data)
+
+    @staticmethod
+    def _result(line_number, command, ok, message, data=None):
+        result = {'line': line_number}
+        if isinstance(command, dict):
+            if 'id' in command:
+                result['id'] = command['id']
+            result['op'] = command['op']
+        result['ok'] = ok
+        result['message'] = message
+        result.update(data or {})
+        return result
+
+    def _search(self, command):
+        limit = _integer(command, 'limit', BATCH_CONFIG['search_limit'])
+        items, _ = self.inventory.search_page(str(command.get('q') or ''), limit)
+        return True, f"{len(items)} items", {'items': items}
+
+    def _checkout(self, command):
+        employee = str(command.get('employee') or '').strip()
+        if not employee:
+            raise ValueError("need 'employee'")
+        lines = command.get('lines')
+        if lines is None:
+            lines = [{'item_id': _integer(command, 'item_id'),
+                      'quantity': _integer(command, 'quantity', 1)}]
+        elif not isinstance(lines, list) or not lines:
+            raise ValueError("'lines' must be a non-empty list")
+        elif not all(isinstance(line, dict) and isinstance(line.get('item_id'), int) for line in lines):
+            raise ValueError("each line needs an integer 'item_id'")
+        ok, message, results = self.checkout.checkout_order(
+            str(command.get('order_number') or ''), employee, lines,
+            command.get('location') or 'field'
+        )
+        return ok, message, {'lines': results}
+
+    def _checkin(self, command):
+        quantity = _integer(command, 'quantity', None)
+        if command.get('checkout_id') is not None:
+            ok, message = self.checkout.checkin_checkout(_integer(command, 'checkout_id'), quantity)
+        else:
+            ok, message = self.checkout.checkin_item(
+                _integer(command, 'item_id'), quantity,
+                str(command.get('employee') or '').strip() or None
+            )
+        return ok, message, {}
+
+    def _add(self, command):
+        item_name = str(command.get('item_name') or '').strip()
+        if not item_name:
+            raise ValueError("need 'item_name'")
+        stock = _integer(command, 'stock', 0)
+        if stock < 0:
+            raise ValueError("'stock' can't be negative")
+        ok, message = self.inventory.add_item({
+            'item_name': item_name,
+            'brand': str(command.get('brand') or ''),
+            'equipment': str(command.get('equipment') or ''),
+            'stock': stock,
+            'notes': str(command.get('notes') or '')
+        })
+        if not ok:
+            return ok, message, {}
+        return ok, message, {'item_id': self.db.fetchone("SELECT last_insert_rowid()")[0]}
+
+    def _update_stock(self, command):
+        stock = _integer(command, 'stock')
+        if stock < 0:
+            raise ValueError("'stock' can't be negative")
+        ok, message = self.inventory.update_stock(_integer(command, 'item_id'), stock)
+        return ok, message, {}
+
+
+def read_commands(stream, runner):
+    """Feed every line of `stream` to the runner, committing on time while input is idle"""
+    lines = queue.Queue()
+
+    def reader():
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+
+    threading.Thread(target=reader, name='batch-reader', daemon=True).start()
+    line_number = 0
+    while True:
+        try:
+            line = lines.get(timeout=runner.flush_due())
+        except queue.Empty:
+            runner.flush()
+            continue
+        if line is None:
+            break
+        line_number += 1
+        runner.add(line_number, line)
+    runner.flush()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='main.py --exec',
+        description="Run commands from a file (or - for stdin), one per line as text "
+                    "or JSON, and write one JSON result per command."
+    )
+    parser.add_argument('input', help="command file, or - for stdin")
+    parser.add_argument('--batch', type=int, default=None,
+                        help=f"commands per transaction (default {BATCH_CONFIG['batch_size']})")
+    parser.add_argument('--output', default=None, help="results file (default stdout)")
+    return parser
+
+
+def run_batch(argv):
+    """main.py --exec FILE|- [--batch N] [--output FILE]; the outcome goes to stderr"""
+    try:
+        args = build_parser().parse_args(argv)
+    except SystemExit:
+        return None  # argparse already printed usage or the error
+
+    try:
+        stream = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+        output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    except OSError as e:
+        print(f"❌ Exec error: {e}", file=sys.stderr)
+        return None
+
+    runner = BatchRunner(output=output, batch_size=args.batch and max(1, args.batch))
+    started = time.perf_counter()
+    try:
+        read_commands(stream, runner)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - started
+
+    summary = runner.summary
+    rate = summary['commands'] / elapsed if elapsed else 0
+    print(f"✅ {summary['commands']} commands ({summary['ok']} ok, {summary['failed']} failed) "
+          f"in {elapsed:.1f}s, {rate:.0f}/s, {summary['batches']} commits", file=sys.stderr)
+    return summary
@@ -5,116 +5,278 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from config import PAGINATION_CONFIG
 from database.connection import DatabaseConnection
+from core.employees import EmployeeDirectory
+
+# Shared by the full listing and the keyset-paginated pages
+ACTIVE_CHECKOUTS_QUERY = '''
+    SELECT 
+        c.id,
+        i.id as item_id,
+        i.item_name,
+        i.brand,
+        e.employee_name,
+        c.quantity,
+        c.outstanding,
+        c.checkout_date,
+        c.location,
+        c.order_number
+    FROM checkouts c
+    JOIN inventory i ON c.item_id = i.id
+    JOIN employees e ON c.employee_id = e.id
+    WHERE c.status = 'active' {keyset}
+    ORDER BY c.checkout_date DESC, c.id DESC
+    {limit}
+'''
+
+# Units come back from one checkout; it only counts as returned once all are back
+RETURN_UNITS = '''
+    UPDATE checkouts SET
+        outstanding = outstanding - ?,
+        status = CASE WHEN outstanding = ? THEN 'returned' ELSE status END,
+        actual_return = CASE WHEN outstanding = ? THEN CURRENT_TIMESTAMP ELSE actual_return END
+    WHERE id = ?
+'''
+
+OPEN_CHECKOUTS_SELECT = '''
+    SELECT c.id, c.item_id, c.outstanding, i.item_name, e.employee_name
+    FROM checkouts c
+    JOIN inventory i ON c.item_id = i.id
+    JOIN employees e ON c.employee_id = e.id
+'''
+
+class OrderRejected(Exception):
+    """Raised inside an order transaction to roll back every line"""
 
 class CheckoutManager:
-    def __init__(self):
-        self.db = DatabaseConnection()
+    def __init__(self, db=None):
+        self.db = db or DatabaseConnection()
+        self.employees = EmployeeDirectory(self.db)
     
     def checkout_item(self, item_id, employee_name, quantity=1, location='field', order_number=''):
         """Check out an item"""
+        success, message, results = self.checkout_order(
+            order_number, employee_name, [(item_id, quantity)], location
+        )
+        if not success:
+            # The line's own reason when it was refused; otherwise what went wrong
+            refused = [r['message'] for r in results if not r['ok'] and r['message']]
+            return False, refused[0] if refused else message
+        return True, f"Checked out {quantity} x {results[0]['item_name']} to {employee_name}"
+    
+    def checkout_order(self, order_number, employee_name, lines, location='field'):
+        """Check out several items as one all-or-nothing order.
+        
+        lines: (item_id, quantity) tuples or dicts with item_id, quantity and
+        an optional per-line location.
+        Returns (success, message, results) with one result dict per line.
+        """
+        results = []
+        for line in lines:
+            if isinstance(line, dict):
+                item_id, quantity = line['item_id'], line.get('quantity', 1)
+                line_location = line.get('location') or location
+            else:
+                item_id, quantity = line
+                line_location = location
+            results.append({
+                'item_id': item_id,
+                'item_name': None,
+                'quantity': quantity,
+                'location': line_location,
+                'ok': False,
+                'message': ''
+            })
+        
+        if not results:
+            return False, "Order has no items", results
+        
         try:
-            # Get or create employee
-            emp = self.db.fetchone(
-                "SELECT id FROM employees WHERE LOWER(employee_name) = LOWER(?)", 
-                (employee_name,)
-            )
-            
-            if not emp:
-                self.db.execute(
-                    "INSERT INTO employees (employee_name) VALUES (?)", 
-                    (employee_name,)
-                )
-                emp = self.db.fetchone(
-                    "SELECT id FROM employees WHERE employee_name = ?", 
-                    (employee_name,)
-                )
-            
-            employee_id = emp['id']
-            
-            # Check availability
-            item = self.db.fetchone(
-                "SELECT item_name, available FROM inventory WHERE id = ?", 
-                (item_id,)
-            )
-            
-            if not item:
-                return False, "Item not found"
-            
-            if item['available'] < quantity:
-                return False, f"Not enough available. Only {item['available']} in stock"
-            
-            # Create checkout record
-            self.db.execute('''
-                INSERT INTO checkouts 
-                (item_id, employee_id, quantity, location, order_number)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (item_id, employee_id, quantity, location, order_number))
-            
-            # Update availability
-            self.db.execute(
-                "UPDATE inventory SET available = available - ? WHERE id = ?",
-                (quantity, item_id)
-            )
-            
-            return True, f"Checked out {quantity} x {item['item_name']} to {employee_name}"
+            with self.db.transaction(immediate=True):
+                # Inside the transaction: a rejected order leaves no new employee behind
+                employee_id = self.employees.get_or_create(employee_name)
+                for result in results:
+                    self._reserve_line(result)
+                
+                if not all(result['ok'] for result in results):
+                    raise OrderRejected()
+                
+                self.db.executemany('''
+                    INSERT INTO checkouts 
+                    (item_id, employee_id, quantity, outstanding, location, order_number)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', [
+                    (r['item_id'], employee_id, r['quantity'], r['quantity'], r['location'],
+                     order_number)
+                    for r in results
+                ])
+        except OrderRejected:
+            # Nothing was reserved; tell the caller which lines blocked the order
+            failed = sum(1 for r in results if not r['ok'])
+            for result in results:
+                if result['ok']:
+                    result['ok'] = False
+                    result['message'] = "Not checked out (order rejected)"
+            return False, f"Order rejected: {failed} of {len(results)} lines can't be filled", results
+        except Exception as e:
+            return False, str(e), results
+        
+        total = sum(r['quantity'] for r in results)
+        return True, f"Checked out {total} items on {len(results)} lines to {employee_name}", results
+    
+    def _reserve_line(self, result):
+        """Take stock for one order line; the WHERE guard makes it race-free"""
+        item_id, quantity = result['item_id'], result['quantity']
+        if not isinstance(quantity, int) or quantity < 1:
+            result['message'] = "Quantity must be a positive whole number"
+            return
+        
+        reserved = self.db.fetchall('''
+            UPDATE inventory SET available = available - ?
+            WHERE id = ? AND available >= ? AND discontinued IS NULL
+            RETURNING item_name
+        ''', (quantity, item_id, quantity))
+        
+        if reserved:
+            reserved = reserved[0]
+            result['item_name'] = reserved['item_name']
+            result['ok'] = True
+            result['message'] = f"Checked out {quantity} x {reserved['item_name']}"
+            return
+        
+        item = self.db.fetchone(
+            "SELECT item_name, available, discontinued FROM inventory WHERE id = ?", 
+            (item_id,)
+        )
+        if not item:
+            result['message'] = "Item not found"
+        elif item['discontinued']:
+            result['item_name'] = item['item_name']
+            result['message'] = "Item discontinued"
+        else:
+            result['item_name'] = item['item_name']
+            result['message'] = f"Not enough available. Only {item['available']} in stock"
+    
+    def checkin_item(self, item_id, quantity=None, employee_name=None):
+        """Return units of an item.
+        
+        Without employee_name the item must be held by one person only.
+        Units come off that person's open checkouts oldest first (FIFO);
+        quantity defaults to everything they hold of the item.
+        """
+        try:
+            with self.db.transaction(immediate=True):
+                if employee_name:
+                    employee_id = self.employees.get_id(employee_name)
+                    if employee_id is None:
+                        return False, f"Unknown employee: {employee_name}"
+                else:
+                    holders = self.db.fetchall('''
+                        SELECT b.employee_id, e.employee_name, b.quantity
+                        FROM outstanding_balances b
+                        JOIN employees e ON e.id = b.employee_id
+                        WHERE b.item_id = ?
+                    ''', (item_id,))
+                    if len(holders) > 1:
+                        held = ", ".join(f"{h['employee_name']} ({h['quantity']})" for h in holders)
+                        return False, (f"Held by more than one person: {held}. "
+                                       f"Say whose: checkin {item_id} [quantity] [employee]")
+                    if not holders:
+                        return False, "No active checkout found for this item"
+                    employee_id = holders[0]['employee_id']
+                
+                open_checkouts = self.db.fetchall(OPEN_CHECKOUTS_SELECT + '''
+                    WHERE c.item_id = ? AND c.status = 'active' AND c.employee_id = ?
+                        AND c.outstanding > 0
+                    ORDER BY c.checkout_date, c.id
+                ''', (item_id, employee_id))
+                return self._return_units(open_checkouts, quantity)
             
         except Exception as e:
             return False, str(e)
     
-    def checkin_item(self, item_id, quantity=None):
-        """Return an item"""
+    def checkin_checkout(self, checkout_id, quantity=None):
+        """Return units of one checkout (all of what is still out by default)"""
         try:
-            # Find active checkout
-            checkout = self.db.fetchone('''
-                SELECT c.id, c.quantity, i.item_name, e.employee_name
-                FROM checkouts c
-                JOIN inventory i ON c.item_id = i.id
-                JOIN employees e ON c.employee_id = e.id
-                WHERE c.item_id = ? AND c.status = 'active'
-                ORDER BY c.checkout_date DESC
-            ''', (item_id,))
-            
-            if not checkout:
-                return False, "No active checkout found for this item"
-            
-            return_qty = quantity or checkout['quantity']
-            
-            # Update checkout
-            self.db.execute(
-                "UPDATE checkouts SET status = 'returned', actual_return = CURRENT_TIMESTAMP WHERE id = ?",
-                (checkout['id'],)
-            )
-            
-            # Update availability
-            self.db.execute(
-                "UPDATE inventory SET available = available + ? WHERE id = ?",
-                (return_qty, item_id)
-            )
-            
-            return True, f"Returned {return_qty} x {checkout['item_name']} from {checkout['employee_name']}"
+            with self.db.transaction(immediate=True):
+                checkout = self.db.fetchall(OPEN_CHECKOUTS_SELECT + '''
+                    WHERE c.id = ? AND c.status = 'active' AND c.outstanding > 0
+                ''', (checkout_id,))
+                return self._return_units(checkout, quantity)
             
         except Exception as e:
             return False, str(e)
     
+    def _return_units(self, open_checkouts, quantity):
+        """Allocate returned units across open checkouts in order (inside a transaction)"""
+        if not open_checkouts:
+            return False, "No active checkout found"
+        
+        outstanding = sum(c['outstanding'] for c in open_checkouts)
+        return_qty = outstanding if quantity is None else quantity
+        if not isinstance(return_qty, int) or return_qty < 1:
+            return False, "Quantity must be a positive whole number"
+        if return_qty > outstanding:
+            return False, f"Only {outstanding} outstanding"
+        
+        remaining = return_qty
+        for checkout in open_checkouts:
+            take = min(remaining, checkout['outstanding'])
+            self.db.execute(RETURN_UNITS, (take, take, take, checkout['id']))
+            remaining -= take
+            if not remaining:
+                break
+        
+        first = open_checkouts[0]
+        self.db.execute(
+            "UPDATE inventory SET available = available + ? WHERE id = ?",
+            (return_qty, first['item_id'])
+        )
+        
+        message = f"Returned {return_qty} x {first['item_name']} from {first['employee_name']}"
+        if return_qty < outstanding:
+            message += f" ({outstanding - return_qty} still out)"
+        return True, message
+    
     def get_active_checkouts(self):
         """Get all active checkouts"""
-        results = self.db.fetchall('''
-            SELECT 
-                c.id,
-                i.id as item_id,
-                i.item_name,
-                i.brand,
-                e.employee_name,
-                c.quantity,
-                c.checkout_date,
-                c.location,
-                c.order_number
-            FROM checkouts c
-            JOIN inventory i ON c.item_id = i.id
-            JOIN employees e ON c.employee_id = e.id
-            WHERE c.status = 'active'
-            ORDER BY c.checkout_date DESC
-        ''')
-        
-        return [dict(row) for row in results]
\ No newline at end of file
+        results = self.db.fetchall(ACTIVE_CHECKOUTS_QUERY.format(
+            keyset="", limit=""
+        ))
+        
+        return [dict(row) for row in results]
+    
+    def get_active_page(self, page_size=None, after=None):
+        """One page of active checkouts, newest first.
+        
+        Returns (checkouts, next_after); pass next_after back as `after` for
+        the following page (None when there are no more). Keyset paginated
+        on (checkout_date, id).
+        """
+        page_size = page_size or PAGINATION_CONFIG['page_size']
+        params = []
+        keyset = ""
+        if after is not None:
+            keyset = "AND (c.checkout_date, c.id) < (?, ?)"
+            params += list(after)
+        params.append(page_size + 1)
+        
+        rows = self.db.fetchall(ACTIVE_CHECKOUTS_QUERY.format(
+            keyset=keyset, limit="LIMIT ?"
+        ), params)
+        
+        next_after = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_after = (rows[-1]['checkout_date'], rows[-1]['id'])
+        return [dict(row) for row in rows], next_after
+    
+    def iter_active_checkouts(self, page_size=None):
+        """Yield active checkouts, fetching one page at a time"""
+        after = None
+        while True:
+            checkouts, after = self.get_active_page(page_size, after)
+            yield from checkouts
+            if after is None:
+                return
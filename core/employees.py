@@ -0,0 +1,162 @@
+# core/employees.py - Cached employee lookups for the checkout hot path
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import EMPLOYEE_CACHE
+from database.connection import DatabaseConnection
+from utils.text import normalize_name
+
+
+class EmployeeDirectory:
+    """Maps employee names and badge codes to employee ids.
+
+    The whole table is loaded on first use and kept in two LRU-bounded
+    dicts (normalized name -> id, badge code -> id). New employees are added
+    as they are created. PRAGMA data_version changes when another
+    connection commits, and that drops the cache so the next lookup
+    reloads it. An employee created inside a still-open transaction is not
+    cached until the transaction ends, so a rollback can't leave a stale id.
+    """
+
+    def __init__(self, db=None, max_entries=None):
+        self.db = db or DatabaseConnection()
+        self.max_entries = max_entries or EMPLOYEE_CACHE['max_entries']
+        self._by_name = OrderedDict()
+        self._by_badge = OrderedDict()
+        self._loaded = False
+        self._data_versions = {}
+        self._open_transactions = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_id(self, name_or_badge):
+        """Employee id for a name or badge code, or None if unknown"""
+        if self._check_data_version():
+            return self._lookup(name_or_badge, remember=False)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            emp_id = self._cached(self._by_badge, name_or_badge.strip().upper())
+            if emp_id is None:
+                emp_id = self._cached(self._by_name, normalize_name(name_or_badge))
+            if emp_id is not None:
+                self.hits += 1
+                return emp_id
+            self.misses += 1
+
+        # Not cached: the table may be larger than the cache bound
+        return self._lookup(name_or_badge, remember=True)
+
+    def get_or_create(self, employee_name):
+        """Employee id for a name or badge code, adding a new employee if unknown"""
+        emp_id = self.get_id(employee_name)
+        if emp_id is not None:
+            return emp_id
+
+        try:
+            emp_id = self.db.fetchall(
+                "INSERT INTO employees (employee_name, name_key) VALUES (?, ?) RETURNING id",
+                (employee_name.strip(), normalize_name(employee_name))
+            )[0]['id']
+        except sqlite3.IntegrityError:
+            # Someone else added the same name since our lookup
+            return self.db.fetchone(
+                "SELECT id FROM employees WHERE employee_name = ?",
+                (employee_name.strip(),)
+            )['id']
+
+        if self.db.in_transaction():
+            # A rollback would take this id back; don't cache until it's over
+            self._open_transactions.add(threading.get_ident())
+        else:
+            self._remember(normalize_name(employee_name), None, emp_id)
+        return emp_id
+
+    def invalidate(self):
+        """Forget everything; the next lookup reloads from the database"""
+        with self._lock:
+            self._by_name.clear()
+            self._by_badge.clear()
+            self._loaded = False
+
+    def _check_data_version(self):
+        """Drop the cache if another connection has committed since last time.
+
+        Returns True while this thread is inside a transaction that created
+        an employee; lookups then bypass the cache.
+        """
+        # data_version is per connection, and connections are per thread
+        thread = threading.get_ident()
+        if thread in self._open_transactions:
+            if self.db.in_transaction():
+                return True
+            # Committed or rolled back: either way, reload
+            self._open_transactions.discard(thread)
+            self.invalidate()
+
+        version = self.db.fetchone("PRAGMA data_version")[0]
+        if self._data_versions.get(thread) != version:
+            self._data_versions[thread] = version
+            self.invalidate()
+        return False
+
+    def _lookup(self, name_or_badge, remember):
+        """Find an employee in the database by folded name, then badge code"""
+        name_key = normalize_name(name_or_badge)
+        row = self.db.fetchone(
+            "SELECT id FROM employees WHERE name_key = ? ORDER BY id LIMIT 1",
+            (name_key,)
+        )
+        if row is not None:
+            if remember:
+                self._remember(name_key, None, row['id'])
+            return row['id']
+
+        badge = name_or_badge.strip()
+        row = self.db.fetchone(
+            "SELECT id FROM employees WHERE employee_id = ? COLLATE NOCASE ORDER BY id LIMIT 1",
+            (badge,)
+        )
+        if row is not None:
+            if remember:
+                self._remember(None, badge, row['id'])
+            return row['id']
+        return None
+
+    def _load(self):
+        """Fill the cache from the employees table (caller holds the lock)"""
+        rows = self.db.fetchall(
+            "SELECT id, employee_name, employee_id FROM employees ORDER BY id DESC LIMIT ?",
+            (self.max_entries,)
+        )
+        # Oldest first, so the lowest id wins when two names fold together
+        for row in reversed(rows):
+            self._by_name.setdefault(normalize_name(row['employee_name']), row['id'])
+            if row['employee_id']:
+                self._by_badge.setdefault(row['employee_id'].strip().upper(), row['id'])
+        self._loaded = True
+
+    def _cached(self, cache, key):
+        """LRU lookup (caller holds the lock)"""
+        emp_id = cache.get(key)
+        if emp_id is not None:
+            cache.move_to_end(key)
+        return emp_id
+
+    def _remember(self, name_key, badge, emp_id):
+        """Add an entry, evicting the least recently used beyond the bound"""
+        with self._lock:
+            if name_key:
+                self._by_name[name_key] = emp_id
+            if badge:
+                self._by_badge[badge.strip().upper()] = emp_id
+            for cache in (self._by_name, self._by_badge):
+                while len(cache) > self.max_entries:
+                    cache.popitem(last=False)
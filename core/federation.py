@@ -0,0 +1,129 @@
+# core/federation.py - Read-only queries fanned out to every configured warehouse database
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import DATABASE_CONFIG, FEDERATION_CONFIG
+from database.connection import DatabaseConnection
+from core.inventory import InventoryManager
+from core.checkout import CheckoutManager
+
+
+class FederatedInventory:
+    """Search, summary and active checkouts across all DATABASE_CONFIG warehouses.
+
+    Each warehouse is queried on its own worker thread, over a read-only
+    connection opened for that read, at the same time. A warehouse that takes
+    longer than `timeout` is interrupted through a progress handler and
+    reported in the failures instead of failing the whole call; so is one
+    whose database is missing or broken. Rows carry a 'warehouse' column.
+    """
+
+    def __init__(self, databases=None, timeout=None):
+        databases = databases or DATABASE_CONFIG
+        self.timeout = timeout or FEDERATION_CONFIG['timeout']
+        self.warehouses = {
+            settings.get('name') or key: DatabaseConnection(key, settings['path'], read_only=True)
+            for key, settings in databases.items()
+        }
+        self.executor = ThreadPoolExecutor(
+            max_workers=len(self.warehouses), thread_name_prefix='federation'
+        )
+
+    def search_items(self, search_term="", limit=None):
+        """Best matches from every warehouse, interleaved by rank.
+
+        bm25 scores from different indexes aren't comparable, so the merge
+        takes each warehouse's 1st match, then each one's 2nd, and so on.
+        Returns (items, failures).
+        """
+        limit = limit or FEDERATION_CONFIG['max_results']
+        results, failures = self._fan_out(
+            lambda db: InventoryManager(db).search_page(search_term, limit)[0]
+        )
+        ranked = [
+            (position, order, item)
+            for order, (warehouse, items) in enumerate(results.items())
+            for position, item in enumerate(items)
+        ]
+        ranked.sort(key=lambda entry: entry[:2])
+        return [item for _, _, item in ranked[:limit]], failures
+
+    def get_summary(self):
+        """Per-warehouse summaries plus a 'total' entry; returns (summaries, failures)"""
+        results, failures = self._fan_out(lambda db: InventoryManager(db).get_summary())
+        summaries = {}
+        total = {}
+        for warehouse, summary in results.items():
+            summaries[warehouse] = summary
+            for key, value in summary.items():
+                total[key] = total.get(key, 0) + value
+        summaries['total'] = total
+        return summaries, failures
+
+    def get_active_checkouts(self, limit=None):
+        """Newest active checkouts across warehouses; returns (checkouts, failures)"""
+        limit = limit or FEDERATION_CONFIG['max_results']
+        results, failures = self._fan_out(
+            lambda db: CheckoutManager(db).get_active_page(limit)[0]
+        )
+        merged = [checkout for checkouts in results.values() for checkout in checkouts]
+        merged.sort(key=lambda c: (c['checkout_date'] or '', c['id']), reverse=True)
+        return merged[:limit], failures
+
+    def close(self):
+        """Stop the workers; a read still running ends at its deadline"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def _fan_out(self, read):
+        """Run read(db) for every warehouse at once.
+
+        Returns ({warehouse: result}, {warehouse: reason}); list results get
+        a 'warehouse' key on each row.
+        """
+        deadline = time.monotonic() + self.timeout
+        futures = {
+            self.executor.submit(self._read, db, read, deadline): warehouse
+            for warehouse, db in self.warehouses.items()
+        }
+        # A little grace so an interrupted query can report itself
+        wait(futures, timeout=self.timeout + 0.5)
+
+        results = {}
+        failures = {}
+        for future, warehouse in futures.items():
+            if not future.done():
+                failures[warehouse] = f"no answer within {self.timeout:g}s"
+                continue
+            try:
+                result = future.result()
+            except Exception as e:
+                failures[warehouse] = str(e)
+                continue
+            if isinstance(result, list):
+                for row in result:
+                    row['warehouse'] = warehouse
+            results[warehouse] = result
+        return results, failures
+
+    @staticmethod
+    def _read(db, read, deadline):
+        """Worker thread: run one warehouse's read, interrupted at the deadline"""
+        try:
+            with db.get_connection() as conn:
+                conn.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+                try:
+                    return read(db)
+                except Exception as e:
+                    if 'interrupted' in str(e):
+                        raise TimeoutError("timed out") from None
+                    raise
+                finally:
+                    conn.set_progress_handler(None, 0)
+        finally:
+            # Workers outlive the call: leave no connection open in them
+            db.close()
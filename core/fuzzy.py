@@ -0,0 +1,210 @@
+# core/fuzzy.py - Typo-tolerant item lookup over a trigram index of catalog words
+import json
+import re
+import sys
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import FUZZY_CONFIG
+from database.connection import DatabaseConnection
+from utils.text import strip_accents
+
+# Same word boundaries as the FTS5 unicode61 tokenizer (letters and digits)
+_WORD = re.compile(r'[^\W_]+')
+
+
+def words(text):
+    """Lowercase, accent-free words: "Llave Combinación 17mm" -> llave, combinacion, 17mm"""
+    text = (text or '').lower()
+    if not text.isascii():
+        text = _fold(text)
+    return _WORD.findall(text)
+
+
+@lru_cache(maxsize=4096)
+def _fold(text):
+    # Item names and brands repeat endlessly; accent-strip each one once
+    return strip_accents(text)
+
+
+def item_words(item):
+    """Indexed words of an inventory row: name, brand and Catalog ID"""
+    return words(item['item_name']) + words(item['brand']) + words(item['item_id'])
+
+
+def trigrams(word):
+    """Trigrams of a word padded like pg_trgm, so the start of a word weighs more"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    """Shared trigrams over all trigrams of the two words (0..1)"""
+    first, second = trigrams(a), trigrams(b)
+    return len(first & second) / len(first | second)
+
+
+class FuzzyIndex:
+    """Suggestions for searches that found (almost) nothing.
+
+    The index holds the distinct words of item names, brands and Catalog
+    IDs, each filed under its trigrams. Catalogs repeat the same few
+    thousand words, so correcting a misspelled word reads a small part of
+    the index however many items there are. The corrected words are then
+    looked up in the regular FTS index and the items ranked by how closely
+    their words match what was typed.
+
+    Triggers queue inserted and renamed items in fuzzy_queue; refresh()
+    indexes the queue (imports run it, suggest() runs it when needed).
+    Words of deleted or renamed items stay until rebuild(); they only
+    cost a correction that finds nothing.
+    """
+
+    def __init__(self, db=None):
+        self.db = db or DatabaseConnection()
+
+    def refresh(self):
+        """Index queued items; returns how many were processed"""
+        processed = 0
+        while True:
+            with self.db.transaction(immediate=True):
+                ids = [row['item_id'] for row in self.db.fetchall(
+                    "SELECT item_id FROM fuzzy_queue ORDER BY item_id LIMIT ?",
+                    (FUZZY_CONFIG['batch_size'],)
+                )]
+                if not ids:
+                    return processed
+                batch = (json.dumps(ids),)
+                found = set()
+                for row in self.db.fetchall('''
+                    SELECT item_name, brand, item_id FROM inventory
+                    WHERE id IN (SELECT value FROM json_each(?))
+                ''', batch):
+                    found.update(item_words(row))
+
+                known = {row['term'] for row in self.db.fetchall(
+                    "SELECT term FROM fuzzy_terms WHERE term IN (SELECT value FROM json_each(?))",
+                    (json.dumps(list(found)),)
+                )}
+                new = found - known
+                self.db.executemany("INSERT INTO fuzzy_terms (term) VALUES (?)",
+                                    [(term,) for term in new])
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO fuzzy_trigrams (trigram, term) VALUES (?, ?)",
+                    [(trigram, term) for term in new for trigram in trigrams(term)]
+                )
+                self.db.execute(
+                    "DELETE FROM fuzzy_queue WHERE item_id IN (SELECT value FROM json_each(?))", batch
+                )
+            processed += len(ids)
+
+    def rebuild(self):
+        """Re-index every item from scratch (drops words no item uses any more)"""
+        with self.db.transaction(immediate=True):
+            self.db.execute("DELETE FROM fuzzy_trigrams")
+            self.db.execute("DELETE FROM fuzzy_terms")
+            self.db.execute("INSERT OR IGNORE INTO fuzzy_queue (item_id) SELECT id FROM inventory")
+            return self.refresh()
+
+    def corrections(self, word, limit=None):
+        """Indexed words closest to `word`: [(term, similarity)], best first"""
+        limit = limit or FUZZY_CONFIG['alternatives']
+        shared = Counter()
+        common = []
+        for trigram in trigrams(word):
+            postings = [row['term'] for row in self.db.fetchall(
+                "SELECT term FROM fuzzy_trigrams WHERE trigram = ? LIMIT ?",
+                (trigram, FUZZY_CONFIG['posting_limit'])
+            )]
+            # Trigrams found in a large part of the vocabulary (a Catalog ID
+            # prefix, "de ") say little about which word was meant
+            if len(postings) < FUZZY_CONFIG['posting_limit']:
+                shared.update(postings)
+            else:
+                common.append(postings)
+        if not shared:
+            for postings in common:
+                shared.update(postings)
+
+        scored = []
+        for term, _ in shared.most_common(limit * 20):
+            score = similarity(word, term)
+            if score >= FUZZY_CONFIG['similarity']:
+                scored.append((term, score))
+        scored.sort(key=lambda entry: (-entry[1], entry[0]))
+        return scored[:limit]
+
+    def suggest(self, search_term, limit=None, exclude=(), refresh=True):
+        """Items matching a corrected version of search_term, best first.
+
+        Each item dict gets a 'similarity' (0..1) of how well its words
+        match the words typed. Items whose id is in `exclude` are skipped.
+        refresh=False searches the index as it is, without writing.
+        """
+        limit = limit or FUZZY_CONFIG['suggestions']
+        typed = words(search_term)
+        if not typed or not self._has_fts():
+            return []
+        if refresh and not self.db.read_only and self.db.fetchone("SELECT 1 FROM fuzzy_queue LIMIT 1"):
+            self.refresh()
+
+        # Words that start some indexed word are searched as typed, the rest
+        # as their corrections; words with neither are left out
+        groups = []
+        for word in typed:
+            if self._has_prefix(word):
+                groups.append(f'"{word}"*')
+                continue
+            options = [f'"{term}"' for term, _ in self.corrections(word)]
+            if options:
+                groups.append(f"({' OR '.join(options)})")
+        if not groups:
+            return []
+
+        # Items with every word come straight off the index (they are ranked
+        # below); bm25 only orders the any-word fallback
+        wanted = limit * 5 + len(exclude)
+        candidates = self._candidates(' AND '.join(groups), wanted)
+        if not candidates and len(groups) > 1:
+            candidates = self._candidates(' OR '.join(groups), wanted, ranked=True)
+        candidates = [item for item in candidates if item['id'] not in exclude]
+
+        for item in candidates:
+            words_there = set(item_words(item))
+            item['similarity'] = sum(
+                max((1.0 if other.startswith(word) else similarity(word, other)
+                     for other in words_there), default=0.0)
+                for word in typed
+            ) / len(typed)
+        # Stable sort: equal scores keep the order they were found in
+        candidates.sort(key=lambda item: -item['similarity'])
+        return candidates[:limit]
+
+    def _candidates(self, match, limit, ranked=False):
+        """Items matching an FTS query over the columns the trigram index covers"""
+        query = '''
+            SELECT i.* FROM inventory_fts
+            JOIN inventory i ON i.id = inventory_fts.rowid
+            WHERE inventory_fts MATCH ? AND i.discontinued IS NULL
+        '''
+        if ranked:
+            query += " ORDER BY bm25(inventory_fts, 10.0, 4.0, 2.0, 1.0, 6.0)"
+        return [dict(row) for row in self.db.fetchall(
+            query + " LIMIT ?", (f"{{item_name brand item_id}} : ({match})", limit)
+        )]
+
+    def _has_prefix(self, word):
+        """True if some indexed word starts with `word`"""
+        return self.db.fetchone(
+            "SELECT 1 FROM fuzzy_terms WHERE term >= ? AND term < ? LIMIT 1",
+            (word, word + '\U0010ffff')
+        ) is not None
+
+    def _has_fts(self):
+        return self.db.fetchone(
+            "SELECT 1 FROM sqlite_master WHERE name = 'inventory_fts'"
+        ) is not None
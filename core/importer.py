@@ -0,0 +1,186 @@
+# core/importer.py - Streaming, single-transaction CSV catalog import
+import csv
+import sys
+from itertools import islice
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import IMPORT_CONFIG
+from database.connection import DatabaseConnection
+from core.fuzzy import FuzzyIndex
+
+# Rows with a Catalog ID are upserted on it. Stock is replaced and
+# `available` keeps whatever is currently checked out (stock - available);
+# an item back in the catalog is no longer discontinued.
+UPSERT_BY_CATALOG_ID = '''
+    INSERT INTO inventory
+    (item_id, item_name, equipment, brand, stock, available, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(item_id) WHERE item_id <> '' DO UPDATE SET
+        item_name = excluded.item_name,
+        equipment = excluded.equipment,
+        brand = excluded.brand,
+        available = MAX(0, excluded.stock - (inventory.stock - inventory.available)),
+        stock = excluded.stock,
+        notes = excluded.notes,
+        discontinued = NULL
+'''
+
+# Rows without a Catalog ID fall back to (item_name, brand) as their key
+UPDATE_BY_NAME = '''
+    UPDATE inventory SET
+        equipment = ?,
+        available = MAX(0, ? - (stock - available)),
+        stock = ?,
+        notes = ?,
+        discontinued = NULL
+    WHERE IFNULL(item_id, '') = '' AND item_name = ? AND IFNULL(brand, '') = ?
+'''
+
+INSERT_BY_NAME = '''
+    INSERT INTO inventory
+    (item_id, item_name, equipment, brand, stock, available, notes)
+    SELECT '', ?, ?, ?, ?, ?, ?
+    WHERE NOT EXISTS (
+        SELECT 1 FROM inventory
+        WHERE IFNULL(item_id, '') = '' AND item_name = ? AND IFNULL(brand, '') = ?
+    )
+'''
+
+
+# CSV header -> position in the inventory tuple built by parse_row
+CSV_COLUMNS = ('Catalog ID', 'Item Name', 'Equipment', 'Brand', 'Stock', 'Notes')
+
+
+def column_positions(header):
+    """Map each expected CSV column to its index in the file (None if absent)"""
+    positions = {name.strip(): i for i, name in enumerate(header)}
+    return tuple(positions.get(name) for name in CSV_COLUMNS)
+
+
+def parse_row(values, positions):
+    """Turn a CSV row into an inventory tuple (None for a repeated header row).
+
+    Raises ValueError if the row is unusable.
+    """
+    item_id, item_name, equipment, brand, raw_stock, notes = (
+        values[i].strip() if i is not None and i < len(values) else ''
+        for i in positions
+    )
+    if item_name == 'Item Name':
+        return None
+    if not item_name:
+        raise ValueError("missing Item Name")
+
+    try:
+        stock = int(float(raw_stock)) if raw_stock else 0
+    except ValueError:
+        raise ValueError(f"invalid Stock {raw_stock!r}")
+    if stock < 0:
+        raise ValueError(f"negative Stock {stock}")
+
+    return item_id, item_name, equipment, brand, stock, notes
+
+
+def write_by_name(db, unkeyed):
+    """Update or insert (item_name, equipment, brand, stock, notes) rows without a Catalog ID"""
+    db.executemany(UPDATE_BY_NAME, [
+        (equipment, stock, stock, notes, item_name, brand)
+        for item_name, equipment, brand, stock, notes in unkeyed
+    ])
+    db.executemany(INSERT_BY_NAME, [
+        (item_name, equipment, brand, stock, stock, notes, item_name, brand)
+        for item_name, equipment, brand, stock, notes in unkeyed
+    ])
+
+
+def print_rejected(rejected):
+    """Echo rejected (line_number, reason) rows, up to max_reported_rejects"""
+    if not rejected:
+        return
+    limit = IMPORT_CONFIG['max_reported_rejects']
+    print(f"⚠️ Rejected {len(rejected)} rows:")
+    for line_number, reason in rejected[:limit]:
+        print(f"   line {line_number}: {reason}")
+    if len(rejected) > limit:
+        print(f"   ... and {len(rejected) - limit} more")
+
+
+class CatalogImporter:
+    def __init__(self, db=None, chunk_size=None, progress=None):
+        self.db = db or DatabaseConnection()
+        self.chunk_size = chunk_size or IMPORT_CONFIG['chunk_size']
+        self.progress = progress
+
+    def import_file(self, csv_file):
+        """Import a CSV file in one transaction and return a summary dict"""
+        with open(csv_file, 'r', encoding='utf-8', newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            return self.import_rows(reader, header)
+
+    def import_rows(self, rows, header=CSV_COLUMNS):
+        """Import an iterable of CSV value lists in chunks inside one transaction"""
+        positions = column_positions(header)
+        summary = {
+            'processed': 0,
+            'inserted': 0,
+            'updated': 0,
+            'rejected': [],
+            'chunks': 0
+        }
+
+        with self.db.transaction(immediate=True):
+            before = self.db.fetchone("SELECT COUNT(*) AS count FROM inventory")['count']
+
+            # Line numbers as seen in the file, after the header
+            numbered = enumerate(rows, start=2)
+            while True:
+                chunk = list(islice(numbered, self.chunk_size))
+                if not chunk:
+                    break
+                self._import_chunk(chunk, positions, summary)
+                summary['chunks'] += 1
+                if self.progress:
+                    self.progress(summary)
+
+            after = self.db.fetchone("SELECT COUNT(*) AS count FROM inventory")['count']
+            # Rows may now differ from what the last delta sync saw; the next
+            # one compares against the inventory rows instead (core/sync.py)
+            self.db.execute("DELETE FROM catalog_hashes")
+            # New words go into the typo index now rather than on the next lookup
+            FuzzyIndex(self.db).refresh()
+
+        summary['inserted'] = after - before
+        summary['updated'] = summary['processed'] - summary['inserted']
+        return summary
+
+    def _import_chunk(self, chunk, positions, summary):
+        """Validate a chunk of rows and write it with executemany"""
+        keyed = []
+        unkeyed = []
+
+        for line_number, values in chunk:
+            try:
+                parsed = parse_row(values, positions)
+            except ValueError as e:
+                summary['rejected'].append((line_number, str(e)))
+                continue
+            if parsed is None:
+                continue
+
+            item_id, item_name, equipment, brand, stock, notes = parsed
+
+            if item_id:
+                keyed.append((item_id, item_name, equipment, brand, stock, stock, notes))
+            else:
+                unkeyed.append((item_name, equipment, brand, stock, notes))
+
+        if keyed:
+            self.db.executemany(UPSERT_BY_CATALOG_ID, keyed)
+        if unkeyed:
+            write_by_name(self.db, unkeyed)
+
+        summary['processed'] += len(keyed) + len(unkeyed)
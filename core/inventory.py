@@ -1,72 +1,163 @@
 # core/inventory.py - Fixed with absolute imports
-import csv
+import re
 import sys
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from config import FUZZY_CONFIG, INVENTORY_CONFIG, PAGINATION_CONFIG
 from database.connection import DatabaseConnection
+from core.fuzzy import FuzzyIndex
+from core.importer import CatalogImporter, print_rejected
+
+def build_match_query(search_term):
+    """Turn free text into an FTS5 query: every word must match as a prefix"""
+    words = re.findall(r'\w+', search_term)
+    return ' '.join(f'"{word}"*' for word in words)
 
 class InventoryManager:
-    def __init__(self):
-        self.db = DatabaseConnection()
+    def __init__(self, db=None):
+        self.db = db or DatabaseConnection()
+        self._search_index = None
     
-    def import_csv(self, csv_file):
+    def import_csv(self, csv_file, chunk_size=None):
         """Import inventory from CSV file"""
         try:
-            with open(csv_file, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                imported = 0
-                
-                for row in reader:
-                    # Skip header rows
-                    if row.get('Item Name', '') == 'Item Name':
-                        continue
-                    
-                    item_name = row.get('Item Name', '').strip()
-                    if not item_name:
-                        continue
-                    
-                    # Insert item
-                    self.db.execute('''
-                        INSERT OR REPLACE INTO inventory 
-                        (item_id, item_name, equipment, brand, stock, available, notes)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        row.get('Catalog ID', ''),
-                        item_name,
-                        row.get('Equipment', ''),
-                        row.get('Brand', ''),
-                        int(float(row.get('Stock', 0))),
-                        int(float(row.get('Stock', 0))),  # available = stock initially
-                        row.get('Notes', '')
-                    ))
-                    imported += 1
-                
-                print(f"✅ Imported {imported} items")
-                return True
+            importer = CatalogImporter(self.db, chunk_size, progress=self._print_progress)
+            summary = importer.import_file(csv_file)
         except Exception as e:
             print(f"❌ Import error: {e}")
             return False
+
+        print(f"✅ Imported {summary['processed']} items "
+              f"({summary['inserted']} new, {summary['updated']} updated)")
+
+        print_rejected(summary['rejected'])
+        return True
+    
+    def _print_progress(self, summary):
+        """Per-chunk import progress"""
+        print(f"   📦 Chunk {summary['chunks']}: {summary['processed']} rows, "
+              f"{len(summary['rejected'])} rejected")
+    
+    def has_search_index(self):
+        """True if the FTS5 search index exists (checked once)"""
+        if self._search_index is None:
+            self._search_index = self.db.fetchone(
+                "SELECT 1 FROM sqlite_master WHERE name = 'inventory_fts'"
+            ) is not None
+        return self._search_index
     
     def search_items(self, search_term=""):
-        """Search for items"""
-        if search_term:
+        """Search for items, best matches first.
+        
+        When that finds fewer than FUZZY_CONFIG['min_hits'] items, the
+        closest typo-tolerant matches follow the exact ones.
+        """
+        results = self._search(search_term)
+        if search_term and len(results) < FUZZY_CONFIG['min_hits']:
+            for item in self.suggest_items(search_term, exclude={item['id'] for item in results}):
+                item.pop('similarity')
+                results.append(item)
+        return results
+    
+    def suggest_items(self, search_term, limit=None, exclude=(), refresh=True):
+        """Typo-tolerant matches ("llave combinasion", "surtec"), each with a similarity"""
+        return FuzzyIndex(self.db).suggest(search_term, limit, exclude, refresh)
+    
+    def _search(self, search_term):
+        """Every word as a prefix: ranked FTS5 match, or a LIKE scan without FTS5.
+        
+        Discontinued items are left out here and in search_page.
+        """
+        match = build_match_query(search_term)
+        if match and self.has_search_index():
+            # bm25 weights: name, brand, equipment, notes, Catalog ID
+            results = self.db.fetchall('''
+                SELECT i.* FROM inventory_fts
+                JOIN inventory i ON i.id = inventory_fts.rowid
+                WHERE inventory_fts MATCH ? AND i.discontinued IS NULL
+                ORDER BY bm25(inventory_fts, 10.0, 4.0, 2.0, 1.0, 6.0), i.item_name
+            ''', (match,))
+        elif search_term:
             query = '''
                 SELECT * FROM inventory 
-                WHERE LOWER(item_name) LIKE ? 
+                WHERE (LOWER(item_name) LIKE ? 
                 OR LOWER(brand) LIKE ?
-                OR LOWER(equipment) LIKE ?
+                OR LOWER(equipment) LIKE ?)
+                AND discontinued IS NULL
                 ORDER BY item_name
             '''
             search_pattern = f'%{search_term.lower()}%'
             results = self.db.fetchall(query, (search_pattern, search_pattern, search_pattern))
         else:
-            results = self.db.fetchall("SELECT * FROM inventory ORDER BY item_name")
+            results = self.db.fetchall(
+                "SELECT * FROM inventory WHERE discontinued IS NULL ORDER BY item_name"
+            )
         
         return [dict(row) for row in results]
     
+    def search_page(self, search_term="", page_size=None, after=None):
+        """One page of search results.
+        
+        Returns (items, next_after). Pass next_after back as `after` for the
+        following page; None means this was the last one. Pages are keyset
+        paginated, so page 1000 costs the same as page 1. Ranked searches
+        page by (bm25 rank, id), everything else by (item_name, id).
+        """
+        page_size = page_size or PAGINATION_CONFIG['page_size']
+        match = build_match_query(search_term)
+        
+        if match and self.has_search_index():
+            query = '''
+                SELECT * FROM (
+                    SELECT i.*, bm25(inventory_fts, 10.0, 4.0, 2.0, 1.0, 6.0) AS rank
+                    FROM inventory_fts
+                    JOIN inventory i ON i.id = inventory_fts.rowid
+                    WHERE inventory_fts MATCH ?
+                )
+            '''
+            params = [match]
+            sort_key = ('rank', 'id')
+            conditions = ["discontinued IS NULL"]
+        else:
+            query = "SELECT * FROM inventory"
+            params = []
+            sort_key = ('item_name', 'id')
+            conditions = ["discontinued IS NULL"]
+            if search_term:
+                conditions.append("(LOWER(item_name) LIKE ? OR LOWER(brand) LIKE ? OR LOWER(equipment) LIKE ?)")
+                params += [f'%{search_term.lower()}%'] * 3
+        
+        if after is not None:
+            conditions.append(f"({sort_key[0]}, {sort_key[1]}) > (?, ?)")
+            params += list(after)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {sort_key[0]}, {sort_key[1]} LIMIT ?"
+        params.append(page_size + 1)
+        
+        rows = self.db.fetchall(query, params)
+        next_after = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_after = (rows[-1][sort_key[0]], rows[-1][sort_key[1]])
+        
+        items = [dict(row) for row in rows]
+        for item in items:
+            item.pop('rank', None)
+        return items, next_after
+    
+    def iter_items(self, search_term="", page_size=None):
+        """Yield matching items, fetching one page at a time"""
+        after = None
+        while True:
+            items, after = self.search_page(search_term, page_size, after)
+            yield from items
+            if after is None:
+                return
+    
     def add_item(self, item_data):
         """Add a new item"""
         try:
@@ -108,15 +199,81 @@ class InventoryManager:
         except Exception as e:
             return False, str(e)
     
-    def get_summary(self):
-        """Get inventory summary"""
-        total = self.db.fetchone("SELECT COUNT(*) as count, SUM(stock) as total FROM inventory")
-        available = self.db.fetchone("SELECT SUM(available) as total FROM inventory")
-        low_stock = self.db.fetchone("SELECT COUNT(*) as count FROM inventory WHERE available <= 2")
+    def get_summary(self, rebuild=True):
+        """Get inventory summary (a single-row read; triggers keep it current).
+        
+        Counters that are missing or kept for another threshold are rebuilt;
+        with rebuild=False, or on a read-only connection, they are counted
+        directly and nothing is written.
+        """
+        stats = self.db.fetchone("SELECT * FROM inventory_stats WHERE id = 1")
+        
+        # Threshold changed in config (or counters missing): recount once
+        if not self._stats_current(stats):
+            if rebuild and not self.db.read_only:
+                self.rebuild_stats()
+                stats = self.db.fetchone("SELECT * FROM inventory_stats WHERE id = 1")
+            else:
+                stats = self._count_stats(INVENTORY_CONFIG['low_stock_threshold'])
         
         return {
-            'total_items': total['count'] or 0,
-            'total_stock': total['total'] or 0,
-            'total_available': available['total'] or 0,
-            'low_stock_items': low_stock['count'] or 0
-        }
\ No newline at end of file
+            'total_items': stats['item_count'],
+            'total_stock': stats['total_stock'],
+            'total_available': stats['total_available'],
+            'low_stock_items': stats['low_stock_count']
+        }
+    
+    def stats_current(self):
+        """True if the summary counters exist and use the configured threshold"""
+        return self._stats_current(
+            self.db.fetchone("SELECT low_stock_threshold FROM inventory_stats WHERE id = 1")
+        )
+    
+    @staticmethod
+    def _stats_current(stats):
+        return stats is not None and stats['low_stock_threshold'] == INVENTORY_CONFIG['low_stock_threshold']
+    
+    def rebuild_stats(self):
+        """Recompute the summary counters from the inventory table"""
+        threshold = INVENTORY_CONFIG['low_stock_threshold']
+        with self.db.transaction(immediate=True):
+            # Not database.setup.rebuild_inventory_stats(): that is migration
+            # 006's recount, from before items could be discontinued
+            stats = self._count_stats(threshold)
+            self.db.execute('''
+                INSERT OR REPLACE INTO inventory_stats
+                (id, item_count, total_stock, total_available, low_stock_count, low_stock_threshold)
+                VALUES (1, ?, ?, ?, ?, ?)
+            ''', (stats['item_count'], stats['total_stock'], stats['total_available'],
+                  stats['low_stock_count'], threshold))
+    
+    def check_stats(self):
+        """Compare the summary counters with a full recount.
+        
+        Returns (consistent, differences) where differences maps each
+        mismatched counter to (stored, actual).
+        """
+        # One read transaction so both sides see the same snapshot
+        with self.db.transaction():
+            stats = self.db.fetchone("SELECT * FROM inventory_stats WHERE id = 1")
+            actual = self._count_stats(
+                stats['low_stock_threshold'] if stats else INVENTORY_CONFIG['low_stock_threshold']
+            )
+        
+        differences = {}
+        for key in actual.keys():
+            stored = stats[key] if stats else None
+            if stored != actual[key]:
+                differences[key] = (stored, actual[key])
+        return not differences, differences
+    
+    def _count_stats(self, threshold):
+        """The summary counters, counted from the inventory table (discontinued items left out)"""
+        return self.db.fetchone('''
+            SELECT COUNT(*) AS item_count,
+                   IFNULL(SUM(stock), 0) AS total_stock,
+                   IFNULL(SUM(available), 0) AS total_available,
+                   IFNULL(SUM(IFNULL(available, 0) <= ?), 0) AS low_stock_count
+            FROM inventory
+            WHERE discontinued IS NULL
+        ''', (threshold,))
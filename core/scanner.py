@@ -0,0 +1,227 @@
+# core/scanner.py - Barcode scanner mode: badge and Catalog ID scans written in batches
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import SCAN_CONFIG
+from database.connection import DatabaseConnection
+from core.checkout import CheckoutManager
+
+# "3*A0001234" scans three units at once
+_QUANTITY = re.compile(r'^(\d+)\*(.+)$')
+
+
+class CatalogIndex:
+    """Catalog ID -> (inventory id, item name), held in memory.
+
+    PRAGMA data_version changes when another connection commits; only
+    then is catalog_version (bumped by triggers when a Catalog ID or name
+    is added, removed or changed) read to decide whether to reload. Stock
+    moving at other workstations costs a pragma and a one-row read, not a
+    reload of the catalog.
+    """
+
+    def __init__(self, db=None):
+        self.db = db or DatabaseConnection()
+        self.items = {}
+        self.reloads = 0
+        self._data_version = None
+        self._catalog_version = None
+
+    def get(self, code):
+        """(id, item_name) for a Catalog ID, or None"""
+        data_version = self.db.fetchone("PRAGMA data_version")[0]
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self._reload_if_changed()
+        return self.items.get(code.strip().upper())
+
+    def _reload_if_changed(self):
+        with self.db.transaction():
+            version = self.db.fetchone("SELECT version FROM catalog_version WHERE id = 1")['version']
+            if version == self._catalog_version:
+                return
+            # Names repeat across the catalog; share one string per name
+            self.items = {
+                row['item_id'].strip().upper(): (row['id'], sys.intern(row['item_name']))
+                for row in self.db.fetchall(
+                    "SELECT id, item_id, item_name FROM inventory WHERE item_id <> ''"
+                )
+            }
+            self._catalog_version = version
+            self.reloads += 1
+
+
+class ScanSession:
+    """Turns a stream of scanned codes into checkouts and check-ins.
+
+    Scanning a badge selects whose scans follow; each Catalog ID after it
+    is one unit (N*CODE for N units). The checkout and checkin codes switch
+    direction. Codes are resolved in memory as they arrive, and the scans
+    are written batch_size at a time (or batch_ms after the first unwritten
+    one) in one transaction. Each scan is its own savepoint, so one that
+    can't be filled doesn't undo the rest of its batch.
+    """
+
+    def __init__(self, db=None, mode='out', location=None, report=print):
+        self.db = db or DatabaseConnection()
+        self.checkout = CheckoutManager(self.db)
+        self.catalog = CatalogIndex(self.db)
+        self.mode = mode
+        self.location = location or SCAN_CONFIG['location']
+        self.order_number = time.strftime('SCAN-%Y%m%d-%H%M%S')
+        self.report = report
+        self.badge = None
+        self.employee_name = None
+        self.pending = []
+        self.pending_since = None
+        self.summary = {'scans': 0, 'checked_out': 0, 'returned': 0, 'failed': 0, 'batches': 0}
+
+    def scan(self, line):
+        """Handle one scanned line; returns False for the end code"""
+        code = line.strip()
+        if not code:
+            return True
+        control = code.upper()
+        if control == SCAN_CONFIG['end_code']:
+            return False
+        if control in (SCAN_CONFIG['checkout_code'], SCAN_CONFIG['checkin_code']):
+            self.mode = 'out' if control == SCAN_CONFIG['checkout_code'] else 'in'
+            self.report(f"🔁 {'Checking out' if self.mode == 'out' else 'Returning'}")
+            return True
+
+        quantity = 1
+        match = _QUANTITY.match(code)
+        if match:
+            quantity, code = int(match[1]), match[2]
+
+        item = self.catalog.get(code)
+        if item is None and not match and self._select_employee(code):
+            return True
+        self.summary['scans'] += 1
+        if item is None:
+            self._failed(code, "Unknown code")
+            return True
+
+        if self.mode == 'out' and self.badge is None:
+            self._failed(code, "Scan a badge first")
+            return True
+
+        if not self.pending:
+            self.pending_since = time.monotonic()
+        self.pending.append((self.mode, item[0], item[1], quantity, self.badge, self.employee_name))
+        if len(self.pending) >= SCAN_CONFIG['batch_size']:
+            self.flush()
+        return True
+
+    def flush_due(self):
+        """Seconds until the pending scans should be written (None if there are none)"""
+        if not self.pending:
+            return None
+        return max(0.0, self.pending_since + SCAN_CONFIG['batch_ms'] / 1000 - time.monotonic())
+
+    def flush(self):
+        """Write the pending scans in one transaction and report each one"""
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+
+        outcomes = []
+        try:
+            with self.db.transaction(immediate=True):
+                for mode, item_id, item_name, quantity, badge, employee_name in batch:
+                    if mode == 'out':
+                        ok, message = self.checkout.checkout_item(
+                            item_id, badge, quantity, self.location, self.order_number
+                        )
+                        if ok:
+                            message = f"{quantity} x {item_name} -> {employee_name}"
+                    else:
+                        ok, message = self.checkout.checkin_item(item_id, quantity, badge)
+                    outcomes.append((mode, item_name, ok, message))
+        except sqlite3.Error as e:
+            outcomes = [(mode, item_name, False, f"Not saved: {e}")
+                        for mode, _, item_name, *_ in batch]
+
+        self.summary['batches'] += 1
+        for mode, item_name, ok, message in outcomes:
+            if not ok:
+                self._failed(item_name, message)
+            elif mode == 'out':
+                self.summary['checked_out'] += 1
+                self.report(f"✅ OUT {message}")
+            else:
+                self.summary['returned'] += 1
+                self.report(f"✅ IN  {message}")
+
+    def _select_employee(self, code):
+        """Make a scanned badge the current employee; False if it isn't one"""
+        employee_id = self.checkout.employees.get_id(code)
+        if employee_id is None:
+            return False
+        self.badge = code
+        self.employee_name = self.db.fetchone(
+            "SELECT employee_name FROM employees WHERE id = ?", (employee_id,)
+        )['employee_name']
+        self.report(f"👤 {self.employee_name}")
+        return True
+
+    def _failed(self, what, message):
+        self.summary['failed'] += 1
+        self.report(f"❌ {what}: {message}")
+
+
+def read_scans(stream, session):
+    """Feed lines from `stream` to the session until the end code or end of input.
+
+    Lines are read on a separate thread so pending scans are written once
+    batch_ms passes even while the scanner is idle.
+    """
+    lines = queue.Queue()
+
+    def reader():
+        for line in stream:
+            lines.put(line)
+            if line.strip().upper() == SCAN_CONFIG['end_code']:
+                break
+        lines.put(None)
+
+    threading.Thread(target=reader, name='scan-reader', daemon=True).start()
+    while True:
+        try:
+            line = lines.get(timeout=session.flush_due())
+        except queue.Empty:
+            session.flush()
+            continue
+        if line is None or not session.scan(line):
+            break
+    session.flush()
+
+
+def run_scan(argv, stream=None):
+    """scan [in|out] [location] from the CLI and main.py --scan"""
+    mode = 'out'
+    if argv and argv[0].lower() in ('in', 'out'):
+        mode = argv[0].lower()
+        argv = argv[1:]
+    session = ScanSession(mode=mode, location=" ".join(argv) or None)
+
+    print(f"📟 Scan mode ({'checking out' if mode == 'out' else 'returning'}): scan a badge, then items. "
+          f"{SCAN_CONFIG['checkin_code']}/{SCAN_CONFIG['checkout_code']} switch, "
+          f"{SCAN_CONFIG['end_code']} finishes.")
+    started = time.perf_counter()
+    read_scans(stream or sys.stdin, session)
+    elapsed = time.perf_counter() - started
+
+    summary = session.summary
+    rate = summary['scans'] / elapsed if elapsed else 0
+    print(f"📟 {summary['scans']} scans: {summary['checked_out']} out, {summary['returned']} returned, "
+          f"{summary['failed']} failed ({summary['batches']} batches, {rate:.0f} scans/s)")
+    return summary
@@ -0,0 +1,331 @@
+# core/sync.py - Delta catalog sync: write only the rows that changed since the last run
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import SYNC_CONFIG
+from database.connection import DatabaseConnection
+from core.fuzzy import FuzzyIndex
+from core.importer import (CSV_COLUMNS, UPSERT_BY_CATALOG_ID, column_positions, parse_row,
+                           print_rejected, write_by_name)
+
+# What happens to Catalog IDs that are no longer in the file
+MISSING_MODES = ('keep', 'discontinue', 'delete')
+
+
+def row_hash(item_name, equipment, brand, stock, notes):
+    """Digest of the catalog fields of one row"""
+    content = '\x1f'.join((item_name, equipment or '', brand or '', str(stock), notes or ''))
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+
+
+class CatalogSync:
+    """Nightly catalog imports that write only what changed.
+
+    catalog_hashes holds a digest of each Catalog ID's row as last synced.
+    Every chunk of the file is compared against it with one indexed read,
+    and only new and changed rows (and their digests) are written. A
+    Catalog ID without a digest, as on the first sync or after a full
+    import, is compared with its inventory row instead, and so is a row
+    without a Catalog ID (with the row of the same name and brand).
+    Local edits (update-stock) stand until the supplier's row changes.
+
+    Each chunk commits on its own along with the run's position in
+    sync_runs, so a run that dies part-way resumes after its last
+    committed chunk when started again on the same, unchanged file.
+    Items missing from the file (by Catalog ID, or by name and brand for
+    those without one) are handled once all of it has been read: kept,
+    discontinued, or deleted. Items that have ever been checked out are
+    discontinued rather than deleted, to keep their history.
+    """
+
+    def __init__(self, db=None, chunk_size=None, missing=None, progress=None):
+        self.db = db or DatabaseConnection()
+        self.chunk_size = chunk_size or SYNC_CONFIG['chunk_size']
+        self.missing = missing or SYNC_CONFIG['missing']
+        if self.missing not in MISSING_MODES:
+            raise ValueError(f"missing must be one of: {', '.join(MISSING_MODES)}")
+        self.progress = progress
+
+    def sync_file(self, csv_file):
+        """Sync a CSV file, resuming an interrupted run of it; returns a summary dict"""
+        stat = os.stat(csv_file)
+        with open(csv_file, 'r', encoding='utf-8', newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            return self.sync_rows(reader, header, str(Path(csv_file).resolve()),
+                                  f"{stat.st_size}:{stat.st_mtime_ns}")
+
+    def sync_rows(self, rows, header=CSV_COLUMNS, source='', fingerprint=None):
+        """Sync an iterable of CSV value lists.
+
+        A run can only be resumed when a fingerprint identifies the input.
+        The summary counts rows as inserted, updated or unchanged (unkeyed
+        of them had no Catalog ID), and items missing from the input as
+        missing, discontinued and deleted.
+        """
+        positions = column_positions(header)
+        run = self._start_run(source, fingerprint)
+        summary = {
+            'processed': 0,
+            'inserted': run['inserted'],
+            'updated': run['updated'],
+            'unchanged': run['unchanged'],
+            'unkeyed': 0,
+            'missing': 0,
+            'discontinued': 0,
+            'deleted': 0,
+            'rejected': [],
+            'chunks': 0,
+            'resumed': run['rows']
+        }
+        seen = set()
+        seen_names = set()
+
+        # Line numbers as seen in the file, after the header
+        numbered = enumerate(rows, start=2)
+        while True:
+            chunk = list(islice(numbered, self.chunk_size))
+            if not chunk:
+                break
+            keyed, unkeyed = self._parse_chunk(chunk, positions, summary, seen, seen_names,
+                                               run['rows'])
+            if keyed or unkeyed:
+                with self.db.transaction(immediate=True):
+                    self._apply_chunk(keyed, unkeyed, summary)
+                    self.db.execute('''
+                        UPDATE sync_runs SET rows = ?, inserted = ?, updated = ?, unchanged = ?
+                        WHERE id = ?
+                    ''', (chunk[-1][0] - 1, summary['inserted'], summary['updated'],
+                          summary['unchanged'], run['id']))
+                summary['chunks'] += 1
+                if self.progress:
+                    self.progress(summary)
+
+        with self.db.transaction(immediate=True):
+            self._handle_missing(seen, seen_names, summary)
+            self.db.execute('''
+                UPDATE sync_runs SET finished_at = CURRENT_TIMESTAMP, discontinued = ?, deleted = ?
+                WHERE id = ?
+            ''', (summary['discontinued'], summary['deleted'], run['id']))
+        # New words go into the typo index now rather than on the next lookup
+        FuzzyIndex(self.db).refresh()
+        return summary
+
+    def _start_run(self, source, fingerprint):
+        """The unfinished run of this same input, or a new one"""
+        with self.db.transaction(immediate=True):
+            run = None
+            if fingerprint:
+                run = self.db.fetchone('''
+                    SELECT * FROM sync_runs
+                    WHERE source = ? AND fingerprint = ? AND finished_at IS NULL
+                    ORDER BY id DESC LIMIT 1
+                ''', (source, fingerprint))
+            if run is None:
+                run_id = self.db.execute(
+                    "INSERT INTO sync_runs (source, fingerprint) VALUES (?, ?)",
+                    (source, fingerprint or '')
+                ).lastrowid
+                run = self.db.fetchone("SELECT * FROM sync_runs WHERE id = ?", (run_id,))
+            return dict(run)
+
+    def _parse_chunk(self, chunk, positions, summary, seen, seen_names, committed):
+        """Validate a chunk; returns the rows past `committed` still to apply.
+
+        keyed maps Catalog ID -> (row, digest) and unkeyed (name, brand) ->
+        row, the last row winning like the upsert would; every Catalog ID
+        goes into `seen` and the (name, brand) of every row without one
+        into `seen_names`.
+        """
+        keyed = {}
+        unkeyed = {}
+        for line_number, values in chunk:
+            try:
+                parsed = parse_row(values, positions)
+            except ValueError as e:
+                summary['rejected'].append((line_number, str(e)))
+                continue
+            if parsed is None:
+                continue
+
+            summary['processed'] += 1
+            item_id, item_name, equipment, brand, stock, notes = parsed
+            if item_id:
+                seen.add(item_id)
+            else:
+                seen_names.add((item_name, brand))
+                summary['unkeyed'] += 1
+            # Committed by the run being resumed
+            if line_number - 1 <= committed:
+                continue
+            if item_id:
+                keyed[item_id] = (parsed, row_hash(item_name, equipment, brand, stock, notes))
+            else:
+                unkeyed[item_name, brand] = (item_name, equipment, brand, stock, notes)
+        return keyed, list(unkeyed.values())
+
+    def _apply_chunk(self, keyed, unkeyed, summary):
+        """Write the new and changed rows of a chunk (inside its transaction)"""
+        batch = (json.dumps(list(keyed)),)
+        stored = {row['item_id']: row['hash'] for row in self.db.fetchall(
+            "SELECT item_id, hash FROM catalog_hashes WHERE item_id IN (SELECT value FROM json_each(?))",
+            batch
+        )}
+        current = {}
+        unknown = [item_id for item_id in keyed if item_id not in stored]
+        if unknown:
+            for row in self.db.fetchall('''
+                SELECT item_id, item_name, equipment, brand, stock, notes, discontinued
+                FROM inventory
+                WHERE item_id IN (SELECT value FROM json_each(?))
+            ''', (json.dumps(unknown),)):
+                # A discontinued item in the file again always counts as changed
+                current[row['item_id']] = None if row['discontinued'] else row_hash(
+                    row['item_name'], row['equipment'], row['brand'], row['stock'], row['notes']
+                )
+
+        changed = []
+        hashes = []
+        for item_id, (parsed, digest) in keyed.items():
+            if item_id in stored or item_id in current:
+                previous = stored.get(item_id, current.get(item_id))
+                if previous == digest:
+                    summary['unchanged'] += 1
+                    if item_id not in stored:
+                        hashes.append((item_id, digest))
+                    continue
+                summary['updated'] += 1
+            else:
+                summary['inserted'] += 1
+            item_id, item_name, equipment, brand, stock, notes = parsed
+            changed.append((item_id, item_name, equipment, brand, stock, stock, notes))
+            hashes.append((item_id, digest))
+
+        if changed:
+            self.db.executemany(UPSERT_BY_CATALOG_ID, changed)
+        if hashes:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO catalog_hashes (item_id, hash) VALUES (?, ?)", hashes
+            )
+        if unkeyed:
+            self._apply_unkeyed(unkeyed, summary)
+
+    def _apply_unkeyed(self, unkeyed, summary):
+        """Write the rows without a Catalog ID that differ from their name and brand's row"""
+        # A discontinued item in the file again counts as changed, as with Catalog IDs
+        current = {
+            (row['item_name'], row['brand'] or ''): b'' if row['discontinued'] else row_hash(
+                row['item_name'], row['equipment'], row['brand'], row['stock'], row['notes']
+            )
+            for row in self.db.fetchall('''
+                SELECT i.item_name, i.equipment, i.brand, i.stock, i.notes, i.discontinued
+                FROM json_each(?) AS k
+                JOIN inventory i
+                    ON i.item_name = json_extract(k.value, '$[0]')
+                    AND IFNULL(i.brand, '') = json_extract(k.value, '$[1]')
+                    AND IFNULL(i.item_id, '') = ''
+            ''', (json.dumps([(row[0], row[2]) for row in unkeyed]),))
+        }
+        changed = []
+        for row in unkeyed:
+            previous = current.get((row[0], row[2]))
+            if previous == row_hash(*row):
+                summary['unchanged'] += 1
+                continue
+            summary['updated' if previous is not None else 'inserted'] += 1
+            changed.append(row)
+        if changed:
+            write_by_name(self.db, changed)
+
+    def _handle_missing(self, seen, seen_names, summary):
+        """Count, and unless keeping them discontinue or delete, items not in the file.
+
+        Items with a Catalog ID are missing when it isn't in `seen`, the
+        others when their (name, brand) isn't in `seen_names`.
+        """
+        # An empty file would empty the catalog, and one without a single
+        # Catalog ID (wrong header?) every item that has one
+        if not seen and not seen_names:
+            return
+        gone = []
+        gone_ids = []
+        for row in self.db.fetchall(
+            "SELECT id, item_id, item_name, brand FROM inventory WHERE discontinued IS NULL"
+        ):
+            if not row['item_id']:
+                if (row['item_name'], row['brand'] or '') not in seen_names:
+                    gone.append(row['id'])
+            elif seen and row['item_id'] not in seen:
+                gone.append(row['id'])
+                gone_ids.append(row['item_id'])
+        summary['missing'] = len(gone)
+        if not gone or self.missing == 'keep':
+            return
+
+        batch = (json.dumps(gone),)
+        if self.missing == 'delete':
+            summary['deleted'] = self.db.execute('''
+                DELETE FROM inventory
+                WHERE id IN (SELECT value FROM json_each(?))
+                    AND NOT EXISTS (SELECT 1 FROM checkouts c WHERE c.item_id = inventory.id)
+                    AND NOT EXISTS (SELECT 1 FROM checkouts_archive a WHERE a.item_id = inventory.id)
+            ''', batch).rowcount
+        summary['discontinued'] = self.db.execute('''
+            UPDATE inventory SET discontinued = CURRENT_TIMESTAMP
+            WHERE id IN (SELECT value FROM json_each(?)) AND discontinued IS NULL
+        ''', batch).rowcount
+        # Back in a later file, they are compared (and revived) as changed rows
+        self.db.execute(
+            "DELETE FROM catalog_hashes WHERE item_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(gone_ids),)
+        )
+
+
+def run_sync(argv):
+    """import FILE --delta [--discontinue-missing | --delete-missing] (CLI and main.py --import)"""
+    files = [arg for arg in argv if not arg.startswith('--')]
+    if len(files) != 1:
+        print("Usage: import [filename.csv] --delta [--discontinue-missing | --delete-missing]")
+        return None
+    missing = None
+    if '--delete-missing' in argv:
+        missing = 'delete'
+    elif '--discontinue-missing' in argv:
+        missing = 'discontinue'
+
+    started = time.perf_counter()
+    try:
+        summary = CatalogSync(
+            missing=missing,
+            progress=lambda s: print(f"   📦 Chunk {s['chunks']}: {s['processed']} rows, "
+                                     f"{s['inserted'] + s['updated']} changed")
+        ).sync_file(files[0])
+    except (OSError, sqlite3.Error) as e:
+        print(f"❌ Import error: {e}")
+        return None
+    elapsed = time.perf_counter() - started
+
+    if summary['resumed']:
+        print(f"↩️ Resumed after row {summary['resumed']} of an interrupted sync")
+    print(f"✅ Synced {summary['processed']} rows in {elapsed:.1f}s: {summary['inserted']} new, "
+          f"{summary['updated']} updated, {summary['unchanged']} unchanged"
+          + (f", {summary['unkeyed']} without Catalog ID" if summary['unkeyed'] else ""))
+    if summary['missing']:
+        if summary['discontinued'] or summary['deleted']:
+            print(f"🗑️ {summary['missing']} items no longer in the catalog: "
+                  f"{summary['discontinued']} discontinued, {summary['deleted']} deleted")
+        else:
+            print(f"ℹ️ {summary['missing']} items no longer in the catalog were kept "
+                  f"(--discontinue-missing or --delete-missing to remove them)")
+    print_rejected(summary['rejected'])
+    return summary
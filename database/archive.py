@@ -0,0 +1,107 @@
+# database/archive.py - Move old returned checkouts out of the hot checkouts table
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import ARCHIVE_CONFIG
+from database.connection import DatabaseConnection
+
+# Columns copied as-is; ids are kept, so checkout_history has one row per checkout
+ARCHIVE_COLUMNS = ('id, item_id, employee_id, quantity, checkout_date, expected_return, '
+                   'actual_return, location, order_number, status')
+
+
+class CheckoutArchiver:
+    """Keeps `checkouts` proportional to what is out (or recently back).
+
+    Returned checkouts whose actual_return is older than after_days move
+    to checkouts_archive, batch_size rows per transaction, so check-outs
+    and check-ins are never blocked for long. The checkout_history view is
+    the union of both tables for anything historical (exports, analytics).
+    """
+
+    def __init__(self, db=None, after_days=None, batch_size=None, progress=None):
+        self.db = db or DatabaseConnection()
+        self.after_days = after_days if after_days is not None else ARCHIVE_CONFIG['after_days']
+        self.batch_size = batch_size or ARCHIVE_CONFIG['batch_size']
+        self.progress = progress
+
+    def cutoff(self):
+        """Returns before this timestamp are archived (database clock)"""
+        return self.db.fetchone(
+            "SELECT datetime('now', ?) AS cutoff", (f"-{int(self.after_days)} days",)
+        )['cutoff']
+
+    def pending(self):
+        """How many checkouts the next run would archive"""
+        return self.db.fetchone(
+            "SELECT COUNT(*) AS count FROM checkouts WHERE actual_return < ? AND status = 'returned'",
+            (self.cutoff(),)
+        )['count']
+
+    def archive(self):
+        """Archive in batches; returns a summary dict (archived, batches, cutoff, remaining)"""
+        cutoff = self.cutoff()
+        summary = {'archived': 0, 'batches': 0, 'cutoff': cutoff}
+        while True:
+            with self.db.transaction(immediate=True):
+                # Oldest returns first, straight off the actual_return index.
+                # The same predicate as the move below: a batch is never empty
+                # while eligible rows remain behind rows that cannot move
+                ids = [row['id'] for row in self.db.fetchall('''
+                    SELECT id FROM checkouts
+                    WHERE actual_return < ? AND status = 'returned'
+                    ORDER BY actual_return
+                    LIMIT ?
+                ''', (cutoff, self.batch_size))]
+                if not ids:
+                    break
+                batch = (json.dumps(ids),)
+                self.db.execute(f'''
+                    INSERT OR IGNORE INTO checkouts_archive ({ARCHIVE_COLUMNS})
+                    SELECT {ARCHIVE_COLUMNS} FROM checkouts
+                    WHERE id IN (SELECT value FROM json_each(?)) AND status = 'returned'
+                ''', batch)
+                moved = self.db.execute('''
+                    DELETE FROM checkouts
+                    WHERE id IN (SELECT value FROM json_each(?)) AND status = 'returned'
+                ''', batch).rowcount
+            if not moved:
+                break
+
+            summary['archived'] += moved
+            summary['batches'] += 1
+            if self.progress:
+                self.progress(summary)
+
+        if summary['archived']:
+            # Let the planner see the hot table's new, much smaller size
+            self.db.execute("PRAGMA optimize")
+        summary['remaining'] = self.db.fetchone("SELECT COUNT(*) AS count FROM checkouts")['count']
+        return summary
+
+
+def run_archive(argv):
+    """archive [days] [--dry-run] from the CLI and main.py --archive"""
+    dry_run = '--dry-run' in argv
+    days = [arg for arg in argv if arg != '--dry-run']
+    try:
+        archiver = CheckoutArchiver(
+            after_days=int(days[0]) if days else None,
+            progress=lambda s: print(f"   📦 Batch {s['batches']}: {s['archived']} archived")
+        )
+    except ValueError:
+        print("Usage: archive [days] [--dry-run]")
+        return None
+
+    if dry_run:
+        print(f"{archiver.pending()} returned checkouts are older than {archiver.after_days} days")
+        return None
+
+    summary = archiver.archive()
+    print(f"✅ Archived {summary['archived']} checkouts returned before {summary['cutoff']} "
+          f"({summary['remaining']} left in checkouts)")
+    return summary
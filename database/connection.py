@@ -1,5 +1,8 @@
-# database/connection.py - Fixed with absolute imports
+# database/connection.py - Pooled SQLite connections with tuned pragmas
+import atexit
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
 import sys
 from pathlib import Path
@@ -7,43 +10,210 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from config import DATABASE_CONFIG, DEFAULT_DB
+from config import DATABASE_CONFIG, DEFAULT_DB, DATABASE_SETTINGS, QUERY_STATS
+from database.instrumentation import query_stats, trace_statement
+
+# One long-lived connection per (thread, database file). Every
+# DatabaseConnection pointing at the same file shares it, so the inventory,
+# checkout and LLM managers don't each keep their own.
+_local = threading.local()
+_open_connections = []
+_open_lock = threading.Lock()
+
+
+class _PooledConnection:
+    """A pooled sqlite3 connection plus its transaction nesting depth.
+
+    conn is None once close_all() has closed it; the owning thread opens
+    a new one on its next use.
+    """
+    __slots__ = ('conn', 'depth')
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.depth = 0
+
+
+def _open_connection(db_path, read_only=False):
+    """Open a connection and apply the configured pragmas"""
+    if read_only:
+        # mode=ro: SQLite itself refuses every write on this connection
+        target, uri = Path(db_path).resolve().as_uri() + "?mode=ro", True
+    else:
+        target, uri = str(db_path), False
+    conn = sqlite3.connect(
+        target,
+        uri=uri,
+        isolation_level=None,  # autocommit; transactions are explicit
+        check_same_thread=False,  # only so close_all() can run at exit
+        cached_statements=DATABASE_SETTINGS['cached_statements']
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {int(DATABASE_SETTINGS['busy_timeout'])}")
+    if read_only:
+        conn.execute("PRAGMA query_only = 1")
+    else:
+        conn.execute(f"PRAGMA journal_mode = {DATABASE_SETTINGS['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous = {DATABASE_SETTINGS['synchronous']}")
+    conn.execute(f"PRAGMA cache_size = {int(DATABASE_SETTINGS['cache_size'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(DATABASE_SETTINGS['mmap_size'])}")
+    if QUERY_STATS['trace']:
+        conn.set_trace_callback(trace_statement)
+    query_stats.connection_opened(db_path)
+    return conn
+
+
+def _record(conn, query, params, seconds):
+    """Report a statement's time; slow ones also go to the slow-query log"""
+    query_stats.record(query, seconds)
+    if seconds >= query_stats.slow_seconds:
+        query_stats.record_slow(conn, query, params, seconds)
+
+
+def _run(conn, query, params=()):
+    """conn.execute, timed when instrumentation is on"""
+    if not query_stats.enabled:
+        return conn.execute(query, params)
+    start = time.perf_counter()
+    cursor = conn.execute(query, params)
+    _record(conn, query, params, time.perf_counter() - start)
+    return cursor
+
+
+def close_all():
+    """Close every pooled connection (all threads)"""
+    with _open_lock:
+        while _open_connections:
+            pooled = _open_connections.pop()
+            try:
+                pooled.conn.close()
+            except sqlite3.Error:
+                pass
+            # Other threads still hold this entry in their thread-local pool
+            pooled.conn = None
+    _local.__dict__.clear()
+
+
+atexit.register(close_all)
+
 
 class DatabaseConnection:
-    def __init__(self, db_type=DEFAULT_DB):
-        self.db_path = DATABASE_CONFIG[db_type]['path']
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-    
+    def __init__(self, db_type=DEFAULT_DB, db_path=None, read_only=False):
+        # db_path points at a side database (e.g. the LLM cache) instead
+        self.db_path = Path(db_path) if db_path else DATABASE_CONFIG[db_type]['path']
+        self.read_only = read_only
+        if not read_only:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _pool_key(self):
+        """Read-only and read-write connections to one file are pooled apart"""
+        return str(self.db_path) + ("?mode=ro" if self.read_only else "")
+
+    def _pooled(self):
+        """Get (or open) this thread's pooled connection for our database"""
+        pool = getattr(_local, 'pool', None)
+        if pool is None:
+            pool = _local.pool = {}
+        key = self._pool_key()
+        pooled = pool.get(key)
+        if pooled is None or pooled.conn is None:
+            pooled = pool[key] = _PooledConnection(_open_connection(self.db_path, self.read_only))
+            with _open_lock:
+                _open_connections.append(pooled)
+        return pooled
+
     @contextmanager
     def get_connection(self):
-        """Get a database connection"""
-        conn = None
+        """Get a database connection (pooled; not closed on exit)"""
+        yield self._pooled().conn
+
+    @contextmanager
+    def transaction(self, immediate=False):
+        """Group statements into one transaction.
+
+        Commits on success and rolls back on any exception. Nested calls
+        become savepoints, so an inner failure only undoes the inner block.
+        Use immediate=True to take the write lock up front (BEGIN IMMEDIATE).
+        """
+        pooled = self._pooled()
+        conn = pooled.conn
+        depth = pooled.depth
+        savepoint = f"sp_{depth}"
+
+        if depth == 0:
+            # Timed: BEGIN IMMEDIATE includes waiting for the write lock
+            _run(conn, "BEGIN IMMEDIATE" if immediate else "BEGIN")
+        else:
+            conn.execute(f"SAVEPOINT {savepoint}")
+        pooled.depth += 1
+
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            conn.row_factory = sqlite3.Row
             yield conn
-        finally:
-            if conn:
-                conn.close()
-    
+        except BaseException:
+            pooled.depth -= 1
+            if depth == 0:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+            elif conn.in_transaction:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+
+        pooled.depth -= 1
+        if depth == 0:
+            try:
+                _run(conn, "COMMIT")
+            except sqlite3.Error:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        else:
+            conn.execute(f"RELEASE {savepoint}")
+
+    def in_transaction(self):
+        """True if this thread has an open transaction on our database"""
+        return self._pooled().depth > 0
+
+    def close(self):
+        """Close this thread's connection to our database"""
+        pool = getattr(_local, 'pool', {})
+        pooled = pool.pop(self._pool_key(), None)
+        if pooled is not None:
+            with _open_lock:
+                if pooled in _open_connections:
+                    _open_connections.remove(pooled)
+            if pooled.conn is not None:
+                pooled.conn.close()
+
     def execute(self, query, params=()):
-        """Execute a query"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
-            return cursor
-    
+        """Execute a query (auto-committed unless inside transaction())"""
+        return _run(self._pooled().conn, query, params)
+
+    def executemany(self, query, seq_of_params):
+        """Execute a query once per parameter set"""
+        conn = self._pooled().conn
+        if not query_stats.enabled:
+            return conn.executemany(query, seq_of_params)
+        start = time.perf_counter()
+        cursor = conn.executemany(query, seq_of_params)
+        seconds = time.perf_counter() - start
+        query_stats.record(query, seconds)
+        if seconds >= query_stats.slow_seconds:
+            # The first parameter set is enough for the query plan
+            first = seq_of_params[0] if isinstance(seq_of_params, (list, tuple)) and seq_of_params else None
+            query_stats.record_slow(conn, query, first, seconds)
+        return cursor
+
     def fetchall(self, query, params=()):
         """Get all results from a query"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            return cursor.fetchall()
-    
+        conn = self._pooled().conn
+        if not query_stats.enabled:
+            return conn.execute(query, params).fetchall()
+        start = time.perf_counter()
+        rows = conn.execute(query, params).fetchall()
+        _record(conn, query, params, time.perf_counter() - start)
+        return rows
+
     def fetchone(self, query, params=()):
         """Get one result from a query"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            return cursor.fetchone()
\ No newline at end of file
+        return _run(self._pooled().conn, query, params).fetchone()
@@ -0,0 +1,223 @@
+# database/instrumentation.py - Per-statement timing, slow-query log and metrics export
+import atexit
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import QUERY_STATS
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+_EXPLAINABLE = ('select', 'with', 'insert', 'update', 'delete', 'replace')
+
+
+def fingerprint(sql):
+    """Normalized form of a statement: literals -> ?, IN lists collapsed, one line"""
+    text = _STRING_LITERAL.sub('?', sql)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = _PLACEHOLDER_LIST.sub('(?)', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+class _StatementStats:
+    __slots__ = ('count', 'total', 'max', 'samples')
+
+    def __init__(self, samples):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=samples)
+
+
+class QueryStats:
+    """Process-wide query timings keyed by statement fingerprint.
+
+    DatabaseConnection reports every statement it runs; statements that
+    take longer than slow_query_ms go to the slow-query log (JSON lines)
+    together with their EXPLAIN QUERY PLAN, captured once per fingerprint.
+    """
+
+    def __init__(self, settings=None):
+        settings = settings or QUERY_STATS
+        self.enabled = settings['enabled']
+        self.slow_seconds = settings['slow_query_ms'] / 1000
+        self.slow_log = settings['slow_log']
+        self.sample_size = settings['samples']
+        self.statements = {}
+        self.connections_opened = {}
+        self.slow_queries = deque(maxlen=50)
+        self.slow_total = 0
+        self._plans = {}
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, sql):
+        """Cached fingerprint (the same SQL strings come back constantly)"""
+        found = self._fingerprints.get(sql)
+        if found is None:
+            found = fingerprint(sql)
+            if len(self._fingerprints) < 10000:
+                self._fingerprints[sql] = found
+        return found
+
+    def record(self, sql, seconds):
+        """Add one execution of a statement"""
+        key = self.fingerprint(sql)
+        with self._lock:
+            stats = self.statements.get(key)
+            if stats is None:
+                stats = self.statements[key] = _StatementStats(self.sample_size)
+            stats.count += 1
+            stats.total += seconds
+            stats.samples.append(seconds)
+            if seconds > stats.max:
+                stats.max = seconds
+        return key
+
+    def record_slow(self, conn, sql, params, seconds):
+        """Log a slow statement, with its query plan"""
+        key = self.fingerprint(sql)
+        plan = self._plans.get(key)
+        if plan is None and sql.lstrip()[:7].lower().startswith(_EXPLAINABLE):
+            try:
+                plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params or ())]
+            except Exception as e:
+                plan = [f"(no plan: {e})"]
+            self._plans[key] = plan
+
+        entry = {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'ms': round(seconds * 1000, 2),
+            'query': key,
+            'plan': plan or []
+        }
+        with self._lock:
+            self.slow_total += 1
+            self.slow_queries.append(entry)
+            if self.slow_log:
+                try:
+                    with open(self.slow_log, 'a', encoding='utf-8') as log:
+                        log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                except OSError:
+                    pass
+
+    def connection_opened(self, db_path):
+        with self._lock:
+            name = Path(db_path).name
+            self.connections_opened[name] = self.connections_opened.get(name, 0) + 1
+
+    def top(self, limit=10, order_by='total'):
+        """Busiest statements: dicts with query, count, total_ms, avg_ms, p95_ms, max_ms"""
+        with self._lock:
+            rows = [
+                (key, stats.count, stats.total, stats.max, sorted(stats.samples))
+                for key, stats in self.statements.items()
+            ]
+        report = []
+        for key, count, total, longest, samples in rows:
+            p95 = samples[min(len(samples) - 1, int(0.95 * len(samples)))] if samples else 0.0
+            report.append({
+                'query': key,
+                'count': count,
+                'total_ms': total * 1000,
+                'avg_ms': total / count * 1000,
+                'p95_ms': p95 * 1000,
+                'max_ms': longest * 1000
+            })
+        report.sort(key=lambda row: row[f'{order_by}_ms' if order_by != 'count' else 'count'],
+                    reverse=True)
+        return report[:limit]
+
+    def reset(self):
+        """Forget all timings (connection-open counts are kept)"""
+        with self._lock:
+            self.statements.clear()
+            self.slow_queries.clear()
+            self.slow_total = 0
+            self._plans.clear()
+
+    def export_prometheus(self, path=None, limit=50):
+        """Write metrics in Prometheus text format (for the node_exporter textfile collector).
+
+        The file is replaced atomically so the collector never reads half of it.
+        """
+        path = Path(path or QUERY_STATS['prometheus_file'])
+        lines = [
+            "# HELP inventory_query_count_total Statements executed, by fingerprint.",
+            "# TYPE inventory_query_count_total counter",
+        ]
+        top = self.top(limit)
+        for row in top:
+            lines.append(f"inventory_query_count_total{{{_labels(row['query'])}}} {row['count']}")
+        lines += [
+            "# HELP inventory_query_seconds_total Time spent in statements, by fingerprint.",
+            "# TYPE inventory_query_seconds_total counter",
+        ]
+        for row in top:
+            lines.append(
+                f"inventory_query_seconds_total{{{_labels(row['query'])}}} {row['total_ms'] / 1000:.6f}"
+            )
+        lines += [
+            "# HELP inventory_query_p95_seconds 95th percentile statement latency (recent samples).",
+            "# TYPE inventory_query_p95_seconds gauge",
+        ]
+        for row in top:
+            lines.append(
+                f"inventory_query_p95_seconds{{{_labels(row['query'])}}} {row['p95_ms'] / 1000:.6f}"
+            )
+        lines += [
+            "# HELP inventory_db_connections_opened_total SQLite connections opened, by database file.",
+            "# TYPE inventory_db_connections_opened_total counter",
+        ]
+        for name, count in sorted(self.connections_opened.items()):
+            lines.append(f'inventory_db_connections_opened_total{{db="{_escape(name)}"}} {count}')
+        lines += [
+            "# HELP inventory_slow_queries_total Statements slower than the slow-query threshold.",
+            "# TYPE inventory_slow_queries_total counter",
+            f"inventory_slow_queries_total {self.slow_total}",
+        ]
+
+        temp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(temp, 'w', encoding='utf-8') as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(temp, path)
+        return path
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(query):
+    """query_id (stable short hash) plus the statement, shortened"""
+    query_id = hashlib.sha1(query.encode('utf-8')).hexdigest()[:10]
+    return f'query_id="{query_id}",query="{_escape(query[:120])}"'
+
+
+def trace_statement(statement):
+    """sqlite3 trace callback: echo every statement SQLite runs (triggers included)"""
+    print(f"[sql] {statement}", file=sys.stderr)
+
+
+def export_at_exit():
+    """Leave the final numbers for the textfile collector"""
+    try:
+        query_stats.export_prometheus()
+    except OSError:
+        pass
+
+
+query_stats = QueryStats()
+if QUERY_STATS['prometheus_file']:
+    atexit.register(export_at_exit)
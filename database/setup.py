@@ -1,4 +1,5 @@
 # database/setup.py - Fixed with absolute imports
+import sqlite3
 import sys
 from pathlib import Path
 
@@ -6,11 +7,38 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from database.connection import DatabaseConnection
-from config import DEFAULT_EMPLOYEES
+from config import DEFAULT_EMPLOYEES, INVENTORY_CONFIG
+from utils.text import normalize_name
 
 def create_tables(db_connection):
-    """Create all database tables"""
+    """Bring the database schema up to date.
+
+    PRAGMA user_version records the last migration applied, so on an
+    up-to-date database this is a single pragma read and no DDL.
+    """
+    version = get_schema_version(db_connection)
+    if version >= SCHEMA_VERSION:
+        return False
+    
+    for number, migration in MIGRATIONS:
+        if number <= version:
+            continue
+        with db_connection.transaction(immediate=True):
+            # Another process may have migrated while we waited for the lock
+            if get_schema_version(db_connection) >= number:
+                continue
+            migration(db_connection)
+            db_connection.execute(f"PRAGMA user_version = {number}")
     
+    print(f"✅ Database schema upgraded to version {SCHEMA_VERSION}", file=sys.stderr)
+    return True
+
+def get_schema_version(db_connection):
+    """Number of the last migration applied to this database"""
+    return db_connection.fetchone("PRAGMA user_version")[0]
+
+def migration_001_base_tables(db_connection):
+    """Inventory, employees and checkouts tables plus default employees"""
     # Create inventory table
     db_connection.execute('''
         CREATE TABLE IF NOT EXISTS inventory (
@@ -63,5 +91,577 @@ def create_tables(db_connection):
                 "INSERT INTO employees (employee_name, employee_id, department) VALUES (?, ?, ?)",
                 (name, emp_id, dept)
             )
+
+
+def migration_002_unique_catalog_ids(db_connection):
+    """Catalog IDs must be unique for imports to upsert instead of duplicating"""
+    db_connection.execute(
+        "UPDATE inventory SET item_id = TRIM(item_id) WHERE item_id <> TRIM(item_id)"
+    )
+    merge_duplicate_catalog_ids(db_connection)
+    db_connection.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_inventory_item_id
+        ON inventory(item_id) WHERE item_id <> ''
+    ''')
+    
+    # Items without a Catalog ID are matched on name during import
+    db_connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_inventory_item_name ON inventory(item_name)"
+    )
+
+def migration_003_search_index(db_connection):
+    """Full-text search index (skipped when SQLite lacks FTS5)"""
+    create_search_index(db_connection)
+
+def migration_004_lookup_indexes(db_connection):
+    """Secondary indexes for the checkout, check-in and employee lookups"""
+    # Active checkouts of an item, newest first (checkin_item)
+    db_connection.execute('''
+        CREATE INDEX IF NOT EXISTS idx_checkouts_item_status_date
+        ON checkouts(item_id, status, checkout_date)
+    ''')
+    # All active checkouts (get_active_checkouts)
+    db_connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_checkouts_status ON checkouts(status)"
+    )
+    # Case-insensitive employee lookup by name
+    db_connection.execute('''
+        CREATE INDEX IF NOT EXISTS idx_employees_name_nocase
+        ON employees(employee_name COLLATE NOCASE)
+    ''')
+    # Exact Catalog ID lookups (the unique index above is partial)
+    db_connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_inventory_catalog_id ON inventory(item_id)"
+    )
+
+def migration_005_employee_keys(db_connection):
+    """Accent/case-folded employee name key and badge code index"""
+    columns = [row['name'] for row in db_connection.fetchall("PRAGMA table_info(employees)")]
+    if 'name_key' not in columns:
+        db_connection.execute("ALTER TABLE employees ADD COLUMN name_key TEXT")
+    
+    rows = db_connection.fetchall("SELECT id, employee_name FROM employees")
+    db_connection.executemany(
+        "UPDATE employees SET name_key = ? WHERE id = ?",
+        [(normalize_name(row['employee_name']), row['id']) for row in rows]
+    )
+    db_connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_employees_name_key ON employees(name_key)"
+    )
+    db_connection.execute('''
+        CREATE INDEX IF NOT EXISTS idx_employees_badge
+        ON employees(employee_id COLLATE NOCASE)
+    ''')
+
+def migration_006_inventory_stats(db_connection):
+    """Single-row summary counters kept current by triggers on inventory"""
+    db_connection.execute('''
+        CREATE TABLE IF NOT EXISTS inventory_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            item_count INTEGER NOT NULL DEFAULT 0,
+            total_stock INTEGER NOT NULL DEFAULT 0,
+            total_available INTEGER NOT NULL DEFAULT 0,
+            low_stock_count INTEGER NOT NULL DEFAULT 0,
+            low_stock_threshold INTEGER NOT NULL
+        )
+    ''')
+    
+    db_connection.execute('''
+        CREATE TRIGGER IF NOT EXISTS inventory_stats_insert AFTER INSERT ON inventory BEGIN
+            UPDATE inventory_stats SET
+                item_count = item_count + 1,
+                total_stock = total_stock + IFNULL(new.stock, 0),
+                total_available = total_available + IFNULL(new.available, 0),
+                low_stock_count = low_stock_count
+                    + (IFNULL(new.available, 0) <= low_stock_threshold);
+        END
+    ''')
+    db_connection.execute('''
+        CREATE TRIGGER IF NOT EXISTS inventory_stats_delete AFTER DELETE ON inventory BEGIN
+            UPDATE inventory_stats SET
+                item_count = item_count - 1,
+                total_stock = total_stock - IFNULL(old.stock, 0),
+                total_available = total_available - IFNULL(old.available, 0),
+                low_stock_count = low_stock_count
+                    - (IFNULL(old.available, 0) <= low_stock_threshold);
+        END
+    ''')
+    db_connection.execute('''
+        CREATE TRIGGER IF NOT EXISTS inventory_stats_update
+        AFTER UPDATE OF stock, available ON inventory
+        WHEN old.stock IS NOT new.stock OR old.available IS NOT new.available
+        BEGIN
+            UPDATE inventory_stats SET
+                total_stock = total_stock - IFNULL(old.stock, 0) + IFNULL(new.stock, 0),
+                total_available = total_available
+                    - IFNULL(old.available, 0) + IFNULL(new.available, 0),
+                low_stock_count = low_stock_count
+                    - (IFNULL(old.available, 0) <= low_stock_threshold)
+                    + (IFNULL(new.available, 0) <= low_stock_threshold);
+        END
+    ''')
+    
+    rebuild_inventory_stats(db_connection, INVENTORY_CONFIG['low_stock_threshold'])
+
+def migration_007_active_checkouts_order(db_connection):
+    """Serve the newest-first active checkout listing (and its pages) from an index"""
+    db_connection.execute('''
+        CREATE INDEX IF NOT EXISTS idx_checkouts_status_date
+        ON checkouts(status, checkout_date)
+    ''')
+    # Superseded: (status) is a prefix of the new index
+    db_connection.execute("DROP INDEX IF EXISTS idx_checkouts_status")
+
+def migration_008_question_lookups(db_connection):
+    """Indexes behind the local question parser's brand and employee lookups"""
+    db_connection.execute('''
+        CREATE INDEX IF NOT EXISTS idx_inventory_brand
+        ON inventory(brand COLLATE NOCASE)
+    ''')
+    db_connection.execute('''
+        CREATE INDEX IF NOT EXISTS idx_checkouts_employee_status
+        ON checkouts(employee_id, status)
+    ''')
+
+def migration_009_export_watermarks(db_connection):
+    """Where each incremental (--since-last) export left off"""
+    db_connection.execute('''
+        CREATE TABLE IF NOT EXISTS export_watermarks (
+            dataset TEXT PRIMARY KEY,
+            watermark TIMESTAMP NOT NULL,
+            exported_at TIMESTAMP,
+            rows INTEGER,
+            path TEXT
+        )
+    ''')
+
+def migration_010_utilization_rollups(db_connection):
+    """Daily checkout/return rollups per item, employee and location for reports/analytics.py"""
+    for table, key in (('rollup_item_daily', 'item_id INTEGER'),
+                       ('rollup_employee_daily', 'employee_id INTEGER'),
+                       ('rollup_location_daily', 'location TEXT')):
+        db_connection.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                day TEXT NOT NULL,
+                {key} NOT NULL,
+                checkouts INTEGER NOT NULL DEFAULT 0,
+                quantity_out INTEGER NOT NULL DEFAULT 0,
+                returns INTEGER NOT NULL DEFAULT 0,
+                quantity_returned INTEGER NOT NULL DEFAULT 0,
+                tool_hours REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY ({key.split()[0]}, day)
+            ) WITHOUT ROWID
+        ''')
+    
+    # Time-out histogram per item, for percentiles without the raw rows
+    db_connection.execute('''
+        CREATE TABLE IF NOT EXISTS rollup_item_durations (
+            item_id INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            returns INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (item_id, bucket)
+        ) WITHOUT ROWID
+    ''')
     
-    print("✅ Database tables created")
\ No newline at end of file
+    # How far the rollups have read (last checkout id, returns up to a timestamp)
+    db_connection.execute('''
+        CREATE TABLE IF NOT EXISTS rollup_state (
+            name TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+    
+    # New returns are found by range on actual_return instead of a history scan
+    db_connection.execute('''
+        CREATE INDEX IF NOT EXISTS idx_checkouts_actual_return
+        ON checkouts(actual_return)
+    ''')
+
+def migration_011_checkout_archive(db_connection):
+    """Archive table for old returned checkouts and the checkout_history view over both"""
+    db_connection.execute('''
+        CREATE TABLE IF NOT EXISTS checkouts_archive (
+            id INTEGER PRIMARY KEY,
+            item_id INTEGER,
+            employee_id INTEGER,
+            quantity INTEGER,
+            checkout_date TIMESTAMP,
+            expected_return DATE,
+            actual_return TIMESTAMP,
+            location TEXT,
+            order_number TEXT,
+            status TEXT,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    for name, columns in (('idx_archive_actual_return', 'actual_return'),
+                          ('idx_archive_item', 'item_id'),
+                          ('idx_archive_employee', 'employee_id')):
+        db_connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON checkouts_archive({columns})")
+    
+    create_history_view(db_connection)
+
+def migration_012_outstanding_balances(db_connection):
+    """Per-checkout outstanding quantity and the (item, employee) balance kept by triggers"""
+    db_connection.execute(
+        "ALTER TABLE checkouts ADD COLUMN outstanding INTEGER NOT NULL DEFAULT 0"
+    )
+    db_connection.execute(
+        "UPDATE checkouts SET outstanding = IFNULL(quantity, 1) WHERE status = 'active'"
+    )
+    
+    # Units each employee holds of each item: "who has it" is a key lookup
+    db_connection.execute('''
+        CREATE TABLE IF NOT EXISTS outstanding_balances (
+            item_id INTEGER NOT NULL,
+            employee_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            PRIMARY KEY (item_id, employee_id)
+        ) WITHOUT ROWID
+    ''')
+    db_connection.execute('''
+        CREATE INDEX IF NOT EXISTS idx_outstanding_balances_employee
+        ON outstanding_balances(employee_id, item_id)
+    ''')
+    db_connection.execute('''
+        INSERT INTO outstanding_balances (item_id, employee_id, quantity)
+        SELECT item_id, employee_id, SUM(outstanding) FROM checkouts
+        WHERE outstanding > 0 AND item_id IS NOT NULL AND employee_id IS NOT NULL
+        GROUP BY item_id, employee_id
+    ''')
+    
+    add_balance = '''
+        INSERT INTO outstanding_balances (item_id, employee_id, quantity)
+        SELECT new.item_id, new.employee_id, new.outstanding
+        WHERE new.outstanding > 0 AND new.item_id IS NOT NULL AND new.employee_id IS NOT NULL
+        ON CONFLICT(item_id, employee_id) DO UPDATE SET quantity = quantity + excluded.quantity;
+    '''
+    remove_balance = '''
+        UPDATE outstanding_balances SET quantity = quantity - old.outstanding
+        WHERE item_id = old.item_id AND employee_id = old.employee_id;
+        DELETE FROM outstanding_balances
+        WHERE item_id = old.item_id AND employee_id = old.employee_id AND quantity <= 0;
+    '''
+    db_connection.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS checkouts_balance_insert
+        AFTER INSERT ON checkouts WHEN new.outstanding > 0 BEGIN
+            {add_balance}
+        END
+    ''')
+    db_connection.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS checkouts_balance_update
+        AFTER UPDATE OF outstanding, item_id, employee_id ON checkouts
+        WHEN old.outstanding > 0 OR new.outstanding > 0 BEGIN
+            {remove_balance}
+            {add_balance}
+        END
+    ''')
+    db_connection.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS checkouts_balance_delete
+        AFTER DELETE ON checkouts WHEN old.outstanding > 0 BEGIN
+            {remove_balance}
+        END
+    ''')
+
+def migration_013_fuzzy_index(db_connection):
+    """Trigram index over the words of item names, brands and Catalog IDs (core/fuzzy.py)"""
+    # Distinct words, and each word under every trigram it contains
+    db_connection.execute('''
+        CREATE TABLE IF NOT EXISTS fuzzy_terms (
+            term TEXT PRIMARY KEY
+        ) WITHOUT ROWID
+    ''')
+    db_connection.execute('''
+        CREATE TABLE IF NOT EXISTS fuzzy_trigrams (
+            trigram TEXT NOT NULL,
+            term TEXT NOT NULL,
+            PRIMARY KEY (trigram, term)
+        ) WITHOUT ROWID
+    ''')
+    
+    # Items whose text changed since the index was last brought up to date.
+    # Words are split and accent-folded in Python, so triggers only queue.
+    db_connection.execute('''
+        CREATE TABLE IF NOT EXISTS fuzzy_queue (
+            item_id INTEGER PRIMARY KEY
+        )
+    ''')
+    db_connection.execute('''
+        CREATE TRIGGER IF NOT EXISTS inventory_fuzzy_insert AFTER INSERT ON inventory BEGIN
+            INSERT OR IGNORE INTO fuzzy_queue (item_id) VALUES (new.id);
+        END
+    ''')
+    db_connection.execute('''
+        CREATE TRIGGER IF NOT EXISTS inventory_fuzzy_update
+        AFTER UPDATE OF item_name, brand, item_id ON inventory
+        WHEN old.item_name IS NOT new.item_name OR old.brand IS NOT new.brand
+          OR old.item_id IS NOT new.item_id
+        BEGIN
+            INSERT OR IGNORE INTO fuzzy_queue (item_id) VALUES (new.id);
+        END
+    ''')
+    db_connection.execute("INSERT OR IGNORE INTO fuzzy_queue (item_id) SELECT id FROM inventory")
+
+def migration_014_catalog_version(db_connection):
+    """Counter bumped whenever a Catalog ID is added, removed or changed (core/scanner.py)"""
+    db_connection.execute('''
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    ''')
+    db_connection.execute("INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0)")
+    
+    bump = "UPDATE catalog_version SET version = version + 1 WHERE id = 1;"
+    db_connection.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS inventory_catalog_insert
+        AFTER INSERT ON inventory WHEN new.item_id <> '' BEGIN
+            {bump}
+        END
+    ''')
+    db_connection.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS inventory_catalog_delete
+        AFTER DELETE ON inventory WHEN old.item_id <> '' BEGIN
+            {bump}
+        END
+    ''')
+    # Stock movements leave it alone: only code and name changes count
+    db_connection.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS inventory_catalog_update
+        AFTER UPDATE OF item_id, item_name ON inventory
+        WHEN old.item_id IS NOT new.item_id OR old.item_name IS NOT new.item_name
+        BEGIN
+            {bump}
+        END
+    ''')
+
+def migration_015_catalog_sync(db_connection):
+    """Row hashes and resumable runs for delta catalog syncs (core/sync.py)"""
+    db_connection.execute('''
+        CREATE TABLE IF NOT EXISTS catalog_hashes (
+            item_id TEXT PRIMARY KEY,
+            hash BLOB NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    db_connection.execute('''
+        CREATE TABLE IF NOT EXISTS sync_runs (
+            id INTEGER PRIMARY KEY,
+            source TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP,
+            rows INTEGER NOT NULL DEFAULT 0,
+            inserted INTEGER NOT NULL DEFAULT 0,
+            updated INTEGER NOT NULL DEFAULT 0,
+            unchanged INTEGER NOT NULL DEFAULT 0,
+            deleted INTEGER NOT NULL DEFAULT 0,
+            discontinued INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    # Soft delete: items gone from the supplier's catalog but kept for their history
+    columns = {row['name'] for row in db_connection.fetchall("PRAGMA table_info(inventory)")}
+    if 'discontinued' not in columns:
+        db_connection.execute("ALTER TABLE inventory ADD COLUMN discontinued TIMESTAMP")
+    # Rows without a Catalog ID are matched on name and brand; item names
+    # alone repeat across hundreds of Catalog IDs
+    db_connection.execute('''
+        CREATE INDEX IF NOT EXISTS idx_inventory_unkeyed_name
+        ON inventory(item_name, IFNULL(brand, '')) WHERE IFNULL(item_id, '') = ''
+    ''')
+
+def migration_016_stats_skip_discontinued(db_connection):
+    """Summary counters leave out discontinued items, like search and checkout do"""
+    for trigger in ('insert', 'delete', 'update'):
+        db_connection.execute(f"DROP TRIGGER IF EXISTS inventory_stats_{trigger}")
+    
+    db_connection.execute('''
+        CREATE TRIGGER inventory_stats_insert AFTER INSERT ON inventory
+        WHEN new.discontinued IS NULL
+        BEGIN
+            UPDATE inventory_stats SET
+                item_count = item_count + 1,
+                total_stock = total_stock + IFNULL(new.stock, 0),
+                total_available = total_available + IFNULL(new.available, 0),
+                low_stock_count = low_stock_count
+                    + (IFNULL(new.available, 0) <= low_stock_threshold);
+        END
+    ''')
+    db_connection.execute('''
+        CREATE TRIGGER inventory_stats_delete AFTER DELETE ON inventory
+        WHEN old.discontinued IS NULL
+        BEGIN
+            UPDATE inventory_stats SET
+                item_count = item_count - 1,
+                total_stock = total_stock - IFNULL(old.stock, 0),
+                total_available = total_available - IFNULL(old.available, 0),
+                low_stock_count = low_stock_count
+                    - (IFNULL(old.available, 0) <= low_stock_threshold);
+        END
+    ''')
+    # Discontinuing an item takes it out of the counters; re-listing it puts it back
+    db_connection.execute('''
+        CREATE TRIGGER inventory_stats_update
+        AFTER UPDATE OF stock, available, discontinued ON inventory
+        WHEN old.stock IS NOT new.stock OR old.available IS NOT new.available
+          OR (old.discontinued IS NULL) IS NOT (new.discontinued IS NULL)
+        BEGIN
+            UPDATE inventory_stats SET
+                item_count = item_count
+                    - (old.discontinued IS NULL) + (new.discontinued IS NULL),
+                total_stock = total_stock
+                    - IFNULL(old.stock, 0) * (old.discontinued IS NULL)
+                    + IFNULL(new.stock, 0) * (new.discontinued IS NULL),
+                total_available = total_available
+                    - IFNULL(old.available, 0) * (old.discontinued IS NULL)
+                    + IFNULL(new.available, 0) * (new.discontinued IS NULL),
+                low_stock_count = low_stock_count
+                    - (IFNULL(old.available, 0) <= low_stock_threshold AND old.discontinued IS NULL)
+                    + (IFNULL(new.available, 0) <= low_stock_threshold AND new.discontinued IS NULL);
+        END
+    ''')
+    
+    # Its own recount: rebuild_inventory_stats() is migration 006's, which
+    # runs before inventory has a discontinued column
+    threshold = INVENTORY_CONFIG['low_stock_threshold']
+    db_connection.execute('''
+        INSERT OR REPLACE INTO inventory_stats
+        (id, item_count, total_stock, total_available, low_stock_count, low_stock_threshold)
+        SELECT 1, COUNT(*), IFNULL(SUM(stock), 0), IFNULL(SUM(available), 0),
+               IFNULL(SUM(IFNULL(available, 0) <= ?), 0), ?
+        FROM inventory
+        WHERE discontinued IS NULL
+    ''', (threshold, threshold))
+
+# Numbered schema migrations, applied in order and each exactly once.
+# Append new ones at the end; never renumber or edit an applied migration.
+MIGRATIONS = [
+    (1, migration_001_base_tables),
+    (2, migration_002_unique_catalog_ids),
+    (3, migration_003_search_index),
+    (4, migration_004_lookup_indexes),
+    (5, migration_005_employee_keys),
+    (6, migration_006_inventory_stats),
+    (7, migration_007_active_checkouts_order),
+    (8, migration_008_question_lookups),
+    (9, migration_009_export_watermarks),
+    (10, migration_010_utilization_rollups),
+    (11, migration_011_checkout_archive),
+    (12, migration_012_outstanding_balances),
+    (13, migration_013_fuzzy_index),
+    (14, migration_014_catalog_version),
+    (15, migration_015_catalog_sync),
+    (16, migration_016_stats_skip_discontinued),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def merge_duplicate_catalog_ids(db_connection):
+    """Collapse rows duplicated by earlier re-imports onto the oldest copy"""
+    duplicates = db_connection.fetchall('''
+        SELECT i.id, keep.id AS keep_id
+        FROM inventory i
+        JOIN (
+            SELECT item_id, MIN(id) AS id FROM inventory
+            WHERE item_id <> '' GROUP BY item_id HAVING COUNT(*) > 1
+        ) keep ON i.item_id = keep.item_id AND i.id <> keep.id
+    ''')
+    
+    for dup in duplicates:
+        # Move checkout history, and anything still out, onto the kept row
+        db_connection.execute('''
+            UPDATE inventory SET available = MAX(0, available - IFNULL((
+                SELECT SUM(quantity) FROM checkouts
+                WHERE item_id = ? AND status = 'active'
+            ), 0))
+            WHERE id = ?
+        ''', (dup['id'], dup['keep_id']))
+        db_connection.execute(
+            "UPDATE checkouts SET item_id = ? WHERE item_id = ?",
+            (dup['keep_id'], dup['id'])
+        )
+        db_connection.execute("DELETE FROM inventory WHERE id = ?", (dup['id'],))
+    
+    if duplicates:
+        print(f"🧹 Merged {len(duplicates)} duplicated catalog rows", file=sys.stderr)
+
+def create_search_index(db_connection):
+    """Create the FTS5 index over inventory and its sync triggers.
+
+    Returns False if this SQLite build has no FTS5, in which case searches
+    use the LIKE fallback.
+    """
+    exists = db_connection.fetchone(
+        "SELECT 1 FROM sqlite_master WHERE name = 'inventory_fts'"
+    )
+    if exists:
+        return True
+    
+    try:
+        with db_connection.transaction():
+            # External-content table: the text lives in inventory, the index here.
+            # remove_diacritics folds "Combinación" and "Combinacion" together.
+            db_connection.execute('''
+                CREATE VIRTUAL TABLE inventory_fts USING fts5(
+                    item_name, brand, equipment, notes, item_id,
+                    content='inventory', content_rowid='id',
+                    tokenize="unicode61 remove_diacritics 2",
+                    prefix='2 3'
+                )
+            ''')
+            db_connection.execute('''
+                CREATE TRIGGER inventory_fts_insert AFTER INSERT ON inventory BEGIN
+                    INSERT INTO inventory_fts(rowid, item_name, brand, equipment, notes, item_id)
+                    VALUES (new.id, new.item_name, new.brand, new.equipment, new.notes, new.item_id);
+                END
+            ''')
+            db_connection.execute('''
+                CREATE TRIGGER inventory_fts_delete AFTER DELETE ON inventory BEGIN
+                    INSERT INTO inventory_fts(inventory_fts, rowid, item_name, brand, equipment, notes, item_id)
+                    VALUES ('delete', old.id, old.item_name, old.brand, old.equipment, old.notes, old.item_id);
+                END
+            ''')
+            # Stock movements don't touch the indexed text, so only re-index on text changes
+            db_connection.execute('''
+                CREATE TRIGGER inventory_fts_update
+                AFTER UPDATE OF item_name, brand, equipment, notes, item_id ON inventory
+                WHEN old.item_name IS NOT new.item_name OR old.brand IS NOT new.brand
+                  OR old.equipment IS NOT new.equipment OR old.notes IS NOT new.notes
+                  OR old.item_id IS NOT new.item_id
+                BEGIN
+                    INSERT INTO inventory_fts(inventory_fts, rowid, item_name, brand, equipment, notes, item_id)
+                    VALUES ('delete', old.id, old.item_name, old.brand, old.equipment, old.notes, old.item_id);
+                    INSERT INTO inventory_fts(rowid, item_name, brand, equipment, notes, item_id)
+                    VALUES (new.id, new.item_name, new.brand, new.equipment, new.notes, new.item_id);
+                END
+            ''')
+            db_connection.execute("INSERT INTO inventory_fts(inventory_fts) VALUES ('rebuild')")
+    except sqlite3.OperationalError as e:
+        if 'fts5' not in str(e):
+            raise
+        print("⚠️ SQLite has no FTS5 support - search will use the slower LIKE scan", file=sys.stderr)
+        return False
+    
+    return True
+
+def create_history_view(db_connection):
+    """checkout_history: every checkout, whether still in checkouts or archived"""
+    columns = ('id, item_id, employee_id, quantity, checkout_date, expected_return, '
+               'actual_return, location, order_number, status')
+    db_connection.execute("DROP VIEW IF EXISTS checkout_history")
+    db_connection.execute(f'''
+        CREATE VIEW checkout_history AS
+        SELECT {columns} FROM checkouts
+        UNION ALL
+        SELECT {columns} FROM checkouts_archive
+    ''')
+
+def rebuild_inventory_stats(db_connection, low_stock_threshold):
+    """Recompute the summary counters from scratch with one scan of inventory"""
+    db_connection.execute('''
+        INSERT OR REPLACE INTO inventory_stats
+        (id, item_count, total_stock, total_available, low_stock_count, low_stock_threshold)
+        SELECT 1, COUNT(*), IFNULL(SUM(stock), 0), IFNULL(SUM(available), 0),
+               IFNULL(SUM(IFNULL(available, 0) <= ?), 0), ?
+        FROM inventory
+    ''', (low_stock_threshold, low_stock_threshold))
\ No newline at end of file
@@ -0,0 +1,281 @@
+# llm/fast_path.py - Rule-based answers for common questions, ahead of the LLM
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import INVENTORY_CONFIG, LLM_CONFIG
+from database.connection import DatabaseConnection
+from core.employees import EmployeeDirectory
+from core.inventory import build_match_query
+from llm.sql_cache import normalize_question
+
+# Leading verbs and articles that don't change what is being asked
+_FILLER = re.compile(
+    r'^(?:(?:please|por favor|can you|could you)\s+)?'
+    r'(?:(?:show|list|display|give|get|find|muestra|muestrame|mostrar|lista|listar|dame)\s+)?'
+    r'(?:me\s+)?(?:(?:all|the|todos los|todas las|los|las)\s+)?'
+)
+_ITEMS = r'(?:items?|tools?|things|articulos|herramientas|equipo)'
+
+INVENTORY_COLUMNS = "id, item_name, brand, available, stock, location"
+
+CHECKOUTS_SELECT = '''
+    SELECT c.id, i.item_name, i.brand, e.employee_name, c.outstanding AS quantity,
+           c.checkout_date, c.location
+    FROM checkouts c
+    JOIN inventory i ON c.item_id = i.id
+    JOIN employees e ON c.employee_id = e.id
+'''
+
+
+def _patterns(*regexes):
+    return [re.compile(regex) for regex in regexes]
+
+
+class FastPath:
+    """Answers common question shapes locally with parameterized SQL.
+
+    Each rule is a set of regexes over the normalized question plus a
+    handler that turns the captured slots into (sql, params). A handler
+    returns None when a slot doesn't resolve (say, a name that isn't an
+    employee), and the next rule gets a try. Questions no rule answers
+    are escalated to the LLM; the counters show how much traffic never
+    needed it. Row lists stop after max_rows, like the LLM's queries.
+    """
+
+    def __init__(self, db=None, employees=None, max_rows=None):
+        self.db = db or DatabaseConnection()
+        self.employees = employees or EmployeeDirectory(self.db)
+        self.max_rows = max_rows or LLM_CONFIG['guard']['max_rows']
+        self.last_truncated = False
+        self._search_index = None
+        self.matched = Counter()
+        self.escalated = 0
+        # Most specific first: the employee/brand/location rules share shapes
+        self.rules = [
+            ('count_items', _patterns(
+                rf'how many {_ITEMS}(?: are there| do we have)?(?: in (?:the )?inventory)?',
+                rf'cuant[oa]s {_ITEMS}(?: hay| tenemos)?',
+            ), self._count_items),
+            ('count_checked_out', _patterns(
+                rf'how many (?:{_ITEMS} )?(?:are )?(?:checked out|checkouts|on loan)',
+                r'cuant[oa]s (?:prestamos|salidas)(?: activ[oa]s)?',
+            ), self._count_checked_out),
+            ('out_of_stock', _patterns(
+                rf'(?:{_ITEMS} )?(?:that are |which are )?out of stock(?: {_ITEMS})?',
+                r"what(?: is|'s|s) out of stock",
+                rf'{_ITEMS} (?:with )?(?:no|zero|0) (?:stock|available)',
+                rf'(?:{_ITEMS} )?(?:sin stock|agotad[oa]s)',
+            ), self._out_of_stock),
+            ('below_threshold', _patterns(
+                rf'{_ITEMS} with (?:less|fewer) than (?P<limit>\d+)(?: available| in stock| left)?',
+                rf'{_ITEMS} (?:under|below) (?P<limit>\d+)(?: available| in stock| left)?',
+                rf'{_ITEMS} con menos de (?P<limit>\d+)(?: disponibles| en stock)?',
+            ), self._below_threshold),
+            ('low_stock', _patterns(
+                rf'(?:{_ITEMS} )?(?:with |that are |in |on |running )?low(?: on)? stock(?: {_ITEMS})?',
+                r"what(?: is|'s|s) running low",
+                rf'{_ITEMS} running low',
+                rf'(?:{_ITEMS} )?(?:con )?(?:poco|bajo) stock',
+            ), self._low_stock),
+            ('active_checkouts', _patterns(
+                r'(?:active |current |open )?checkouts',
+                r"what(?: is|'s|s) checked out",
+                rf'(?:{_ITEMS} )?(?:currently )?checked out',
+                r'(?:prestamos|salidas)(?: activ[oa]s)?',
+            ), self._active_checkouts),
+            ('who_has', _patterns(
+                r'who (?:has |have )?(?:checked out|took|taken) (?:the |a |an )?(?P<item>.+)',
+                r'who (?:has|have) (?:the |a |an )?(?P<item>.+)',
+                r'quien tiene (?:el |la |los |las |un |una )?(?P<item>.+)',
+            ), self._who_has),
+            ('employee_checkouts', _patterns(
+                r'what (?:did|does|has) (?P<who>.+?) (?:check ?out|checked out|checkout|take|took|taken|have|got)',
+                rf'(?:{_ITEMS} |checkouts )?(?:checked out )?(?:by|to|for|of) (?P<who>.+)',
+                r'(?:que tiene|que saco|prestamos de|salidas de) (?P<who>.+)',
+            ), self._employee_checkouts),
+            ('brand_items', _patterns(
+                rf'{_ITEMS} (?:by|from|of) (?:brand )?(?P<brand>.+)',
+                r'(?:brand|marca) (?P<brand>.+)',
+                rf'{_ITEMS} (?:de )?(?:la )?marca (?P<brand>.+)',
+                rf'(?P<brand>.+?) {_ITEMS}',
+            ), self._brand_items),
+            ('location_items', _patterns(
+                rf'(?:{_ITEMS} |checkouts |everything )?(?:checked out )?(?:at|in|on|to) (?:the )?(?P<where>.+)',
+                rf'(?:{_ITEMS} )?(?:en|del|de la) (?P<where>.+)',
+            ), self._location_items),
+        ]
+
+    def match(self, question):
+        """(rule, sql, params) for a question, or None to escalate to the LLM"""
+        text = _FILLER.sub('', normalize_question(question), count=1)
+        for name, patterns, handler in self.rules:
+            for pattern in patterns:
+                found = pattern.fullmatch(text)
+                if found is None:
+                    continue
+                slots = {key: value.strip() for key, value in found.groupdict().items() if value}
+                query = handler(**slots)
+                if query is not None:
+                    self.matched[name] += 1
+                    return (name,) + query
+        self.escalated += 1
+        return None
+
+    def answer(self, question):
+        """(rule, rows) if a rule answers the question, else None.
+
+        last_truncated tells whether rows were cut off at max_rows.
+        """
+        found = self.match(question)
+        if found is None:
+            return None
+        name, sql, params = found
+        rows = self.db.fetchall(sql, params)
+        self.last_truncated = len(rows) > self.max_rows
+        return name, rows[:self.max_rows]
+
+    def stats(self):
+        """How much natural-language traffic the rules absorbed"""
+        matched = sum(self.matched.values())
+        total = matched + self.escalated
+        return {
+            'questions': total,
+            'answered_locally': matched,
+            'escalated': self.escalated,
+            'absorbed_rate': matched / total if total else 0.0,
+            'by_rule': dict(self.matched.most_common())
+        }
+
+    # Handlers: slots -> (sql, params), or None if the slots don't resolve.
+    # Row lists fetch one row past max_rows so answer() can tell it cut them off
+
+    def _count_items(self):
+        return ('''
+            SELECT item_count AS items, total_stock, total_available
+            FROM inventory_stats WHERE id = 1
+        ''', ())
+
+    def _count_checked_out(self):
+        return ('''
+            SELECT COUNT(*) AS checkouts, IFNULL(SUM(outstanding), 0) AS units
+            FROM checkouts WHERE status = 'active'
+        ''', ())
+
+    def _out_of_stock(self):
+        return (f'''
+            SELECT {INVENTORY_COLUMNS} FROM inventory
+            WHERE available <= 0 AND discontinued IS NULL ORDER BY item_name LIMIT ?
+        ''', (self.max_rows + 1,))
+
+    def _below_threshold(self, limit):
+        return (f'''
+            SELECT {INVENTORY_COLUMNS} FROM inventory
+            WHERE available < ? AND discontinued IS NULL ORDER BY available, item_name LIMIT ?
+        ''', (int(limit), self.max_rows + 1))
+
+    def _low_stock(self):
+        return (f'''
+            SELECT {INVENTORY_COLUMNS} FROM inventory
+            WHERE available <= ? AND discontinued IS NULL ORDER BY available, item_name LIMIT ?
+        ''', (INVENTORY_CONFIG['low_stock_threshold'], self.max_rows + 1))
+
+    def _active_checkouts(self):
+        return (CHECKOUTS_SELECT + '''
+            WHERE c.status = 'active'
+            ORDER BY c.checkout_date DESC, c.id DESC LIMIT ?
+        ''', (self.max_rows + 1,))
+
+    def _who_has(self, item):
+        # The question is accent-folded; the FTS index folds item names the same way
+        match = build_match_query(item)
+        if match and self._has_search_index():
+            item_filter = "i.id IN (SELECT rowid FROM inventory_fts WHERE inventory_fts MATCH ?)"
+            param = f"item_name : ({match})"
+        else:
+            item_filter, param = "i.item_name LIKE ?", f"%{item}%"
+        return (f'''
+            SELECT i.id, i.item_name, i.brand, e.employee_name, b.quantity
+            FROM outstanding_balances b
+            JOIN inventory i ON i.id = b.item_id
+            JOIN employees e ON e.id = b.employee_id
+            WHERE {item_filter}
+            ORDER BY i.item_name, e.employee_name LIMIT ?
+        ''', (param, self.max_rows + 1))
+
+    def _employee_checkouts(self, who):
+        employee_ids = self._employee_ids(who)
+        if not employee_ids:
+            return None
+        placeholders = ", ".join("?" * len(employee_ids))
+        return (CHECKOUTS_SELECT + f'''
+            WHERE c.employee_id IN ({placeholders}) AND c.status = 'active'
+            ORDER BY c.checkout_date DESC, c.id DESC LIMIT ?
+        ''', tuple(employee_ids) + (self.max_rows + 1,))
+
+    def _brand_items(self, brand):
+        found = self.db.fetchone(
+            "SELECT 1 FROM inventory WHERE brand = ? COLLATE NOCASE AND discontinued IS NULL LIMIT 1",
+            (brand,)
+        )
+        if found is None:
+            return None
+        return (f'''
+            SELECT {INVENTORY_COLUMNS} FROM inventory
+            WHERE brand = ? COLLATE NOCASE AND discontinued IS NULL ORDER BY item_name LIMIT ?
+        ''', (brand, self.max_rows + 1))
+
+    def _location_items(self, where):
+        # Checked-out gear is where the checkout says; the rest is in inventory
+        checked_out = self.db.fetchone('''
+            SELECT 1 FROM checkouts
+            WHERE status = 'active' AND location = ? COLLATE NOCASE LIMIT 1
+        ''', (where,))
+        if checked_out is not None:
+            return (CHECKOUTS_SELECT + '''
+                WHERE c.status = 'active' AND c.location = ? COLLATE NOCASE
+                ORDER BY c.checkout_date DESC, c.id DESC LIMIT ?
+            ''', (where, self.max_rows + 1))
+
+        stored = self.db.fetchone(
+            "SELECT 1 FROM inventory WHERE location = ? COLLATE NOCASE AND discontinued IS NULL LIMIT 1",
+            (where,)
+        )
+        if stored is not None:
+            return (f'''
+                SELECT {INVENTORY_COLUMNS} FROM inventory
+                WHERE location = ? COLLATE NOCASE AND discontinued IS NULL
+                ORDER BY item_name LIMIT ?
+            ''', (where, self.max_rows + 1))
+        return None
+
+    def _has_search_index(self):
+        """True if the FTS5 index exists (checked once)"""
+        if self._search_index is None:
+            self._search_index = self.db.fetchone(
+                "SELECT 1 FROM sqlite_master WHERE name = 'inventory_fts'"
+            ) is not None
+        return self._search_index
+
+    def _employee_ids(self, who):
+        """Ids for a full name, badge code or first name ("juan" -> Juan Pérez)"""
+        emp_id = self.employees.get_id(who)
+        if emp_id is not None:
+            return [emp_id]
+        rows = self.db.fetchall(
+            "SELECT id FROM employees WHERE name_key LIKE ? ORDER BY id",
+            (who.replace('%', '').replace('_', '') + ' %',)
+        )
+        return [row['id'] for row in rows]
+
+
+def format_rows(results):
+    """One ' | '-joined line per row"""
+    output = []
+    for row in results:
+        output.append(" | ".join(str(val) for val in dict(row).values()))
+    return "\n".join(output)
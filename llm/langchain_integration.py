@@ -1,5 +1,7 @@
 # llm/langchain_integration.py - Simple LLM integration for natural language queries
 import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
 import requests
 import json
@@ -9,152 +11,326 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import LLM_CONFIG
 from database.connection import DatabaseConnection
+from llm.sql_cache import SQLCache, prompt_fingerprint
+from llm.fast_path import FastPath, format_rows
+from llm.sql_guard import SQLGuard, UnsafeQuery
+
+# Every prompt starts with this exact text. Keeping it byte-identical, and
+# first, lets LM Studio reuse its cached prompt prefix between calls.
+SCHEMA_PROMPT = """You are a SQL expert for a workshop inventory SQLite database.
+
+Database schema:
+- inventory table: id, item_name, brand, equipment, stock, available, location, notes
+- employees table: id, employee_name, employee_id, department
+- checkouts table: id, item_id, employee_id, quantity, outstanding, checkout_date, actual_return, status, location, order_number
+  (active and recently returned checkouts only; outstanding = units not yet returned)
+- outstanding_balances table: item_id, employee_id, quantity (units each employee currently holds of each item)
+- checkout_history view: same columns as checkouts, every checkout ever made including archived ones;
+  use it only for questions about past checkouts
+"""
+
+SQL_PROMPT_TEMPLATE = SCHEMA_PROMPT + """
+Convert the natural language query to a SQLite query.
+Return ONLY the SQL query, nothing else. No explanations, just the SQL.
+
+Natural language query: {query}
+SQL:"""
+
+CLASSIFY_PROMPT_TEMPLATE = SCHEMA_PROMPT + """
+Analyze the user input and determine if it's:
+1. A QUERY (asking for information)
+2. A CHECKOUT command (checking out items)
+3. A CHECKIN command (returning items)
+4. An ADD command (adding new items)
+5. OTHER
+Respond with just the category (QUERY, CHECKOUT, CHECKIN, ADD, or OTHER).
+
+User input: {user_input}
+Category:"""
+
+COMBINED_PROMPT_TEMPLATE = SCHEMA_PROMPT + """
+Classify the user input as QUERY (asking for information), CHECKOUT (checking
+out items), CHECKIN (returning items), ADD (adding new items) or OTHER.
+If it is a QUERY, also write the SQLite query that answers it.
+Respond with one line of JSON and nothing else, for example:
+{{"intent": "QUERY", "sql": "SELECT item_name FROM inventory WHERE available <= 2"}}
+Use an empty "sql" for anything that is not a QUERY.
+
+User input: {user_input}
+JSON:"""
+
+SQL_GENERATION_SETTINGS = {
+    "temperature": 0.1,
+    "max_tokens": 200,
+    "stop": ["\n\n", "Note:", "Explanation:"]
+}
+
+CLASSIFY_SETTINGS = {
+    "temperature": 0.1,
+    "max_tokens": 10
+}
+
+COMBINED_SETTINGS = {
+    "temperature": 0.1,
+    "max_tokens": 250,
+    "stop": ["\n\n"]
+}
+
+INTENT_REPLIES = {
+    'CHECKOUT': "To checkout items, use the 'checkout' command",
+    'CHECKIN': "To return items, use 'checkin [item_id] [quantity] [employee]'",
+    'ADD': "To add new items, use the 'add' command"
+}
+
+NOT_UNDERSTOOD = "I couldn't understand that request. Try rephrasing or use the help command."
 
 class LLMManager:
-    def __init__(self):
+    def __init__(self, fast_path=None, probe=True):
         self.lm_studio_url = LLM_CONFIG['lm_studio']['url']
+        self.single_call = LLM_CONFIG['single_call']
+        self.timeouts = LLM_CONFIG['timeouts']
         self.db = DatabaseConnection()
-        self.connected = self.test_connection()
+        self.fast_path = fast_path or FastPath(self.db)
+        self.guard = SQLGuard()
+        self.last_truncated = False
         
-    def test_connection(self):
+        # One pooled keep-alive session instead of a new TCP connection per call
+        self.session = requests.Session()
+        self.session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        
+        # Per-phase latency: phase -> [calls, total seconds]
+        self.timings = {}
+        self.last_timings = {}
+        
+        try:
+            if self.single_call:
+                fingerprint = prompt_fingerprint(COMBINED_PROMPT_TEMPLATE, COMBINED_SETTINGS)
+            else:
+                fingerprint = prompt_fingerprint(SQL_PROMPT_TEMPLATE, SQL_GENERATION_SETTINGS)
+            self.sql_cache = SQLCache(fingerprint)
+        except Exception as e:
+            print(f"⚠️ SQL cache disabled: {e}")
+            self.sql_cache = None
+        # probe=False leaves the (blocking) check to the caller, e.g. a background thread
+        self.connected = self.test_connection() if probe else False
+    
+    def test_connection(self, verbose=True):
         """Test if LM Studio is running"""
         try:
-            response = requests.get(self.lm_studio_url + "/v1/models", timeout=2)
+            response = self.session.get(self.lm_studio_url + "/v1/models", timeout=self.timeouts['probe'])
             if response.status_code == 200:
-                print("✅ Connected to LM Studio")
+                if verbose:
+                    print("✅ Connected to LM Studio")
                 return True
         except:
             pass
-        print("⚠️ LM Studio not connected - start LM Studio to use natural language queries")
+        if verbose:
+            print("⚠️ LM Studio not connected - start LM Studio to use natural language queries")
         return False
     
+    @contextmanager
+    def _timed(self, phase):
+        """Add the time spent in a block to the phase's latency totals"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.last_timings[phase] = self.last_timings.get(phase, 0.0) + elapsed
+            totals = self.timings.setdefault(phase, [0, 0.0])
+            totals[0] += 1
+            totals[1] += elapsed
+    
+    def _complete(self, prompt, settings):
+        """Run one completion on LM Studio and return its text"""
+        with self._timed('llm'):
+            response = self.session.post(
+                self.lm_studio_url + LLM_CONFIG['lm_studio']['endpoint'],
+                json=dict(settings, prompt=prompt),
+                timeout=self.timeouts['request']
+            )
+        if response.status_code != 200:
+            raise RuntimeError(f"LM Studio error: {response.status_code}")
+        return response.json()['choices'][0]['text'].strip()
+    
     def natural_language_to_sql(self, query):
-        """Convert natural language to SQL"""
+        """Convert natural language to SQL (answered from the cache when possible)"""
+        if self.sql_cache:
+            with self._timed('cache'):
+                cached = self.sql_cache.get(query)
+            if cached:
+                return cached, None
+        
         if not self.connected:
             return None, "LM Studio not connected"
         
-        # Create a prompt for the LLM
-        prompt = f"""You are a SQL expert. Convert this natural language query to a SQLite query.
-
-Database schema:
-- inventory table: id, item_name, brand, equipment, stock, available, location, notes
-- employees table: id, employee_name, employee_id, department
-- checkouts table: id, item_id, employee_id, quantity, checkout_date, status, location, order_number
-
-Natural language query: {query}
-
-Return ONLY the SQL query, nothing else. No explanations, just the SQL.
-SQL:"""
-        
         try:
-            # Call LM Studio
-            response = requests.post(
-                self.lm_studio_url + "/v1/completions",
-                json={
-                    "prompt": prompt,
-                    "temperature": 0.1,
-                    "max_tokens": 200,
-                    "stop": ["\n\n", "Note:", "Explanation:"]
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                sql_query = result['choices'][0]['text'].strip()
-                
-                # Clean up the SQL query
-                sql_query = sql_query.replace("```sql", "").replace("```", "").strip()
-                if sql_query.lower().startswith("sql:"):
-                    sql_query = sql_query[4:].strip()
-                
+            if self.single_call:
+                intent, sql_query = self.classify_and_translate(query)
+                if not sql_query:
+                    return None, "The model did not produce a query"
                 return sql_query, None
-            else:
-                return None, f"LM Studio error: {response.status_code}"
-                
+            
+            # Call LM Studio
+            sql_query = clean_sql(self._complete(SQL_PROMPT_TEMPLATE.format(query=query), SQL_GENERATION_SETTINGS))
+            if self.sql_cache and sql_query:
+                self.sql_cache.put(query, sql_query)
+            return sql_query, None
+        
         except Exception as e:
             return None, f"Error: {str(e)}"
     
-    def execute_natural_language_query(self, query):
+    def classify_and_translate(self, user_input):
+        """One completion that returns (intent, sql) for the user input"""
+        text = self._complete(COMBINED_PROMPT_TEMPLATE.format(user_input=user_input), COMBINED_SETTINGS)
+        
+        with self._timed('parse'):
+            intent, sql_query = parse_combined_response(text)
+        
+        if intent == 'QUERY' and sql_query and self.sql_cache:
+            self.sql_cache.put(user_input, sql_query)
+        return intent, sql_query
+    
+    def execute_natural_language_query(self, query, sql_query=None):
         """Execute a natural language query and return results"""
         # Convert to SQL
-        sql_query, error = self.natural_language_to_sql(query)
-        
-        if error:
-            return None, error
+        if sql_query is None:
+            sql_query, error = self.natural_language_to_sql(query)
+            
+            if error:
+                return None, error
         
         print(f"📝 Generated SQL: {sql_query}")
         
-        # Execute the SQL
+        # Execute the SQL (read-only, time- and row-limited)
         try:
-            results = self.db.fetchall(sql_query)
+            with self._timed('execute'):
+                results, self.last_truncated = self.guard.run(sql_query)
             return results, None
+        except UnsafeQuery as e:
+            if self.sql_cache:
+                self.sql_cache.discard(query)
+            return None, f"Query refused: {e}"
         except Exception as e:
+            # Don't keep serving SQL that doesn't run
+            if self.sql_cache:
+                self.sql_cache.discard(query)
             return None, f"SQL execution error: {str(e)}"
     
     def process_command(self, user_input):
         """Process natural language commands (not just queries)"""
+        self.last_timings = {}
+        with self._timed('total'):
+            return self._process_command(user_input)
+    
+    def _process_command(self, user_input):
+        # Common question shapes are answered by local rules, no LLM needed
+        with self._timed('local'):
+            local = self.fast_path.answer(user_input)
+        if local is not None:
+            rule, results = local
+            print(f"⚡ Answered locally ({rule})")
+            if not results:
+                return "No results found."
+            with self._timed('format'):
+                output = format_rows(results)
+            if self.fast_path.last_truncated:
+                output += f"\n... (first {self.fast_path.max_rows} rows only)"
+            return output
+        
+        # A question answered before skips the LLM entirely
+        if self.sql_cache:
+            with self._timed('cache'):
+                cached = self.sql_cache.contains(user_input)
+            if cached:
+                return self.format_query_results(user_input)
+        
         if not self.connected:
             return "LM Studio not connected. Please start LM Studio first."
         
-        # Determine if this is a query or a command
-        prompt = f"""Analyze this user input and determine if it's:
-1. A QUERY (asking for information)
-2. A CHECKOUT command (checking out items)
-3. A CHECKIN command (returning items)
-4. An ADD command (adding new items)
-5. OTHER
-
-User input: {user_input}
-
-Respond with just the category (QUERY, CHECKOUT, CHECKIN, ADD, or OTHER):"""
-        
         try:
-            response = requests.post(
-                self.lm_studio_url + "/v1/completions",
-                json={
-                    "prompt": prompt,
-                    "temperature": 0.1,
-                    "max_tokens": 10
-                }
-            )
-            
-            category = response.json()['choices'][0]['text'].strip().upper()
+            if self.single_call:
+                # Intent and SQL in a single round trip
+                category, sql_query = self.classify_and_translate(user_input)
+            else:
+                # Determine if this is a query or a command
+                category = self._complete(
+                    CLASSIFY_PROMPT_TEMPLATE.format(user_input=user_input), CLASSIFY_SETTINGS
+                ).upper()
+                sql_query = None
             
             if "QUERY" in category:
-                results, error = self.execute_natural_language_query(user_input)
-                if error:
-                    return f"❌ {error}"
-                
-                if not results:
-                    return "No results found."
-                
-                # Format results nicely
-                if results:
-                    output = []
-                    for row in results:
-                        output.append(" | ".join(str(val) for val in dict(row).values()))
-                    return "\n".join(output)
-            
-            elif "CHECKOUT" in category:
-                return "To checkout items, use the 'checkout' command"
+                if self.single_call and not sql_query:
+                    return "❌ The model did not produce a query"
+                return self.format_query_results(user_input, sql_query)
             
-            elif "CHECKIN" in category:
-                return "To return items, use 'checkin [item_id]'"
+            for intent, reply in INTENT_REPLIES.items():
+                if intent in category:
+                    return reply
             
-            elif "ADD" in category:
-                return "To add new items, use the 'add' command"
+            if self.single_call and not sql_query:
+                # The combined answer already had its chance to produce SQL
+                return NOT_UNDERSTOOD
             
+            # Try to process as a query anyway
+            results, error = self.execute_natural_language_query(user_input, sql_query or None)
+            if not error and results:
+                return format_rows(results)
             else:
-                # Try to process as a query anyway
-                results, error = self.execute_natural_language_query(user_input)
-                if not error and results:
-                    output = []
-                    for row in results:
-                        output.append(" | ".join(str(val) for val in dict(row).values()))
-                    return "\n".join(output)
-                else:
-                    return "I couldn't understand that request. Try rephrasing or use the help command."
-                    
+                return NOT_UNDERSTOOD
+        
         except Exception as e:
-            return f"Error processing command: {str(e)}"
\ No newline at end of file
+            return f"Error processing command: {str(e)}"
+    
+    def format_query_results(self, user_input, sql_query=None):
+        """Run a natural language query and format the rows for display"""
+        results, error = self.execute_natural_language_query(user_input, sql_query)
+        if error:
+            return f"❌ {error}"
+        
+        if not results:
+            return "No results found."
+        
+        with self._timed('format'):
+            output = format_rows(results)
+        if self.last_truncated:
+            output += f"\n... (first {self.guard.max_rows} rows only)"
+        return output
+    
+    def cache_stats(self):
+        """Hit/miss statistics of the SQL cache (None if disabled)"""
+        return self.sql_cache.stats() if self.sql_cache else None
+    
+    def timing_stats(self):
+        """Average latency per phase in milliseconds: phase -> (calls, avg_ms)"""
+        return {
+            phase: (calls, total / calls * 1000)
+            for phase, (calls, total) in self.timings.items()
+        }
+
+def clean_sql(text):
+    """Strip code fences and a leading 'SQL:' from model output"""
+    sql_query = text.replace("```sql", "").replace("```", "").strip()
+    if sql_query.lower().startswith("sql:"):
+        sql_query = sql_query[4:].strip()
+    return sql_query
+
+def parse_combined_response(text):
+    """(intent, sql) from the single-call JSON answer.
+
+    Falls back to treating bare SQL as a QUERY, since smaller models
+    sometimes skip the JSON wrapper.
+    """
+    start, end = text.find('{'), text.rfind('}')
+    if start != -1 and end > start:
+        try:
+            answer = json.loads(text[start:end + 1])
+            intent = str(answer.get('intent', 'OTHER')).strip().upper()
+            return intent, clean_sql(str(answer.get('sql') or ''))
+        except (ValueError, AttributeError):
+            pass
+
+    sql_query = clean_sql(text)
+    if sql_query.lower().startswith(('select', 'with')):
+        return 'QUERY', sql_query
+    return 'OTHER', ''
\ No newline at end of file
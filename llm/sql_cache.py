@@ -0,0 +1,155 @@
+# llm/sql_cache.py - Persistent cache of natural-language -> SQL translations
+import hashlib
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import LLM_CONFIG
+from database.connection import DatabaseConnection
+from database.setup import SCHEMA_VERSION
+from utils.text import normalize_name
+
+_EDGE_PUNCTUATION = re.compile(r'^[\s¿¡]+|[\s?!.¿¡]+$')
+
+
+def normalize_question(question):
+    """Key form of a question: case, accents, spacing and ¿?¡!. ignored"""
+    return _EDGE_PUNCTUATION.sub('', normalize_name(question))
+
+
+def prompt_fingerprint(*parts):
+    """Short hash of the prompt template and generation settings"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+
+class SQLCache:
+    """Question -> SQL cache in its own SQLite file.
+
+    Entries are keyed on the normalized question plus a fingerprint of the
+    prompt, so editing the prompt or settings never serves stale SQL. Entries
+    expire after a TTL, the least recently used are evicted beyond
+    max_entries, and everything is dropped when the inventory schema version
+    changes.
+    """
+
+    def __init__(self, fingerprint, db_path=None, ttl_seconds=None, max_entries=None):
+        settings = LLM_CONFIG['cache']
+        self.fingerprint = fingerprint
+        self.ttl_seconds = ttl_seconds or settings['ttl_seconds']
+        self.max_entries = max_entries or settings['max_entries']
+        self.db = DatabaseConnection(db_path=db_path or settings['path'])
+        self.hits = 0
+        self.misses = 0
+        self._setup()
+
+    def _setup(self):
+        """Create the cache tables; purge them if the schema version moved"""
+        with self.db.transaction(immediate=True):
+            self.db.execute('''
+                CREATE TABLE IF NOT EXISTS sql_cache (
+                    question TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    sql TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (question, fingerprint)
+                )
+            ''')
+            self.db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sql_cache_last_used ON sql_cache(last_used)"
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS cache_meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+            row = self.db.fetchone("SELECT value FROM cache_meta WHERE key = 'schema_version'")
+            if row is None or row['value'] != str(SCHEMA_VERSION):
+                self.db.execute("DELETE FROM sql_cache")
+                self.db.execute(
+                    "INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('schema_version', ?)",
+                    (str(SCHEMA_VERSION),)
+                )
+
+    def get(self, question):
+        """Cached SQL for a question, or None"""
+        key = normalize_question(question)
+        now = time.time()
+        row = self.db.fetchone(
+            "SELECT sql, created_at FROM sql_cache WHERE question = ? AND fingerprint = ?",
+            (key, self.fingerprint)
+        )
+
+        if row is None or now - row['created_at'] > self.ttl_seconds:
+            if row is not None:
+                self.discard(question)
+            self.misses += 1
+            return None
+
+        self.db.execute(
+            "UPDATE sql_cache SET last_used = ?, hits = hits + 1 WHERE question = ? AND fingerprint = ?",
+            (now, key, self.fingerprint)
+        )
+        self.hits += 1
+        return row['sql']
+
+    def contains(self, question):
+        """True if a fresh entry exists (doesn't count as a hit or miss)"""
+        row = self.db.fetchone(
+            "SELECT created_at FROM sql_cache WHERE question = ? AND fingerprint = ?",
+            (normalize_question(question), self.fingerprint)
+        )
+        return row is not None and time.time() - row['created_at'] <= self.ttl_seconds
+
+    def put(self, question, sql):
+        """Remember the SQL generated for a question"""
+        now = time.time()
+        with self.db.transaction(immediate=True):
+            self.db.execute('''
+                INSERT OR REPLACE INTO sql_cache
+                (question, fingerprint, sql, created_at, last_used, hits)
+                VALUES (?, ?, ?, ?, ?, 0)
+            ''', (normalize_question(question), self.fingerprint, sql, now, now))
+
+            # Size bound: drop the least recently used beyond max_entries
+            count = self.db.fetchone("SELECT COUNT(*) AS count FROM sql_cache")['count']
+            if count > self.max_entries:
+                self.db.execute('''
+                    DELETE FROM sql_cache WHERE rowid IN (
+                        SELECT rowid FROM sql_cache ORDER BY last_used LIMIT ?
+                    )
+                ''', (count - self.max_entries,))
+
+    def discard(self, question):
+        """Forget a question (e.g. its SQL failed to run)"""
+        self.db.execute(
+            "DELETE FROM sql_cache WHERE question = ? AND fingerprint = ?",
+            (normalize_question(question), self.fingerprint)
+        )
+
+    def clear(self):
+        """Empty the cache"""
+        self.db.execute("DELETE FROM sql_cache")
+
+    def stats(self):
+        """Hit/miss counters for this session plus what is stored"""
+        stored = self.db.fetchone(
+            "SELECT COUNT(*) AS entries, IFNULL(SUM(hits), 0) AS hits FROM sql_cache"
+        )
+        lookups = self.hits + self.misses
+        return {
+            'entries': stored['entries'],
+            'max_entries': self.max_entries,
+            'lifetime_hits': stored['hits'],
+            'session_hits': self.hits,
+            'session_misses': self.misses,
+            'session_hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,171 @@
+# llm/sql_guard.py - Sandboxed execution of model-generated SQL
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import LLM_CONFIG
+from database.connection import DatabaseConnection
+
+# Authorizer actions a plain query needs; everything else (writes, PRAGMA,
+# ATTACH, transactions) is denied while generated SQL is prepared
+_ALLOWED_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_RECURSIVE,
+}
+
+_LEADING_COMMENTS = re.compile(r'^(?:\s+|--[^\n]*\n|/\*.*?\*/)*', re.S)
+# "FROM t a", "JOIN t AS a", ", t a": the plan names tables by alias
+_TABLE_ALIAS = re.compile(
+    r'(?:\bfrom|\bjoin|,)\s*"?(\w+)"?(?:\s+(?:as\s+)?(?!(?:on|where|join|inner|left|'
+    r'cross|natural|group|order|limit|using|from|having|window|union)\b)(\w+))?',
+    re.I
+)
+_PLAN_STEP = re.compile(r'^(SCAN|SEARCH) (\w+)(.*)$')
+
+
+class UnsafeQuery(Exception):
+    """Generated SQL that the guard refuses to run"""
+
+
+class SQLGuard:
+    """Runs model-generated SQL where it can't hurt the inventory.
+
+    Queries go through a read-only (mode=ro) connection with an authorizer
+    that only allows reads. Before running, EXPLAIN QUERY PLAN is checked:
+    unindexed full scans of large tables and cross joins of large tables
+    are refused. While running, a progress handler enforces a wall-clock
+    budget, and rows are fetched in batches up to max_rows.
+    """
+
+    def __init__(self, db_path=None, max_rows=None, time_budget=None, large_table_rows=None):
+        settings = LLM_CONFIG['guard']
+        self.db = DatabaseConnection(db_path=db_path, read_only=True)
+        self.max_rows = max_rows or settings['max_rows']
+        self.time_budget = time_budget or settings['time_budget']
+        self.large_table_rows = large_table_rows or settings['large_table_rows']
+        self.refused = 0
+        self.interrupted = 0
+
+    def run(self, sql):
+        """(rows, truncated) for a SELECT; raises UnsafeQuery if it isn't allowed"""
+        sql = sql.strip().rstrip(';').strip()
+        first_word = _LEADING_COMMENTS.sub('', sql)[:6].lower()
+        if not first_word.startswith(('select', 'with')):
+            self.refused += 1
+            raise UnsafeQuery("only SELECT queries are allowed")
+
+        with self.db.get_connection() as conn:
+            conn.set_authorizer(_authorize)
+            try:
+                self._check_plan(conn, sql)
+                return self._fetch(conn, sql)
+            except sqlite3.ProgrammingError as e:
+                if 'one statement' in str(e):
+                    self.refused += 1
+                    raise UnsafeQuery("only one statement at a time")
+                raise
+            except sqlite3.DatabaseError as e:
+                if 'not authorized' in str(e):
+                    self.refused += 1
+                    raise UnsafeQuery("the query does more than read data")
+                raise
+            finally:
+                conn.set_authorizer(None)
+
+    def _check_plan(self, conn, sql):
+        """Refuse plans that scan or multiply large tables"""
+        plan = conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+        aliases = {
+            (alias or table).lower(): table
+            for table, alias in _TABLE_ALIAS.findall(sql)
+        }
+
+        # Full scans grouped by the SELECT (plan parent) they belong to
+        scans = {}
+        for step_id, parent, _, detail in plan:
+            step = _PLAN_STEP.match(detail)
+            if step is None or 'VIRTUAL TABLE' in detail:
+                continue
+            kind, name, rest = step.groups()
+            if kind != 'SCAN':
+                continue
+            rows = self._table_rows(conn, aliases.get(name.lower(), name))
+            if rows is None:
+                continue
+            if 'INDEX' not in rest and rows > self.large_table_rows:
+                self.refused += 1
+                raise UnsafeQuery(
+                    f"full scan of {name} (~{rows} rows) without an index; "
+                    f"ask for something more specific"
+                )
+            scans.setdefault(parent, []).append((name, rows))
+
+        for tables in scans.values():
+            if len(tables) < 2:
+                continue
+            product = 1
+            for _, rows in tables:
+                product *= max(rows, 1)
+            if product > self.large_table_rows:
+                self.refused += 1
+                names = " x ".join(name for name, _ in tables)
+                raise UnsafeQuery(f"cross join of {names} (~{product} row pairs)")
+
+    def _table_rows(self, conn, table):
+        """Rough size of a table (its largest rowid), None if it isn't one"""
+        conn.set_authorizer(None)
+        try:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ? COLLATE NOCASE",
+                (table,)
+            ).fetchone()
+            if exists is None:
+                return None
+            return conn.execute(f'SELECT IFNULL(MAX(rowid), 0) FROM "{table}"').fetchone()[0]
+        except sqlite3.DatabaseError:
+            return None  # WITHOUT ROWID and the like: leave it to the time budget
+        finally:
+            conn.set_authorizer(_authorize)
+
+    def _fetch(self, conn, sql):
+        """Run the query under the time budget, keeping at most max_rows"""
+        deadline = time.monotonic() + self.time_budget
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+        try:
+            cursor = conn.execute(sql)
+            rows = []
+            while len(rows) <= self.max_rows:
+                batch = cursor.fetchmany(min(100, self.max_rows + 1 - len(rows)))
+                if not batch:
+                    break
+                rows.extend(batch)
+            cursor.close()
+        except sqlite3.OperationalError as e:
+            if 'interrupted' in str(e):
+                self.interrupted += 1
+                raise UnsafeQuery(f"query took longer than {self.time_budget:g}s")
+            raise
+        finally:
+            conn.set_progress_handler(None, 0)
+
+        truncated = len(rows) > self.max_rows
+        return rows[:self.max_rows], truncated
+
+
+def _authorize(action, arg1, arg2, db_name, trigger):
+    if action in _ALLOWED_ACTIONS:
+        return sqlite3.SQLITE_OK
+    # FTS5 checks its own state this way when a search is prepared; the
+    # schema "update" can't write anything on a mode=ro connection
+    if action == sqlite3.SQLITE_PRAGMA and arg1 == 'data_version':
+        return sqlite3.SQLITE_OK
+    if action == sqlite3.SQLITE_UPDATE and arg1 == 'sqlite_master':
+        return sqlite3.SQLITE_OK
+    return sqlite3.SQLITE_DENY
@@ -1,33 +1,90 @@
 # main.py - Fixed with proper imports
+import time
+STARTED = time.perf_counter()
+
 import sys
 from pathlib import Path
 
 # Add current directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from utils.timing import StartupProfile
+
+# --startup-profile prints where the time goes before the first prompt
+profile = StartupProfile(STARTED, enabled='--startup-profile' in sys.argv)
+
+from config import ensure_data_dirs
 from database.connection import DatabaseConnection
 from database.setup import create_tables
+profile.mark('import database')
+
 from cli import SimpleCLI
+profile.mark('import cli')
 
 def main():
     """Main function"""
-    print("🔧 Starting Workshop Inventory System...")
+    # --exec writes its results to stdout; keep it to JSON Lines
+    if sys.argv[1:2] != ['--exec']:
+        print("🔧 Starting Workshop Inventory System...")
+    ensure_data_dirs()
     
-    # Setup database
+    # Setup database (applies any pending schema migrations)
     db = DatabaseConnection()
     create_tables(db)
+    profile.mark('schema check')
     
     # Check for command line arguments
     if len(sys.argv) > 1:
+        if sys.argv[1] == '--import' and len(sys.argv) > 2 and '--delta' in sys.argv[3:]:
+            # Nightly catalog sync: --import file --delta [--discontinue-missing|--delete-missing]
+            from core.sync import run_sync
+            run_sync(sys.argv[2:])
+            return
+        
         if sys.argv[1] == '--import' and len(sys.argv) > 2:
             # Import CSV file
             from core.inventory import InventoryManager
             inv = InventoryManager()
             inv.import_csv(sys.argv[2])
             return
+        
+        if sys.argv[1] == '--export':
+            # Stream a dataset to a file: --export history --format jsonl --gzip ...
+            from reports.exporter import run_export
+            summary = run_export(sys.argv[2:])
+            sys.exit(0 if summary else 1)
+        
+        if sys.argv[1] == '--archive':
+            # Nightly job: --archive [days]
+            from database.archive import run_archive
+            run_archive(sys.argv[2:])
+            return
+        
+        if sys.argv[1] == '--scan':
+            # Scanner piped in: --scan [in|out] [location], one code per line
+            from core.scanner import run_scan
+            run_scan(sys.argv[2:])
+            return
+        
+        if sys.argv[1] == '--exec':
+            # Scripted bulk operations: --exec FILE|- [--batch N] [--output FILE]
+            from core.batch import run_batch
+            summary = run_batch(sys.argv[2:])
+            sys.exit(0 if summary else 1)
+        
+        if sys.argv[1] == '--serve':
+            # Serve the JSON API instead of the CLI: --serve [host:]port
+            from server.service import InventoryService
+            host, port = None, None
+            if len(sys.argv) > 2:
+                host, _, port = sys.argv[2].rpartition(':')
+                host, port = host or None, int(port)
+            InventoryService(host, port).run()
+            return
     
     # Run CLI
-    cli = SimpleCLI()
+    cli = SimpleCLI(profile)
+    profile.mark('cli init')
     cli.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,350 @@
+# reports/analytics.py - Tool utilization reports from incremental daily rollups
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.connection import DatabaseConnection
+from reports.exporter import parse_date
+
+# Upper bounds (hours) of the time-out histogram buckets; the last bucket is open-ended
+DURATION_BUCKETS = (1, 2, 4, 8, 12, 24, 48, 72, 168, 336, 720)
+
+HOURS_OUT = "MAX(0, (julianday(actual_return) - julianday(checkout_date)) * 24)"
+BUCKET_OF = "CASE {} ELSE {} END".format(
+    " ".join(f"WHEN {HOURS_OUT} < {bound} THEN {i}" for i, bound in enumerate(DURATION_BUCKETS)),
+    len(DURATION_BUCKETS)
+)
+
+# Events are read from checkout_history, so archived checkouts still count.
+# Returns are found by actual_return alone (only a check-in sets it): adding
+# status = 'returned' lets the planner pick the status index and walk all history.
+
+# rollup table -> (key column, expression over checkouts)
+ROLLUPS = {
+    'rollup_item_daily': ('item_id', 'item_id'),
+    'rollup_employee_daily': ('employee_id', 'employee_id'),
+    'rollup_location_daily': ('location', "IFNULL(location, '')"),
+}
+
+CHECKOUT_EVENTS = '''
+    INSERT INTO {table} (day, {key}, checkouts, quantity_out)
+    SELECT date(checkout_date), {expr}, COUNT(*), SUM(quantity)
+    FROM checkout_history
+    WHERE id > ? AND id <= ?
+    GROUP BY 1, 2
+    ON CONFLICT({key}, day) DO UPDATE SET
+        checkouts = checkouts + excluded.checkouts,
+        quantity_out = quantity_out + excluded.quantity_out
+'''
+
+RETURN_EVENTS = '''
+    INSERT INTO {table} (day, {key}, returns, quantity_returned, tool_hours)
+    SELECT date(actual_return), {expr}, COUNT(*), SUM(quantity), SUM(quantity * {hours})
+    FROM checkout_history
+    WHERE actual_return >= ? AND actual_return < ?
+    GROUP BY 1, 2
+    ON CONFLICT({key}, day) DO UPDATE SET
+        returns = returns + excluded.returns,
+        quantity_returned = quantity_returned + excluded.quantity_returned,
+        tool_hours = tool_hours + excluded.tool_hours
+'''
+
+RETURN_DURATIONS = f'''
+    INSERT INTO rollup_item_durations (item_id, bucket, returns)
+    SELECT item_id, {BUCKET_OF}, COUNT(*)
+    FROM checkout_history
+    WHERE actual_return >= ? AND actual_return < ?
+    GROUP BY 1, 2
+    ON CONFLICT(item_id, bucket) DO UPDATE SET returns = returns + excluded.returns
+'''
+
+
+def bucket_label(bucket):
+    """Readable upper bound of a duration bucket"""
+    if bucket >= len(DURATION_BUCKETS):
+        return f">{DURATION_BUCKETS[-1]}h"
+    return f"≤{DURATION_BUCKETS[bucket]}h"
+
+
+class UtilizationAnalytics:
+    """Which tools move, for how long, and who uses them.
+
+    Reports read only the rollup tables, never the raw history. refresh()
+    folds in what happened since its last run: checkouts by id (everything
+    above the last id seen) and returns by actual_return (from the last
+    cutoff up to the database clock now), both found through indexes.
+    Checkouts count on the day they were taken, returns and hours out on
+    the day they came back. Percentiles of time out come from a per-item
+    histogram (DURATION_BUCKETS), so they are bucket bounds, not exact.
+    """
+
+    def __init__(self, db=None):
+        self.db = db or DatabaseConnection()
+
+    def refresh(self):
+        """Fold new checkout and return events into the rollups; returns counts"""
+        with self.db.transaction(immediate=True):
+            state = {row['name']: row['value'] for row in self.db.fetchall(
+                "SELECT name, value FROM rollup_state"
+            )}
+            last_id = int(state.get('last_checkout_id', 0))
+            # Per table: MAX(id) over the view would scan both
+            max_id = self.db.fetchone(
+                "SELECT MAX((SELECT IFNULL(MAX(id), 0) FROM checkouts), "
+                "(SELECT IFNULL(MAX(id), 0) FROM checkouts_archive)) AS id"
+            )['id']
+            since = state.get('returns_until', '')
+            until = self.db.fetchone("SELECT datetime('now') AS now")['now']
+
+            new_checkouts = 0
+            if max_id > last_id:
+                new_checkouts = self.db.fetchone(
+                    "SELECT COUNT(*) AS count FROM checkout_history WHERE id > ? AND id <= ?",
+                    (last_id, max_id)
+                )['count']
+                for table, (key, expr) in ROLLUPS.items():
+                    self.db.execute(CHECKOUT_EVENTS.format(table=table, key=key, expr=expr),
+                                    (last_id, max_id))
+
+            new_returns = self.db.fetchone(
+                "SELECT COUNT(*) AS count FROM checkout_history "
+                "WHERE actual_return >= ? AND actual_return < ?",
+                (since, until)
+            )['count']
+            if new_returns:
+                for table, (key, expr) in ROLLUPS.items():
+                    self.db.execute(RETURN_EVENTS.format(table=table, key=key, expr=expr,
+                                                         hours=HOURS_OUT), (since, until))
+                self.db.execute(RETURN_DURATIONS, (since, until))
+
+            self.db.executemany(
+                "INSERT OR REPLACE INTO rollup_state (name, value) VALUES (?, ?)",
+                [('last_checkout_id', str(max_id)), ('returns_until', until)]
+            )
+        return {'checkouts': new_checkouts, 'returns': new_returns}
+
+    def rebuild(self):
+        """Drop the rollups and recompute them from the full history"""
+        with self.db.transaction(immediate=True):
+            for table in (*ROLLUPS, 'rollup_item_durations', 'rollup_state'):
+                self.db.execute(f"DELETE FROM {table}")
+            return self.refresh()
+
+    def top_items(self, start=None, end=None, limit=20):
+        """Most checked-out items with average hours out, turnover and time-out percentiles"""
+        period, params = self._period(start, end)
+        # Rank on the rollup alone; only the top rows are joined to inventory
+        rows = [dict(row) for row in self.db.fetchall(f'''
+            SELECT t.*, i.item_name, i.brand, i.stock,
+                   1.0 * t.quantity_out / MAX(IFNULL(i.stock, 0), 1) AS turnover
+            FROM (
+                SELECT r.item_id,
+                       SUM(r.checkouts) AS checkouts,
+                       SUM(r.quantity_out) AS quantity_out,
+                       SUM(r.tool_hours) / NULLIF(SUM(r.quantity_returned), 0) AS avg_hours
+                FROM rollup_item_daily r
+                WHERE 1 = 1 {period}
+                GROUP BY r.item_id
+                ORDER BY checkouts DESC, quantity_out DESC
+                LIMIT ?
+            ) t
+            LEFT JOIN inventory i ON i.id = t.item_id
+            ORDER BY t.checkouts DESC, t.quantity_out DESC
+        ''', params + [limit])]
+
+        percentiles = self.duration_percentiles([row['item_id'] for row in rows])
+        for row in rows:
+            row.update(percentiles.get(row['item_id'], {'p50': None, 'p90': None}))
+        return rows
+
+    def duration_percentiles(self, item_ids, fractions=(0.5, 0.9)):
+        """{item_id: {'p50': bucket, 'p90': bucket}} from the time-out histograms (all time)"""
+        if not item_ids:
+            return {}
+        placeholders = ", ".join("?" * len(item_ids))
+        # Running totals per item in one pass; the percentile is the first
+        # bucket whose running total reaches that fraction of the item's total
+        rows = self.db.fetchall(f'''
+            SELECT item_id, bucket,
+                   SUM(returns) OVER (PARTITION BY item_id ORDER BY bucket) AS running,
+                   SUM(returns) OVER (PARTITION BY item_id) AS total
+            FROM rollup_item_durations
+            WHERE item_id IN ({placeholders})
+            ORDER BY item_id, bucket
+        ''', item_ids)
+
+        result = {}
+        for row in rows:
+            found = result.setdefault(row['item_id'], {})
+            for fraction in fractions:
+                name = f"p{int(fraction * 100)}"
+                if name not in found and row['running'] >= fraction * row['total']:
+                    found[name] = row['bucket']
+        return result
+
+    def employees(self, start=None, end=None, limit=20):
+        """Per-employee checkouts, units and tool-hours"""
+        period, params = self._period(start, end)
+        return [dict(row) for row in self.db.fetchall(f'''
+            SELECT e.employee_name, e.department,
+                   SUM(r.checkouts) AS checkouts,
+                   SUM(r.quantity_out) AS quantity_out,
+                   SUM(r.tool_hours) AS tool_hours,
+                   SUM(r.tool_hours) / NULLIF(SUM(r.quantity_returned), 0) AS avg_hours
+            FROM rollup_employee_daily r
+            LEFT JOIN employees e ON e.id = r.employee_id
+            WHERE 1 = 1 {period}
+            GROUP BY r.employee_id
+            ORDER BY tool_hours DESC
+            LIMIT ?
+        ''', params + [limit])]
+
+    def departments(self, start=None, end=None):
+        """Per-department checkouts, tool-hours and share of all tool-hours"""
+        period, params = self._period(start, end)
+        return [dict(row) for row in self.db.fetchall(f'''
+            SELECT IFNULL(e.department, '(none)') AS department,
+                   COUNT(DISTINCT r.employee_id) AS employees,
+                   SUM(r.checkouts) AS checkouts,
+                   SUM(r.tool_hours) AS tool_hours,
+                   SUM(r.tool_hours) / NULLIF(SUM(SUM(r.tool_hours)) OVER (), 0) AS share
+            FROM rollup_employee_daily r
+            LEFT JOIN employees e ON e.id = r.employee_id
+            WHERE 1 = 1 {period}
+            GROUP BY 1
+            ORDER BY tool_hours DESC
+        ''', params)]
+
+    def locations(self, start=None, end=None):
+        """Per-location checkouts, units and average hours out"""
+        period, params = self._period(start, end)
+        return [dict(row) for row in self.db.fetchall(f'''
+            SELECT CASE r.location WHEN '' THEN '(none)' ELSE r.location END AS location,
+                   SUM(r.checkouts) AS checkouts,
+                   SUM(r.quantity_out) AS quantity_out,
+                   SUM(r.tool_hours) / NULLIF(SUM(r.quantity_returned), 0) AS avg_hours
+            FROM rollup_location_daily r
+            WHERE 1 = 1 {period}
+            GROUP BY r.location
+            ORDER BY checkouts DESC
+        ''', params)]
+
+    def idle_items(self, days=365, limit=50):
+        """Items not checked out in the last `days` days, most stock first"""
+        return [dict(row) for row in self.db.fetchall('''
+            SELECT id, item_name, brand, stock
+            FROM inventory
+            WHERE id NOT IN (
+                SELECT item_id FROM rollup_item_daily WHERE day >= date('now', ?)
+            )
+            ORDER BY stock DESC, id
+            LIMIT ?
+        ''', (f"-{int(days)} days", limit))]
+
+    def _period(self, start, end):
+        """WHERE fragment and params for a --from/--to day range"""
+        filters = []
+        params = []
+        if start:
+            filters.append("AND r.day >= ?")
+            params.append(parse_date(start)[:10])
+        if end:
+            filters.append("AND r.day < ?")
+            params.append(parse_date(end, end=True)[:10])
+        return " ".join(filters), params
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='analytics', description='Tool utilization reports (from daily rollups)'
+    )
+    parser.add_argument('report', nargs='?', default='items',
+                        choices=['items', 'employees', 'departments', 'locations', 'idle',
+                                 'refresh', 'rebuild'])
+    parser.add_argument('--from', dest='start', metavar='DATE')
+    parser.add_argument('--to', dest='end', metavar='DATE')
+    parser.add_argument('--days', type=int, default=365, help='idle: no checkouts in this many days')
+    parser.add_argument('--limit', type=int, default=20)
+    return parser
+
+
+def _hours(value):
+    return f"{value:.1f}" if value is not None else "-"
+
+
+def run_report(argv):
+    """Parse analytics arguments, bring the rollups up to date and print the report"""
+    try:
+        args = build_parser().parse_args(argv)
+    except SystemExit:
+        return
+
+    analytics = UtilizationAnalytics()
+    if args.report == 'rebuild':
+        counts = analytics.rebuild()
+        print(f"✅ Rollups rebuilt from {counts['checkouts']} checkouts and {counts['returns']} returns")
+        return
+
+    counts = analytics.refresh()
+    if args.report == 'refresh':
+        print(f"✅ Rollups updated: {counts['checkouts']} new checkouts, {counts['returns']} new returns")
+        return
+
+    try:
+        if args.report == 'items':
+            rows = analytics.top_items(args.start, args.end, args.limit)
+            print("\n🔧 MOST USED ITEMS:")
+            print(f"{'ID':<6} {'Item':<32} {'Brand':<12} {'Out':>6} {'Units':>6} "
+                  f"{'Avg h':>7} {'Turns':>6} {'p50':>6} {'p90':>6}")
+            for row in rows:
+                print(f"{row['item_id']:<6} {(row['item_name'] or '?')[:32]:<32} "
+                      f"{(row['brand'] or '')[:12]:<12} {row['checkouts']:>6} "
+                      f"{row['quantity_out']:>6} {_hours(row['avg_hours']):>7} "
+                      f"{row['turnover']:>6.1f} "
+                      f"{bucket_label(row['p50']) if row['p50'] is not None else '-':>6} "
+                      f"{bucket_label(row['p90']) if row['p90'] is not None else '-':>6}")
+            print("(p50/p90: time out, all time, histogram bucket bounds)")
+
+        elif args.report == 'employees':
+            rows = analytics.employees(args.start, args.end, args.limit)
+            print("\n👷 EMPLOYEE UTILIZATION:")
+            print(f"{'Employee':<32} {'Department':<14} {'Out':>6} {'Units':>6} "
+                  f"{'Tool-h':>9} {'Avg h':>7}")
+            for row in rows:
+                print(f"{(row['employee_name'] or '?')[:32]:<32} "
+                      f"{(row['department'] or '')[:14]:<14} {row['checkouts']:>6} "
+                      f"{row['quantity_out']:>6} {row['tool_hours']:>9.1f} "
+                      f"{_hours(row['avg_hours']):>7}")
+
+        elif args.report == 'departments':
+            rows = analytics.departments(args.start, args.end)
+            print("\n🏭 DEPARTMENT UTILIZATION:")
+            print(f"{'Department':<20} {'People':>6} {'Out':>7} {'Tool-h':>10} {'Share':>6}")
+            for row in rows:
+                print(f"{row['department'][:20]:<20} {row['employees']:>6} {row['checkouts']:>7} "
+                      f"{row['tool_hours']:>10.1f} {row['share'] or 0:>6.0%}")
+
+        elif args.report == 'locations':
+            rows = analytics.locations(args.start, args.end)
+            print("\n📍 CHECKOUTS BY LOCATION:")
+            print(f"{'Location':<24} {'Out':>7} {'Units':>7} {'Avg h':>7}")
+            for row in rows:
+                print(f"{row['location'][:24]:<24} {row['checkouts']:>7} "
+                      f"{row['quantity_out']:>7} {_hours(row['avg_hours']):>7}")
+
+        else:
+            rows = analytics.idle_items(args.days, args.limit)
+            print(f"\n💤 ITEMS NOT CHECKED OUT IN {args.days} DAYS:")
+            print(f"{'ID':<6} {'Item':<40} {'Brand':<14} {'Stock':>6}")
+            for row in rows:
+                print(f"{row['id']:<6} {row['item_name'][:40]:<40} "
+                      f"{(row['brand'] or '')[:14]:<14} {row['stock'] or 0:>6}")
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    if not rows:
+        print("Nothing to report for this period")
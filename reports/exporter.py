@@ -0,0 +1,234 @@
+# reports/exporter.py - Streaming CSV / JSON Lines exports of inventory and checkouts
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import EXPORT_CONFIG
+from database.connection import DatabaseConnection
+
+# dataset -> (query, date column for --from/--to, change column for --since-last)
+DATASETS = {
+    'inventory': ('''
+        SELECT id, item_id AS catalog_id, item_name, equipment, brand,
+               stock, available, location, notes
+        FROM inventory
+        WHERE 1 = 1 {filters}
+        ORDER BY id
+    ''', None, None),
+    'active': ('''
+        SELECT c.id AS checkout_id, c.checkout_date, c.expected_return, c.quantity,
+               c.outstanding, c.location, c.order_number, i.id AS item_id, i.item_id AS catalog_id,
+               i.item_name, i.brand, e.employee_name, e.employee_id AS badge
+        FROM checkouts c
+        LEFT JOIN inventory i ON c.item_id = i.id
+        LEFT JOIN employees e ON c.employee_id = e.id
+        WHERE c.status = 'active' {filters}
+        ORDER BY c.id
+    ''', 'c.checkout_date', 'c.checkout_date'),
+    'history': ('''
+        SELECT c.id AS checkout_id, c.checkout_date, c.expected_return, c.actual_return,
+               c.status, c.quantity, c.location, c.order_number, i.id AS item_id,
+               i.item_id AS catalog_id, i.item_name, i.brand, e.employee_name,
+               e.employee_id AS badge
+        FROM checkout_history c
+        LEFT JOIN inventory i ON c.item_id = i.id
+        LEFT JOIN employees e ON c.employee_id = e.id
+        WHERE 1 = 1 {filters}
+        ORDER BY c.id
+    ''', 'c.checkout_date', 'COALESCE(c.actual_return, c.checkout_date)'),
+}
+
+FORMATS = ('csv', 'jsonl')
+
+
+def parse_date(value, end=False):
+    """'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS' as a timestamp string.
+
+    A bare end date includes that whole day (the bound is the next midnight).
+    """
+    for pattern in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
+        try:
+            parsed = datetime.strptime(value.strip(), pattern)
+        except ValueError:
+            continue
+        if end and pattern == '%Y-%m-%d':
+            parsed += timedelta(days=1)
+        return parsed.strftime('%Y-%m-%d %H:%M:%S')
+    raise ValueError(f"invalid date {value!r} (use YYYY-MM-DD)")
+
+
+class Exporter:
+    """Streams a dataset to a file without holding it in memory.
+
+    Rows come from one cursor read chunk_size at a time inside a single
+    read transaction, so the file is a consistent snapshot and memory use
+    doesn't grow with the history. The file is written under a temporary
+    name and renamed when complete.
+
+    --since-last exports only rows that changed after the previous
+    since-last export of the same dataset. The watermark is the database
+    clock at the start of the export: rows changed from the watermark up
+    to (not including) that moment are exported, and the watermark only
+    moves once the file is complete.
+    """
+
+    def __init__(self, db=None, chunk_size=None, output_dir=None):
+        self.db = db or DatabaseConnection()
+        self.chunk_size = chunk_size or EXPORT_CONFIG['chunk_size']
+        self.output_dir = Path(output_dir or EXPORT_CONFIG['directory'])
+
+    def export(self, dataset, fmt='csv', compress=False, output=None,
+               start=None, end=None, since_last=False):
+        """Write one dataset and return a summary dict (dataset, path, rows, watermark, seconds)"""
+        if dataset not in DATASETS:
+            raise ValueError(f"unknown dataset {dataset!r} (choose from {', '.join(DATASETS)})")
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown format {fmt!r} (choose from {', '.join(FORMATS)})")
+        query, date_column, change_column = DATASETS[dataset]
+        if (start or end) and not date_column:
+            raise ValueError(f"{dataset} has no dates to filter on")
+        if since_last and not change_column:
+            raise ValueError(f"{dataset} has no change timestamps; export it in full")
+
+        if output:
+            path = Path(output)
+            compress = compress or path.suffix == '.gz'
+        else:
+            stamp = time.strftime('%Y%m%d_%H%M%S')
+            path = self.output_dir / f"{dataset}_{stamp}.{fmt}{'.gz' if compress else ''}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        filters = []
+        params = []
+        if start:
+            filters.append(f"AND {date_column} >= ?")
+            params.append(parse_date(start))
+        if end:
+            filters.append(f"AND {date_column} < ?")
+            params.append(parse_date(end, end=True))
+
+        started = time.perf_counter()
+        temp = path.with_name(path.name + ".part")
+        watermark = None
+        try:
+            with self.db.transaction():
+                if since_last:
+                    previous = self.db.fetchone(
+                        "SELECT watermark FROM export_watermarks WHERE dataset = ?", (dataset,)
+                    )
+                    watermark = self.db.fetchone("SELECT datetime('now') AS now")['now']
+                    if previous:
+                        filters.append(f"AND {change_column} >= ?")
+                        params.append(previous['watermark'])
+                    filters.append(f"AND {change_column} < ?")
+                    params.append(watermark)
+
+                cursor = self.db.execute(query.format(filters=" ".join(filters)), params)
+                rows = self._write(cursor, temp, fmt, compress)
+            os.replace(temp, path)
+        finally:
+            if temp.exists():
+                temp.unlink()
+
+        if watermark:
+            self.db.execute('''
+                INSERT INTO export_watermarks (dataset, watermark, exported_at, rows, path)
+                VALUES (?, ?, CURRENT_TIMESTAMP, ?, ?)
+                ON CONFLICT(dataset) DO UPDATE SET
+                    watermark = excluded.watermark,
+                    exported_at = excluded.exported_at,
+                    rows = excluded.rows,
+                    path = excluded.path
+            ''', (dataset, watermark, rows, str(path)))
+
+        return {
+            'dataset': dataset,
+            'path': path,
+            'rows': rows,
+            'watermark': watermark,
+            'seconds': time.perf_counter() - started
+        }
+
+    def _write(self, cursor, path, fmt, compress):
+        """Drain the cursor into the file chunk by chunk; returns the row count"""
+        columns = [column[0] for column in cursor.description]
+        if compress:
+            file = gzip.open(path, 'wt', compresslevel=EXPORT_CONFIG['gzip_level'],
+                             encoding='utf-8', newline='')
+        else:
+            file = open(path, 'w', encoding='utf-8', newline='')
+
+        rows = 0
+        with file:
+            if fmt == 'csv':
+                writer = csv.writer(file)
+                writer.writerow(columns)
+                write_chunk = writer.writerows
+            else:
+                # One encoder for the whole file (json.dumps with options builds one per call)
+                encode = json.JSONEncoder(ensure_ascii=False).encode
+
+                def write_chunk(chunk):
+                    file.writelines(encode(dict(zip(columns, row))) + "\n" for row in chunk)
+
+            while True:
+                chunk = cursor.fetchmany(self.chunk_size)
+                if not chunk:
+                    break
+                write_chunk(chunk)
+                rows += len(chunk)
+        return rows
+
+    def watermarks(self):
+        """Last since-last export per dataset"""
+        return [dict(row) for row in self.db.fetchall(
+            "SELECT dataset, watermark, exported_at, rows, path FROM export_watermarks ORDER BY dataset"
+        )]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='export', description='Export inventory or checkouts to CSV / JSON Lines'
+    )
+    parser.add_argument('dataset', choices=list(DATASETS))
+    parser.add_argument('--format', choices=FORMATS, default='csv')
+    parser.add_argument('--gzip', action='store_true', help='compress the output')
+    parser.add_argument('--from', dest='start', metavar='DATE', help='checkouts from this date')
+    parser.add_argument('--to', dest='end', metavar='DATE', help='checkouts up to this date')
+    parser.add_argument('--since-last', action='store_true',
+                        help='only rows changed since the previous --since-last export')
+    parser.add_argument('--output', help='file to write (default: data/exports/...)')
+    return parser
+
+
+def run_export(argv):
+    """Parse export arguments, run it and print the outcome (CLI and main.py --export)"""
+    try:
+        args = build_parser().parse_args(argv)
+    except SystemExit:
+        return None  # argparse already printed usage or the error
+
+    try:
+        summary = Exporter().export(
+            args.dataset, args.format, args.gzip, args.output,
+            args.start, args.end, args.since_last
+        )
+    except (ValueError, OSError) as e:
+        print(f"❌ Export error: {e}")
+        return None
+
+    rate = summary['rows'] / summary['seconds'] if summary['seconds'] else 0
+    print(f"✅ Exported {summary['rows']} {summary['dataset']} rows to {summary['path']} "
+          f"({summary['seconds']:.1f}s, {rate:.0f} rows/s)")
+    if summary['watermark']:
+        print(f"   Next --since-last export starts at {summary['watermark']}")
+    return summary
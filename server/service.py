@@ -0,0 +1,343 @@
+# server/service.py - Asyncio HTTP/JSON API over the inventory (main.py --serve)
+import asyncio
+import base64
+import csv
+import io
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import FUZZY_CONFIG, IMPORT_CONFIG, PAGINATION_CONFIG, QUERY_STATS, SERVER_CONFIG
+from core.checkout import CheckoutManager
+from core.fuzzy import FuzzyIndex
+from core.importer import CatalogImporter
+from core.inventory import InventoryManager
+from database.instrumentation import query_stats
+from server.writer import WriteQueue
+
+REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    409: 'Conflict',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error'
+}
+
+
+class HTTPError(Exception):
+    """Turned into a JSON error response with this status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def encode_cursor(after):
+    """Opaque page token for a keyset position (None on the last page)"""
+    if after is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(list(after)).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(token):
+    """Keyset position from a page token: a pair of plain values"""
+    if not token:
+        return None
+    try:
+        after = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+    except ValueError:
+        after = None
+    if (not isinstance(after, list) or len(after) != 2
+            or not all(isinstance(value, (str, int, float)) for value in after)):
+        raise HTTPError(400, "invalid 'after' token")
+    return tuple(after)
+
+
+class InventoryService:
+    """JSON endpoints for search, summary, checkouts and import.
+
+    Reads run on a small thread pool; each thread keeps its own pooled
+    SQLite connection, so the pool is the set of reader connections. Every
+    mutation goes through one WriteQueue, which serializes them on a
+    single writer connection and group-commits whatever has queued up.
+    The writer also keeps the suggestion index current: at start, for
+    items queued by migrations or other processes, and after every write.
+
+        GET  /search?q=&page_size=&after=   (+ "suggestions" when q finds almost nothing)
+        GET  /summary
+        GET  /active?page_size=&after=
+        GET  /stats
+        POST /checkout  {"employee", "lines": [{"item_id", "quantity"}], "order_number", "location"}
+        POST /checkin   {"item_id", "quantity", "employee"} or {"checkout_id", "quantity"}
+        POST /import    CSV text (same columns as the import command)
+    """
+
+    def __init__(self, host=None, port=None, readers=None):
+        self.host = host or SERVER_CONFIG['host']
+        self.port = port or SERVER_CONFIG['port']
+        self.readers = ThreadPoolExecutor(
+            max_workers=readers or SERVER_CONFIG['readers'], thread_name_prefix='reader'
+        )
+        self.writer = WriteQueue()
+        self.inventory = InventoryManager()
+        self.checkout = CheckoutManager()
+        self.fuzzy = FuzzyIndex()
+        self.requests = 0
+        self.errors = 0
+        self.routes = {
+            '/search': ('GET', self.search),
+            '/summary': ('GET', self.summary),
+            '/active': ('GET', self.active),
+            '/stats': ('GET', self.stats),
+            '/checkout': ('POST', self.checkout_order),
+            '/checkin': ('POST', self.checkin),
+            '/import': ('POST', self.import_csv),
+        }
+
+    def run(self):
+        """Serve until interrupted"""
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            print("\nServer stopped")
+
+    async def start(self):
+        """Start the writer and index whatever is waiting for suggestions"""
+        self.writer.start()
+        await self.writer.submit(self.fuzzy.refresh)
+
+    async def serve(self):
+        await self.start()
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        print(f"🌐 Serving on http://{self.host}:{self.port} (Ctrl+C to stop)")
+        exporter = None
+        if QUERY_STATS['prometheus_file']:
+            exporter = asyncio.get_running_loop().create_task(self.export_metrics())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if exporter:
+                exporter.cancel()
+            await self.writer.stop()
+            self.readers.shutdown(wait=False)
+
+    async def export_metrics(self):
+        """Rewrite the Prometheus textfile every prometheus_interval seconds"""
+        while True:
+            await asyncio.sleep(QUERY_STATS['prometheus_interval'])
+            try:
+                await self.read(query_stats.export_prometheus)
+            except OSError as e:
+                print(f"⚠️ Could not write metrics: {e}")
+
+    async def read(self, func, *args):
+        """Run a read on the reader pool"""
+        return await asyncio.get_running_loop().run_in_executor(self.readers, func, *args)
+
+    async def write(self, func, *args):
+        """Run a mutation on the writer; items it queued are indexed for suggestions"""
+        return await self.writer.submit(self._indexed, func, *args)
+
+    def _indexed(self, func, *args):
+        result = func(*args)
+        self.fuzzy.refresh()
+        return result
+
+    # HTTP plumbing
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one keep-alive connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.respond(writer, 400, {'error': 'malformed request line'}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (
+                    version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                )
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self.respond(writer, 400, {'error': 'invalid Content-Length'}, False)
+                    break
+                if length > SERVER_CONFIG['max_body_bytes']:
+                    await self.respond(writer, 413, {'error': 'request body too large'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.dispatch(method, target, body)
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        """(status, payload) for one request"""
+        self.requests += 1
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            route = self.routes.get(url.path.rstrip('/') or '/')
+            if route is None:
+                raise HTTPError(404, f"no such endpoint: {url.path}")
+            allowed, handler = route
+            if method != allowed:
+                raise HTTPError(405, f"use {allowed} for {url.path}")
+            return await handler(query, body)
+        except HTTPError as e:
+            self.errors += 1
+            return e.status, {'error': str(e)}
+        except Exception as e:
+            self.errors += 1
+            return 500, {'error': str(e)}
+
+    async def respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    # Endpoints: (query, body) -> (status, payload)
+
+    async def search(self, query, body):
+        items, after = await self.read(
+            self.inventory.search_page,
+            query.get('q', ''), page_size(query), decode_cursor(query.get('after'))
+        )
+        payload = {'items': items, 'next': encode_cursor(after)}
+        if query.get('q') and not query.get('after') and len(items) < FUZZY_CONFIG['min_hits']:
+            # Readers don't write: the writer keeps the index current
+            payload['suggestions'] = await self.read(
+                self.inventory.suggest_items, query['q'], None,
+                {item['id'] for item in items}, False
+            )
+        return 200, payload
+
+    async def summary(self, query, body):
+        # Readers don't write: stale counters are rebuilt on the writer first
+        if not await self.read(self.inventory.stats_current):
+            await self.writer.submit(self.inventory.rebuild_stats)
+        return 200, await self.read(self.inventory.get_summary, False)
+
+    async def active(self, query, body):
+        checkouts, after = await self.read(
+            self.checkout.get_active_page, page_size(query), decode_cursor(query.get('after'))
+        )
+        return 200, {'checkouts': checkouts, 'next': encode_cursor(after)}
+
+    async def stats(self, query, body):
+        return 200, {
+            'requests': self.requests,
+            'errors': self.errors,
+            'writer': self.writer.stats(),
+            'queries': query_stats.top(10),
+            'slow_queries': query_stats.slow_total
+        }
+
+    async def checkout_order(self, query, body):
+        order = json_body(body)
+        employee = str(order.get('employee') or '').strip()
+        lines = order.get('lines')
+        if lines is None and 'item_id' in order:
+            lines = [{'item_id': order['item_id'], 'quantity': order.get('quantity', 1)}]
+        if not employee or not isinstance(lines, list) or not lines:
+            raise HTTPError(400, "need 'employee' and a non-empty 'lines' list")
+        for line in lines:
+            if not isinstance(line, dict) or not isinstance(line.get('item_id'), int):
+                raise HTTPError(400, "each line needs an integer 'item_id'")
+
+        success, message, results = await self.write(
+            self.checkout.checkout_order,
+            str(order.get('order_number') or ''), employee, lines,
+            order.get('location') or 'field'
+        )
+        return (200 if success else 409), {'ok': success, 'message': message, 'lines': results}
+
+    async def checkin(self, query, body):
+        request = json_body(body)
+        item_id = request.get('item_id')
+        checkout_id = request.get('checkout_id')
+        quantity = request.get('quantity')
+        employee = request.get('employee')
+        if quantity is not None and not isinstance(quantity, int):
+            raise HTTPError(400, "'quantity' must be an integer")
+
+        if isinstance(checkout_id, int):
+            success, message = await self.write(
+                self.checkout.checkin_checkout, checkout_id, quantity
+            )
+        elif isinstance(item_id, int):
+            success, message = await self.write(
+                self.checkout.checkin_item, item_id, quantity, str(employee or '').strip() or None
+            )
+        else:
+            raise HTTPError(400, "need an integer 'item_id' or 'checkout_id'")
+        return (200 if success else 409), {'ok': success, 'message': message}
+
+    async def import_csv(self, query, body):
+        try:
+            text = body.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise HTTPError(400, "CSV must be UTF-8")
+        reader = csv.reader(io.StringIO(text, newline=''))
+        header = next(reader, None)
+        if not header:
+            raise HTTPError(400, "empty CSV")
+
+        summary = await self.write(CatalogImporter().import_rows, reader, header)
+        limit = IMPORT_CONFIG['max_reported_rejects']
+        summary['rejected_count'] = len(summary['rejected'])
+        summary['rejected'] = summary['rejected'][:limit]
+        return 200, summary
+
+
+def json_body(body):
+    """Parse a JSON object request body"""
+    try:
+        data = json.loads(body or b'{}')
+    except ValueError:
+        raise HTTPError(400, "body must be JSON")
+    if not isinstance(data, dict):
+        raise HTTPError(400, "body must be a JSON object")
+    return data
+
+
+def page_size(query):
+    """page_size query parameter, bounded to 1..500"""
+    try:
+        size = int(query.get('page_size') or PAGINATION_CONFIG['page_size'])
+    except ValueError:
+        raise HTTPError(400, "page_size must be a number")
+    return max(1, min(size, 500))
@@ -0,0 +1,121 @@
+# server/writer.py - Single writer with group commit for the HTTP service
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import SERVER_CONFIG
+from database.connection import DatabaseConnection
+
+
+class WriteQueue:
+    """Serializes every mutation through one thread and one connection.
+
+    Writes are queued by request handlers. The writer task takes whatever
+    has queued up (while the previous commit was in flight, plus anything
+    arriving within batch_window seconds, up to max_batch) and runs it in
+    one BEGIN IMMEDIATE ... COMMIT. Each write gets its own savepoint, so
+    a failing write only undoes itself. Callers are answered after the
+    commit, so a success reply means the change is on disk.
+    """
+
+    def __init__(self, db=None, max_batch=None, batch_window=None):
+        self.db = db or DatabaseConnection()
+        self.max_batch = max_batch or SERVER_CONFIG['max_batch']
+        self.batch_window = (
+            batch_window if batch_window is not None
+            else SERVER_CONFIG['batch_window_ms'] / 1000
+        )
+        # One thread = one pooled connection = one writer
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='writer')
+        self.queue = None
+        self.task = None
+        self.batches = 0
+        self.writes = 0
+        self.largest_batch = 0
+
+    def start(self):
+        """Start the writer task on the running event loop"""
+        self.queue = asyncio.Queue()
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Cancel the writer task and release its thread"""
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.executor.shutdown(wait=True)
+
+    async def submit(self, write, *args):
+        """Queue write(*args) and return its result once committed"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((write, args, future))
+        return await future
+
+    def stats(self):
+        """Batch counters since start"""
+        return {
+            'writes': self.writes,
+            'commits': self.batches,
+            'average_batch': self.writes / self.batches if self.batches else 0.0,
+            'largest_batch': self.largest_batch,
+            'queued': self.queue.qsize() if self.queue else 0
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                outcomes = await loop.run_in_executor(self.executor, self._commit, batch)
+            except Exception as e:
+                # The commit itself failed: none of the batch happened
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, _, future), (ok, value) in zip(batch, outcomes):
+                if future.done():
+                    continue  # the client went away
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    def _commit(self, batch):
+        """Run a batch of writes in one transaction (writer thread)"""
+        outcomes = []
+        with self.db.transaction(immediate=True):
+            for write, args, _ in batch:
+                try:
+                    with self.db.transaction():
+                        outcomes.append((True, write(*args)))
+                except Exception as e:
+                    outcomes.append((False, e))
+
+        self.batches += 1
+        self.writes += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        return outcomes
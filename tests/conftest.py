@@ -0,0 +1,31 @@
+# tests/conftest.py - Shared fixtures: every test gets its own temporary database
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import config
+from database.instrumentation import query_stats
+from database.connection import DatabaseConnection, close_all
+from database.setup import create_tables
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Point the standard warehouse at an empty database under tmp_path"""
+    path = tmp_path / 'inventory.db'
+    monkeypatch.setitem(config.DATABASE_CONFIG['standard'], 'path', path)
+    monkeypatch.setattr(query_stats, 'slow_log', None)
+    yield path
+    close_all()
+
+
+@pytest.fixture
+def db(db_path):
+    """A migrated database connection"""
+    connection = DatabaseConnection()
+    create_tables(connection)
+    return connection
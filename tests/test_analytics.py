@@ -0,0 +1,71 @@
+# tests/test_analytics.py - Utilization rollups: refresh, rebuild and reports
+import pytest
+
+from core.checkout import CheckoutManager
+from core.inventory import InventoryManager
+from reports.analytics import UtilizationAnalytics, bucket_label
+
+
+@pytest.fixture
+def analytics(db):
+    inventory = InventoryManager(db)
+    for name in ('Taladro', 'Amoladora', 'Nivel láser'):
+        inventory.add_item({'item_name': name, 'brand': 'Bosch', 'stock': 4})
+    checkout = CheckoutManager(db)
+    # (item, employee, quantity, location, taken, returned)
+    for item_id, employee, quantity, location, taken, returned in (
+        (1, 'Ana Perez', 2, 'shop', '2024-03-01 08:00:00', '2024-03-01 11:00:00'),
+        (1, 'Ana Perez', 1, 'field', '2024-03-02 08:00:00', '2024-03-03 14:00:00'),
+        (2, 'Luis Gomez', 1, 'field', '2024-03-05 08:00:00', None),
+    ):
+        assert checkout.checkout_item(item_id, employee, quantity, location)[0]
+        checkout_id = db.fetchone("SELECT MAX(id) AS id FROM checkouts")['id']
+        if returned:
+            assert checkout.checkin_checkout(checkout_id)[0]
+        db.execute("UPDATE checkouts SET checkout_date = ?, actual_return = ? WHERE id = ?",
+                   (taken, returned, checkout_id))
+    return UtilizationAnalytics(db)
+
+
+def test_refresh_rolls_up_checkouts_and_returns(analytics):
+    assert analytics.refresh() == {'checkouts': 3, 'returns': 2}
+    assert analytics.refresh() == {'checkouts': 0, 'returns': 0}
+
+    items = analytics.top_items()
+    assert [(row['item_name'], row['checkouts'], row['quantity_out']) for row in items] == \
+        [('Taladro', 2, 3), ('Amoladora', 1, 1)]
+    # 2 units x 3h + 1 unit x 30h over 3 units returned
+    assert items[0]['avg_hours'] == pytest.approx(12)
+    assert items[0]['turnover'] == pytest.approx(3 / 4)
+    assert (bucket_label(items[0]['p50']), bucket_label(items[0]['p90'])) == ('≤4h', '≤48h')
+    assert items[1]['avg_hours'] is None and items[1]['p50'] is None
+
+    assert [(row['employee_name'], row['checkouts'], row['tool_hours'])
+            for row in analytics.employees()] == [('Ana Perez', 2, 36), ('Luis Gomez', 1, 0)]
+    assert [(row['location'], row['checkouts']) for row in analytics.locations()] == \
+        [('field', 2), ('shop', 1)]
+    assert [row['item_name'] for row in analytics.idle_items(days=36500)] == ['Nivel láser']
+
+
+def test_period_filters_on_checkout_day(analytics):
+    analytics.refresh()
+    items = analytics.top_items(start='2024-03-02', end='2024-03-04')
+    assert [(row['item_name'], row['checkouts']) for row in items] == [('Taladro', 1)]
+
+
+def test_incremental_refresh_matches_rebuild(db, analytics):
+    analytics.refresh()
+    # As if that refresh ran in April
+    db.execute("UPDATE rollup_state SET value = '2024-04-01 00:00:00' WHERE name = 'returns_until'")
+    # Later events: a new checkout and the open one coming back
+    checkout = CheckoutManager(db)
+    assert checkout.checkout_item(3, 'Ana Perez', 1, 'shop')[0]
+    assert checkout.checkin_item(2)[0]
+    db.execute("UPDATE checkouts SET actual_return = '2024-05-02 08:00:00' WHERE id = 3")
+    assert analytics.refresh() == {'checkouts': 1, 'returns': 1}
+
+    reports = (analytics.top_items(), analytics.employees(), analytics.departments(),
+               analytics.locations())
+    assert analytics.rebuild() == {'checkouts': 4, 'returns': 3}
+    assert (analytics.top_items(), analytics.employees(), analytics.departments(),
+            analytics.locations()) == reports
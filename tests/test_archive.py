@@ -0,0 +1,39 @@
+# tests/test_archive.py - Moving old returned checkouts to checkouts_archive
+from core.checkout import CheckoutManager
+from core.inventory import InventoryManager
+from database.archive import CheckoutArchiver
+
+
+def make_checkouts(db, count):
+    InventoryManager(db).add_item({'item_name': 'Taladro', 'brand': 'Bosch', 'stock': count})
+    checkout = CheckoutManager(db)
+    for _ in range(count):
+        assert checkout.checkout_item(1, 'Ana Perez', 1)[0]
+
+
+def test_archives_old_returns_in_batches(db):
+    make_checkouts(db, 5)
+    assert CheckoutManager(db).checkin_item(1, 4)[0]
+    db.execute("UPDATE checkouts SET actual_return = '2020-01-01 08:00:00' WHERE id <= 3")
+
+    archiver = CheckoutArchiver(db, after_days=30, batch_size=2)
+    assert archiver.pending() == 3
+    summary = archiver.archive()
+    assert (summary['archived'], summary['batches'], summary['remaining']) == (3, 2, 2)
+
+    assert [row['id'] for row in db.fetchall("SELECT id FROM checkouts_archive ORDER BY id")] == [1, 2, 3]
+    # History still sees every checkout once
+    assert db.fetchone("SELECT COUNT(*) AS count FROM checkout_history")['count'] == 5
+    assert archiver.archive()['archived'] == 0
+
+
+def test_rows_that_cannot_move_do_not_stop_the_run(db):
+    make_checkouts(db, 6)
+    assert CheckoutManager(db).checkin_item(1)[0]
+    # The oldest returns are not in 'returned' status (e.g. marked lost afterwards)
+    db.execute("UPDATE checkouts SET actual_return = '2020-01-0' || id || ' 08:00:00'")
+    db.execute("UPDATE checkouts SET status = 'lost' WHERE id <= 2")
+
+    summary = CheckoutArchiver(db, after_days=30, batch_size=2).archive()
+    assert summary['archived'] == 4
+    assert [row['id'] for row in db.fetchall("SELECT id FROM checkouts ORDER BY id")] == [1, 2]
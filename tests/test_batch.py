@@ -0,0 +1,51 @@
+# tests/test_batch.py - main.py --exec: command parsing and JSON Lines output
+import io
+import json
+import sys
+
+import pytest
+
+import main
+from core.batch import BatchRunner, parse_command
+
+
+@pytest.mark.parametrize('line', [
+    'update-stock 7 30',
+    'update stock 7 30',
+    'Update_Stock 7 30',
+    '{"op": "update stock", "item_id": 7, "stock": 30}'
+])
+def test_update_stock_spellings(line):
+    command = parse_command(line)
+    assert command['op'] == 'update-stock'
+    assert (command['item_id'], command['stock']) == (7, 30)
+
+
+def test_bad_lines_fail_alone(db):
+    output = io.StringIO()
+    runner = BatchRunner(db, output)
+    for number, line in enumerate(['add Martillo Stanley "" 5', 'update stock 1',
+                                   '[1, 2]', 'update stock 1 8'], 1):
+        runner.add(number, line)
+    runner.flush()
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [result['ok'] for result in results] == [True, False, False, True]
+    assert results[1]['message'] == "usage: update-stock ITEM_ID STOCK"
+    assert db.fetchone("SELECT stock FROM inventory WHERE id = 1")[0] == 8
+
+
+def test_exec_stdout_is_json_lines(db_path, monkeypatch, capsys):
+    # A fresh database: the schema migration runs and must not touch stdout
+    commands = 'add "Llave combinacion" Bahco "" 4\nsearch llave\ncheckout 1 2 "Ana Perez"\n'
+    monkeypatch.setattr(sys, 'argv', ['main.py', '--exec', '-'])
+    monkeypatch.setattr(sys, 'stdin', io.StringIO(commands))
+    with pytest.raises(SystemExit) as exited:
+        main.main()
+    assert exited.value.code == 0
+
+    out, err = capsys.readouterr()
+    results = [json.loads(line) for line in out.splitlines()]
+    assert [result['op'] for result in results] == ['add', 'search', 'checkout']
+    assert all(result['ok'] for result in results)
+    assert 'schema upgraded' in err
@@ -0,0 +1,101 @@
+# tests/test_checkout.py - Orders, check-ins and the employee cache
+import sqlite3
+
+import pytest
+
+from core.checkout import CheckoutManager
+from core.inventory import InventoryManager
+
+
+@pytest.fixture
+def checkout(db):
+    inventory = InventoryManager(db)
+    for name, stock in [('Llave combinacion 13mm', 3), ('Martillo de bola', 1)]:
+        inventory.add_item({'item_name': name, 'brand': 'Bahco', 'stock': stock})
+    return CheckoutManager(db)
+
+
+def available(db):
+    return [row['available'] for row in db.fetchall("SELECT available FROM inventory ORDER BY id")]
+
+
+def test_rejected_order_changes_nothing(db, checkout):
+    ok, message, results = checkout.checkout_order('OT-1', 'Ana Perez', [(1, 2), (2, 5)])
+
+    assert not ok
+    assert message == "Order rejected: 1 of 2 lines can't be filled"
+    assert [result['message'] for result in results] == [
+        "Not checked out (order rejected)", "Not enough available. Only 1 in stock"
+    ]
+    assert available(db) == [3, 1]
+    assert db.fetchone("SELECT COUNT(*) FROM checkouts")[0] == 0
+    assert db.fetchone("SELECT 1 FROM employees WHERE name_key = 'ana perez'") is None
+
+
+def test_employee_from_rejected_order_is_not_cached(db, checkout):
+    checkout.checkout_order('OT-1', 'Ana Perez', [(2, 5)])
+    assert checkout.employees.get_id('Ana Perez') is None
+
+    ok, _, _ = checkout.checkout_order('OT-2', 'Ana Perez', [(1, 2), (2, 1)])
+    assert ok
+    employee_id = checkout.employees.get_id('ana perez')
+    assert employee_id == db.fetchone("SELECT id FROM employees WHERE name_key = 'ana perez'")[0]
+    assert [row['employee_id'] for row in db.fetchall("SELECT employee_id FROM checkouts")] == \
+        [employee_id, employee_id]
+    assert available(db) == [1, 0]
+
+
+def checkouts(db):
+    return [tuple(row) for row in db.fetchall(
+        "SELECT id, quantity, outstanding, status FROM checkouts ORDER BY id"
+    )]
+
+
+def test_partial_checkin_returns_oldest_first(db, checkout):
+    checkout.checkout_item(1, 'Ana Perez', 2)
+    checkout.checkout_item(1, 'Ana Perez', 1)
+
+    ok, message = checkout.checkin_item(1, 2)
+    assert ok
+    assert message == "Returned 2 x Llave combinacion 13mm from Ana Perez (1 still out)"
+    assert checkouts(db) == [(1, 2, 0, 'returned'), (2, 1, 1, 'active')]
+
+    ok, message = checkout.checkin_item(1, 2)
+    assert (ok, message) == (False, "Only 1 outstanding")
+
+    ok, _ = checkout.checkin_checkout(2)
+    assert ok
+    assert checkouts(db) == [(1, 2, 0, 'returned'), (2, 1, 0, 'returned')]
+    assert available(db) == [3, 1]
+
+
+def test_checkin_without_employee_needs_a_single_holder(db, checkout):
+    checkout.checkout_item(1, 'Ana Perez', 1)
+    checkout.checkout_item(1, 'Luis Gomez', 2)
+
+    ok, message = checkout.checkin_item(1)
+    assert not ok
+    assert message.startswith("Held by more than one person")
+
+    ok, _ = checkout.checkin_item(1, 1, 'Luis Gomez')
+    assert ok
+    assert checkouts(db) == [(1, 1, 1, 'active'), (2, 2, 1, 'active')]
+    balances = db.fetchall(
+        "SELECT e.employee_name, b.quantity FROM outstanding_balances b "
+        "JOIN employees e ON e.id = b.employee_id WHERE b.item_id = 1 ORDER BY e.employee_name"
+    )
+    assert [tuple(row) for row in balances] == [('Ana Perez', 1), ('Luis Gomez', 1)]
+
+
+def test_checkout_item_reports_a_failed_transaction(db, db_path, checkout):
+    locker = sqlite3.connect(db_path)
+    locker.execute("BEGIN IMMEDIATE")
+    db.execute("PRAGMA busy_timeout = 0")
+    try:
+        assert checkout.checkout_item(1, 'Ana Perez', 1) == (False, "database is locked")
+        assert checkout.checkout_item(2, 'Ana Perez', 5) == (False, "database is locked")
+    finally:
+        locker.rollback()
+        locker.close()
+    assert checkout.checkout_item(2, 'Ana Perez', 5) == (False, "Not enough available. Only 1 in stock")
+    assert checkout.checkout_item(9, 'Ana Perez', 1) == (False, "Item not found")
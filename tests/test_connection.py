@@ -0,0 +1,46 @@
+# tests/test_connection.py - Pooled connections
+import threading
+
+from database import connection
+from database.connection import DatabaseConnection, close_all
+
+
+def test_connections_are_shared_per_thread(db):
+    with db.get_connection() as first, DatabaseConnection().get_connection() as second:
+        assert first is second
+
+
+def test_close_all_reaches_other_threads(db):
+    ready, closed, done = threading.Event(), threading.Event(), threading.Event()
+    results = []
+
+    def worker():
+        db.fetchone("SELECT 1")
+        ready.set()
+        closed.wait(5)
+        try:
+            results.append(db.fetchone("SELECT COUNT(*) FROM inventory")[0])
+        except Exception as e:
+            results.append(e)
+        done.set()
+
+    threading.Thread(target=worker).start()
+    ready.wait(5)
+    close_all()
+    assert connection._open_connections == []
+    closed.set()
+    done.wait(5)
+    # The worker's stale pool entry was replaced by a fresh connection
+    assert results == [0]
+
+
+def test_nested_transaction_rolls_back_only_the_savepoint(db):
+    with db.transaction():
+        db.execute("INSERT INTO inventory (item_name) VALUES ('Llave')")
+        try:
+            with db.transaction():
+                db.execute("INSERT INTO inventory (item_name) VALUES ('Martillo')")
+                raise RuntimeError()
+        except RuntimeError:
+            pass
+    assert [row[0] for row in db.fetchall("SELECT item_name FROM inventory")] == ['Llave']
@@ -0,0 +1,55 @@
+# tests/test_employees.py - Cached employee lookups
+import sqlite3
+
+from core.employees import EmployeeDirectory
+
+
+def test_names_and_badges_resolve_from_the_cache(db):
+    employees = EmployeeDirectory(db)
+    juan = employees.get_id('Juan Pérez')
+    assert juan is not None
+    assert employees.get_id('  juan perez ') == juan
+    assert employees.get_id('emp001') == juan
+    assert employees.get_id('Nadie') is None
+    assert (employees.hits, employees.misses) == (3, 1)
+
+
+def test_get_or_create_adds_once(db):
+    employees = EmployeeDirectory(db)
+    created = employees.get_or_create('Luis Gómez')
+    assert employees.get_or_create('luis gomez') == created
+    assert db.fetchone("SELECT COUNT(*) FROM employees WHERE name_key = 'luis gomez'")[0] == 1
+
+
+def test_other_connections_invalidate_the_cache(db, db_path):
+    employees = EmployeeDirectory(db)
+    juan = employees.get_id('EMP001')
+
+    other = sqlite3.connect(db_path)
+    other.execute("UPDATE employees SET employee_id = 'EMP099' WHERE id = ?", (juan,))
+    other.execute("INSERT INTO employees (employee_name, name_key) VALUES ('Rosa Díaz', 'rosa diaz')")
+    other.commit()
+    other.close()
+
+    assert employees.get_id('EMP001') is None
+    assert employees.get_id('emp099') == juan
+    assert employees.get_id('Rosa Diaz') is not None
+
+
+def test_rolled_back_employee_is_forgotten(db):
+    employees = EmployeeDirectory(db)
+    try:
+        with db.transaction(immediate=True):
+            assert employees.get_or_create('Pedro Ruiz') is not None
+            assert employees.get_id('Pedro Ruiz') is not None
+            raise RuntimeError()
+    except RuntimeError:
+        pass
+    assert employees.get_id('Pedro Ruiz') is None
+
+
+def test_cache_is_bounded(db):
+    employees = EmployeeDirectory(db, max_entries=2)
+    for name in ('Juan Pérez', 'María García', 'Carlos López'):
+        assert employees.get_id(name) is not None
+    assert len(employees._by_name) <= 2
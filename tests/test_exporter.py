@@ -0,0 +1,68 @@
+# tests/test_exporter.py - Streaming CSV / JSON Lines exports
+import csv
+import gzip
+import json
+
+import pytest
+
+from core.checkout import CheckoutManager
+from core.inventory import InventoryManager
+from reports.exporter import Exporter, parse_date
+
+
+@pytest.fixture
+def exporter(db, tmp_path):
+    inventory = InventoryManager(db)
+    for name in ('Llave combinación 13mm', 'Martillo de bola', 'Taladro'):
+        inventory.add_item({'item_name': name, 'brand': 'Bahco', 'stock': 2})
+    checkout = CheckoutManager(db)
+    for item_id, date in ((1, '2024-01-10 08:00:00'), (2, '2024-02-10 08:00:00'),
+                          (3, '2024-03-10 08:00:00')):
+        checkout.checkout_item(item_id, 'Ana Perez', 1)
+        db.execute("UPDATE checkouts SET checkout_date = ? WHERE item_id = ?", (date, item_id))
+    return Exporter(db, chunk_size=2, output_dir=tmp_path)
+
+
+def test_parse_date():
+    assert parse_date('2024-02-29') == '2024-02-29 00:00:00'
+    assert parse_date('2024-02-29', end=True) == '2024-03-01 00:00:00'
+    with pytest.raises(ValueError):
+        parse_date('29/02/2024')
+
+
+def test_inventory_csv(exporter, tmp_path):
+    summary = exporter.export('inventory', output=tmp_path / 'inventory.csv')
+    assert summary['rows'] == 3
+    with open(summary['path'], encoding='utf-8', newline='') as file:
+        rows = list(csv.DictReader(file))
+    assert [row['item_name'] for row in rows] == ['Llave combinación 13mm', 'Martillo de bola', 'Taladro']
+    assert not list(tmp_path.glob('*.part'))
+
+
+def test_history_jsonl_gzip_by_date(exporter):
+    summary = exporter.export('history', 'jsonl', compress=True, start='2024-02-01', end='2024-03-10')
+    assert summary['path'].name.endswith('.jsonl.gz')
+    with gzip.open(summary['path'], 'rt', encoding='utf-8') as file:
+        rows = [json.loads(line) for line in file]
+    assert [(row['item_name'], row['employee_name']) for row in rows] == \
+        [('Martillo de bola', 'Ana Perez'), ('Taladro', 'Ana Perez')]
+
+
+def test_since_last_exports_only_changes(db, exporter):
+    assert exporter.export('active', since_last=True)['rows'] == 3
+    assert exporter.export('active', since_last=True)['rows'] == 0
+
+    # As if the last export ran in June and a checkout came in since
+    db.execute("UPDATE export_watermarks SET watermark = '2024-06-01 00:00:00'")
+    CheckoutManager(db).checkout_item(1, 'Ana Perez', 1)
+    db.execute("UPDATE checkouts SET checkout_date = '2024-07-01 08:00:00' WHERE id = 4")
+    summary = exporter.export('active', since_last=True)
+    assert summary['rows'] == 1
+    assert exporter.watermarks()[0]['watermark'] == summary['watermark']
+
+
+def test_bad_requests(exporter):
+    with pytest.raises(ValueError, match="unknown dataset"):
+        exporter.export('employees')
+    with pytest.raises(ValueError, match="no dates"):
+        exporter.export('inventory', start='2024-01-01')
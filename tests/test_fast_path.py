@@ -0,0 +1,90 @@
+# tests/test_fast_path.py - Local rules ahead of the LLM
+import pytest
+
+from core.checkout import CheckoutManager
+from core.inventory import InventoryManager
+from llm.fast_path import FastPath
+
+
+@pytest.fixture
+def fast_path(db):
+    inventory = InventoryManager(db)
+    for name, brand, stock in [('Llave combinacion 13mm', 'Bahco', 3),
+                               ('Martillo de bola', 'Stanley', 0),
+                               ('Taladro percutor', 'Bosch', 1)]:
+        inventory.add_item({'item_name': name, 'brand': brand, 'stock': stock})
+    CheckoutManager(db).checkout_item(1, 'Ana Perez', 2)
+    return FastPath(db)
+
+
+@pytest.mark.parametrize('question, rule', [
+    ('how many items do we have?', 'count_items'),
+    ('what is out of stock', 'out_of_stock'),
+    ('show me tools with less than 2 available', 'below_threshold'),
+    ('what is running low', 'low_stock'),
+    ('active checkouts', 'active_checkouts'),
+    ('what did Ana take?', 'employee_checkouts'),
+    ('Bosch tools', 'brand_items'),
+    ('marca Stanley', 'brand_items'),
+    ('quien tiene la llave combinacion', 'who_has'),
+])
+def test_rules(fast_path, question, rule):
+    assert fast_path.match(question)[0] == rule
+
+
+@pytest.mark.parametrize('question', [
+    'who has the llave combinacion',
+    'who checked out the llave combinacion',
+    'who has checked out the llave combinacion',
+    'who took a llave combinacion',
+])
+def test_who_has_captures_the_item(fast_path, question):
+    rule, rows = fast_path.answer(question)
+    assert rule == 'who_has'
+    assert [(row['item_name'], row['employee_name'], row['quantity']) for row in rows] == \
+        [('Llave combinacion 13mm', 'Ana Perez', 2)]
+
+
+def test_unknown_brand_escalates(fast_path):
+    assert fast_path.match('Makita tools') is None
+    assert fast_path.stats()['escalated'] == 1
+
+
+def test_item_lists_stop_at_max_rows(db, fast_path):
+    fast_path.max_rows = 2
+    rule, rows = fast_path.answer('tools with less than 10 available')
+    assert (rule, len(rows), fast_path.last_truncated) == ('below_threshold', 2, True)
+    rule, rows = fast_path.answer('Bosch tools')
+    assert (len(rows), fast_path.last_truncated) == (1, False)
+
+
+def test_discontinued_items_are_left_out(db, fast_path):
+    db.execute("UPDATE inventory SET discontinued = CURRENT_TIMESTAMP WHERE id IN (2, 3)")
+    assert fast_path.answer('what is out of stock') == ('out_of_stock', [])
+    assert fast_path.answer('how many items do we have')[1][0]['items'] == 1
+    assert fast_path.match('Bosch tools') is None
+
+
+def test_who_has_ignores_accents(db, fast_path):
+    db.execute("UPDATE inventory SET item_name = 'Llave combinación 13mm' WHERE id = 1")
+    rule, rows = fast_path.answer('¿Quién tiene la llave combinación?')
+    assert rule == 'who_has'
+    assert [(row['item_name'], row['employee_name']) for row in rows] == \
+        [('Llave combinación 13mm', 'Ana Perez')]
+    assert fast_path.answer('who has the LLAVE COMBINACION')[1] == rows
+
+
+@pytest.mark.parametrize('question', [
+    'active checkouts', 'what did Ana take', 'who has the llave', 'everything at obra norte'
+])
+def test_checkout_lists_are_limited_in_sql(db, fast_path, question):
+    db.execute("UPDATE inventory SET stock = 10, available = 8 WHERE id = 1")
+    checkout = CheckoutManager(db)
+    for employee in ('Ana Perez',) * 3 + ('Luis Gomez', 'Rosa Diaz', 'Pedro Ruiz'):
+        assert checkout.checkout_item(1, employee, 1, 'obra norte')[0]
+
+    fast_path.max_rows = 2
+    rule, sql, params = fast_path.match(question)
+    assert len(db.fetchall(sql, params)) == 3
+    rows = fast_path.answer(question)[1]
+    assert (len(rows), fast_path.last_truncated) == (2, True)
@@ -0,0 +1,56 @@
+# tests/test_federation.py - Reads across several warehouse databases
+import pytest
+
+from database import connection
+from core.federation import FederatedInventory
+from core.inventory import InventoryManager
+from database.connection import DatabaseConnection
+from database.setup import create_tables
+
+
+@pytest.fixture
+def warehouses(db, db_path):
+    InventoryManager(db).add_item({'item_name': 'Llave combinacion 13mm', 'stock': 3})
+    norte = DatabaseConnection('norte', db_path.with_name('norte.db'))
+    create_tables(norte)
+    InventoryManager(norte).add_item({'item_name': 'Martillo de bola', 'stock': 1})
+    federation = FederatedInventory({
+        'standard': {'path': db_path, 'name': 'Central'},
+        'norte': {'path': norte.db_path, 'name': 'Norte'}
+    })
+    yield federation
+    federation.close()
+
+
+def test_summary_with_stale_counters_on_read_only_warehouses(db, warehouses):
+    db.execute("UPDATE inventory_stats SET low_stock_threshold = -1, low_stock_count = 99")
+    summaries, failures = warehouses.get_summary()
+
+    assert failures == {}
+    assert summaries['Central']['low_stock_items'] == 0
+    assert summaries['Norte']['low_stock_items'] == 1
+    assert summaries['total'] == {'total_items': 2, 'total_stock': 4, 'total_available': 4,
+                                  'low_stock_items': 1}
+    # Nothing was written to the warehouse
+    assert db.fetchone("SELECT low_stock_threshold FROM inventory_stats")[0] == -1
+
+
+def test_reads_leave_no_connections_open(warehouses):
+    opened = len(connection._open_connections)
+    for _ in range(5):
+        warehouses.get_summary()
+        warehouses.search_items('martillo')
+    assert len(connection._open_connections) == opened
+
+
+def test_timed_out_reads_leave_no_connections_open(warehouses):
+    warehouses.timeout = 0.05
+    # A query that runs until the progress handler interrupts it
+    endless = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n"
+    opened = len(connection._open_connections)
+    results, failures = warehouses._fan_out(lambda db: db.fetchone(endless))
+    assert results == {}
+    assert failures == {'Central': 'timed out', 'Norte': 'timed out'}
+
+    warehouses.close()
+    assert len(connection._open_connections) == opened
@@ -0,0 +1,59 @@
+# tests/test_importer.py - Streaming CSV catalog import
+import csv
+
+from core.checkout import CheckoutManager
+from core.importer import CSV_COLUMNS, CatalogImporter
+
+
+def write_csv(path, rows, header=CSV_COLUMNS):
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return path
+
+
+def inventory(db):
+    return [tuple(row) for row in db.fetchall(
+        "SELECT item_id, item_name, brand, stock, available FROM inventory ORDER BY id"
+    )]
+
+
+def test_import_keys_rejects_and_header_rows(db, tmp_path):
+    path = write_csv(tmp_path / 'catalog.csv', [
+        ['BH-13', 'Llave combinacion 13mm', 'Llaves', 'Bahco', '3', ''],
+        ['', 'Martillo de bola', '', 'Stanley', '2.0', 'mango fibra'],
+        ['BH-14', '', '', 'Bahco', '1', ''],
+        ['BS-1', 'Taladro', '', 'Bosch', 'muchos', ''],
+        ['BS-2', 'Sierra', '', 'Bosch', '-1', ''],
+        list(CSV_COLUMNS),
+    ])
+    summary = CatalogImporter(db, chunk_size=2).import_file(path)
+
+    assert (summary['processed'], summary['inserted'], summary['updated']) == (2, 2, 0)
+    assert summary['chunks'] == 3
+    assert summary['rejected'] == [(4, "missing Item Name"), (5, "invalid Stock 'muchos'"),
+                                   (6, "negative Stock -1")]
+    assert inventory(db) == [('BH-13', 'Llave combinacion 13mm', 'Bahco', 3, 3),
+                             ('', 'Martillo de bola', 'Stanley', 2, 2)]
+
+
+def test_reimport_updates_in_place_and_keeps_checkouts(db, tmp_path):
+    importer = CatalogImporter(db)
+    importer.import_file(write_csv(tmp_path / 'v1.csv', [
+        ['BH-13', 'Llave combinacion 13mm', '', 'Bahco', '3', ''],
+        ['', 'Martillo de bola', '', 'Stanley', '2', ''],
+    ]))
+    CheckoutManager(db).checkout_item(1, 'Ana Perez', 2)
+
+    # Columns in another order; the Catalog ID row is renamed, stock changes
+    summary = importer.import_file(write_csv(tmp_path / 'v2.csv', [
+        ['5', 'Stanley', 'Martillo de bola'],
+        ['4', 'Bahco', 'Llave combinada 13mm', 'BH-13'],
+        ['1', 'Bosch', 'Taladro'],
+    ], header=['Stock', 'Brand', 'Item Name', 'Catalog ID']))
+
+    assert (summary['inserted'], summary['updated']) == (1, 2)
+    assert inventory(db) == [('BH-13', 'Llave combinada 13mm', 'Bahco', 4, 2),
+                             ('', 'Martillo de bola', 'Stanley', 5, 5),
+                             ('', 'Taladro', 'Bosch', 1, 1)]
@@ -0,0 +1,53 @@
+# tests/test_inventory.py - Summary counters kept by triggers
+import pytest
+
+from core.inventory import InventoryManager
+from database.setup import SCHEMA_VERSION, create_tables
+
+
+@pytest.fixture
+def inventory(db):
+    inventory = InventoryManager(db)
+    for name, stock in [('Llave combinacion 13mm', 3), ('Martillo de bola', 1), ('Taladro', 5)]:
+        inventory.add_item({'item_name': name, 'brand': 'Bahco', 'stock': stock})
+    return inventory
+
+
+def summary(inventory):
+    stats = inventory.get_summary()
+    return stats['total_items'], stats['total_stock'], stats['low_stock_items']
+
+
+def test_discontinued_items_leave_the_counters(db, inventory):
+    db.execute("UPDATE inventory SET discontinued = CURRENT_TIMESTAMP WHERE id = 2")
+    assert summary(inventory) == (2, 8, 0)
+    assert inventory.check_stats() == (True, {})
+
+    db.execute("UPDATE inventory SET available = 0, stock = 0 WHERE id = 2")
+    db.execute("DELETE FROM inventory WHERE id = 2")
+    assert summary(inventory) == (2, 8, 0)
+
+    db.execute("UPDATE inventory SET discontinued = CURRENT_TIMESTAMP WHERE id = 3")
+    db.execute("UPDATE inventory SET discontinued = NULL, stock = 4, available = 2 WHERE id = 3")
+    assert summary(inventory) == (2, 7, 1)
+    assert inventory.check_stats() == (True, {})
+
+
+def test_migration_recounts_without_discontinued_items(db, inventory):
+    db.execute("UPDATE inventory SET discontinued = CURRENT_TIMESTAMP WHERE id = 1")
+    # As left by schema 15: the discontinued item still counted
+    db.execute("UPDATE inventory_stats SET item_count = 3, total_stock = 9, total_available = 9")
+    db.execute("PRAGMA user_version = 15")
+
+    create_tables(db)
+    assert db.fetchone("PRAGMA user_version")[0] == SCHEMA_VERSION
+    assert summary(inventory) == (2, 6, 1)
+    assert inventory.check_stats() == (True, {})
+
+
+def test_rebuild_leaves_discontinued_items_out(db, inventory):
+    db.execute("UPDATE inventory SET discontinued = CURRENT_TIMESTAMP WHERE id = 3")
+    db.execute("UPDATE inventory_stats SET item_count = 0, total_stock = 0")
+    inventory.rebuild_stats()
+    assert summary(inventory) == (2, 4, 1)
+    assert inventory.check_stats() == (True, {})
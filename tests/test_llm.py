@@ -0,0 +1,86 @@
+# tests/test_llm.py - Single-call LLM pipeline against the LM Studio stub
+import json
+
+import pytest
+
+import config
+from benchmarks import lm_stub_server
+from core.inventory import InventoryManager
+from llm.langchain_integration import INTENT_REPLIES, NOT_UNDERSTOOD, LLMManager, parse_combined_response
+
+# Questions no local rule answers
+QUESTION = "which tools cost the most"
+
+
+@pytest.fixture
+def stub():
+    server, url = lm_stub_server.start()
+    yield server, url
+    server.shutdown()
+    server.server_close()
+    lm_stub_server.StubHandler.answers = {}
+
+
+@pytest.fixture
+def llm(db, stub, tmp_path, monkeypatch):
+    _, url = stub
+    monkeypatch.setitem(config.LLM_CONFIG['lm_studio'], 'url', url)
+    monkeypatch.setitem(config.LLM_CONFIG['cache'], 'path', tmp_path / 'llm_cache.db')
+    monkeypatch.setitem(config.LLM_CONFIG, 'single_call', True)
+    InventoryManager(db).add_item({'item_name': 'Llave combinacion 13mm', 'stock': 1})
+    manager = LLMManager()
+    assert manager.connected and manager.single_call
+    return manager
+
+
+def answer(user_input, intent, sql=''):
+    lm_stub_server.StubHandler.answers[user_input] = json.dumps({'intent': intent, 'sql': sql})
+
+
+def served():
+    return lm_stub_server.StubHandler.requests_served
+
+
+@pytest.mark.parametrize('text, parsed', [
+    ('{"intent": "query", "sql": "```sql\\nSELECT 1\\n```"}', ('QUERY', 'SELECT 1')),
+    ('Sure! {"intent": "CHECKOUT", "sql": null} Hope that helps', ('CHECKOUT', '')),
+    ('SQL: SELECT item_name FROM inventory', ('QUERY', 'SELECT item_name FROM inventory')),
+    ('{"intent": "QUERY", "sql": ', ('OTHER', '')),
+    ('I am not sure', ('OTHER', '')),
+])
+def test_parse_combined_response(text, parsed):
+    assert parse_combined_response(text) == parsed
+
+
+def test_query_in_one_call_then_from_the_cache(llm):
+    before = served()
+    assert llm.process_command(QUESTION) == "Llave combinacion 13mm | 1"
+    assert served() - before == 1
+    assert llm.timing_stats()['llm'][0] == 1
+
+    assert llm.process_command("Which tools cost the most?") == "Llave combinacion 13mm | 1"
+    assert served() - before == 1
+    assert llm.sql_cache.hits == 1
+
+
+def test_query_without_sql(llm):
+    answer(QUESTION, 'QUERY')
+    before = served()
+    assert llm.process_command(QUESTION) == "❌ The model did not produce a query"
+    assert served() - before == 1
+    assert not llm.sql_cache.contains(QUESTION)
+
+
+def test_other_intents_take_one_call(llm):
+    answer(QUESTION, 'OTHER')
+    answer("lend the drill to Ana", 'CHECKOUT')
+    before = served()
+    assert llm.process_command(QUESTION) == NOT_UNDERSTOOD
+    assert llm.process_command("lend the drill to Ana") == INTENT_REPLIES['CHECKOUT']
+    assert served() - before == 2
+
+
+def test_refused_sql_is_not_cached(llm):
+    answer(QUESTION, 'QUERY', "DELETE FROM inventory")
+    assert llm.process_command(QUESTION).startswith("❌ Query refused")
+    assert not llm.sql_cache.contains(QUESTION)
@@ -0,0 +1,73 @@
+# tests/test_migrations.py - Schema migrations keyed on PRAGMA user_version
+import sqlite3
+
+from core.inventory import InventoryManager
+from database.connection import DatabaseConnection
+from database.setup import MIGRATIONS, SCHEMA_VERSION, create_tables, get_schema_version
+
+
+def legacy_database(path):
+    """A database as the app created it before migrations existed (user_version 0)"""
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE inventory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, item_id TEXT, item_name TEXT NOT NULL,
+            equipment TEXT, brand TEXT, stock INTEGER DEFAULT 0, available INTEGER DEFAULT 0,
+            location TEXT DEFAULT 'workshop', notes TEXT
+        );
+        CREATE TABLE employees (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, employee_name TEXT NOT NULL UNIQUE,
+            employee_id TEXT, department TEXT, active BOOLEAN DEFAULT 1
+        );
+        CREATE TABLE checkouts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, item_id INTEGER, employee_id INTEGER,
+            quantity INTEGER DEFAULT 1, checkout_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expected_return DATE, actual_return TIMESTAMP, location TEXT, order_number TEXT,
+            status TEXT DEFAULT 'active'
+        );
+        INSERT INTO employees (employee_name) VALUES ('Ana Pérez');
+        -- The same catalog row imported twice, once with stray whitespace
+        INSERT INTO inventory (item_id, item_name, brand, stock, available)
+        VALUES ('BH-13', 'Llave combinacion 13mm', 'Bahco', 3, 3),
+               (' BH-13 ', 'Llave combinacion 13mm', 'Bahco', 3, 2),
+               ('', 'Martillo de bola', 'Stanley', 1, 1);
+        INSERT INTO checkouts (item_id, employee_id, quantity) VALUES (2, 1, 1);
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def test_migrations_are_numbered_in_order():
+    numbers = [number for number, _ in MIGRATIONS]
+    assert numbers == list(range(1, len(MIGRATIONS) + 1))
+    assert SCHEMA_VERSION == numbers[-1]
+
+
+def test_legacy_database_is_upgraded_to_the_current_version(db_path):
+    legacy_database(db_path)
+    db = DatabaseConnection()
+    assert get_schema_version(db) == 0
+
+    assert create_tables(db) is True
+    assert get_schema_version(db) == SCHEMA_VERSION
+
+    # Duplicates merged onto the oldest row, with its checkout moved along
+    rows = db.fetchall("SELECT id, item_id, available FROM inventory ORDER BY id")
+    assert [tuple(row) for row in rows] == [(1, 'BH-13', 2), (3, '', 1)]
+    checkout = db.fetchone("SELECT item_id, outstanding, status FROM checkouts")
+    assert tuple(checkout) == (1, 1, 'active')
+    assert db.fetchone("SELECT name_key FROM employees")[0] == 'ana perez'
+
+    inventory = InventoryManager(db)
+    assert inventory.check_stats() == (True, {})
+    assert [item['item_name'] for item in inventory.search_items('llave')] == \
+        ['Llave combinacion 13mm']
+
+    # Up to date: nothing runs the second time
+    assert create_tables(db) is False
+
+
+def test_fresh_database(db):
+    assert get_schema_version(db) == SCHEMA_VERSION
+    assert db.fetchone("SELECT COUNT(*) FROM employees")[0] > 0
+    assert db.fetchone("SELECT item_count FROM inventory_stats")[0] == 0
@@ -0,0 +1,56 @@
+# tests/test_pagination.py - Keyset pagination through duplicate sort keys
+import pytest
+
+from core.checkout import CheckoutManager
+from core.inventory import InventoryManager
+
+
+@pytest.fixture
+def inventory(db):
+    inventory = InventoryManager(db)
+    # Five rows share one name, so pages of 2 split them across boundaries
+    for name in ['Llave'] * 5 + ['Alicate', 'Martillo']:
+        inventory.add_item({'item_name': name, 'brand': 'Bahco', 'stock': 3})
+    return inventory
+
+
+def all_pages(fetch, page_size):
+    rows, after, pages = [], None, 0
+    while True:
+        page, after = fetch(page_size, after)
+        assert len(page) <= page_size
+        rows += page
+        pages += 1
+        if after is None:
+            return rows, pages
+
+
+@pytest.mark.parametrize('term', ['', 'llave', 'bahco'])
+def test_search_pages_match_the_full_listing(inventory, term):
+    rows, pages = all_pages(lambda size, after: inventory.search_page(term, size, after), 2)
+    everything, _ = inventory.search_page(term, 100)
+    assert [row['id'] for row in rows] == [row['id'] for row in everything]
+    assert len({row['id'] for row in rows}) == len(rows)
+    assert pages == (len(rows) + 1) // 2
+
+
+def test_name_order_breaks_ties_by_id(inventory):
+    rows, _ = all_pages(lambda size, after: inventory.search_page('', size, after), 2)
+    assert [(row['item_name'], row['id']) for row in rows] == [
+        ('Alicate', 6), ('Llave', 1), ('Llave', 2), ('Llave', 3), ('Llave', 4), ('Llave', 5),
+        ('Martillo', 7)
+    ]
+    assert [item['id'] for item in inventory.iter_items('', page_size=3)] == [6, 1, 2, 3, 4, 5, 7]
+
+
+def test_active_checkouts_with_equal_dates(db, inventory):
+    checkout = CheckoutManager(db)
+    for item_id in range(1, 8):
+        checkout.checkout_item(item_id, 'Ana Perez', 1)
+    # All in the same second: the id decides
+    db.execute("UPDATE checkouts SET checkout_date = '2024-05-01 08:00:00'")
+
+    rows, pages = all_pages(checkout.get_active_page, 3)
+    assert [row['id'] for row in rows] == [7, 6, 5, 4, 3, 2, 1]
+    assert pages == 3
+    assert [row['id'] for row in checkout.iter_active_checkouts(2)] == [7, 6, 5, 4, 3, 2, 1]
@@ -0,0 +1,69 @@
+# tests/test_scanner.py - Scanner mode: badges, Catalog IDs and batched writes
+import io
+import sqlite3
+
+import pytest
+
+from core.inventory import InventoryManager
+from core.scanner import CatalogIndex, ScanSession, read_scans
+
+
+@pytest.fixture
+def session(db):
+    inventory = InventoryManager(db)
+    inventory.add_item({'item_name': 'Taladro', 'stock': 2})
+    inventory.add_item({'item_name': 'Martillo de bola', 'stock': 5})
+    db.execute("UPDATE inventory SET item_id = printf('A%04d', id)")
+    session = ScanSession(db, location='shop', report=lambda line: session.lines.append(line))
+    session.lines = []
+    return session
+
+
+def test_badge_then_items_are_written_in_one_batch(db, session):
+    for code in ('A0001', 'EMP001', 'a0001', '3*A0002', 'ZZZ'):
+        assert session.scan(code)
+    # Nothing is written until the batch is flushed
+    assert db.fetchone("SELECT COUNT(*) FROM checkouts")[0] == 0
+    session.flush()
+
+    rows = db.fetchall("SELECT item_id, quantity, location FROM checkouts ORDER BY id")
+    assert [tuple(row) for row in rows] == [(1, 1, 'shop'), (2, 3, 'shop')]
+    assert session.summary == {'scans': 4, 'checked_out': 2, 'returned': 0, 'failed': 2,
+                               'batches': 1}
+    assert session.lines[:2] == ["❌ A0001: Scan a badge first", "👤 Juan Pérez"]
+
+
+def test_refused_scan_keeps_the_rest_of_its_batch(db, session):
+    for code in ('EMP001', '3*A0001', 'A0002'):
+        session.scan(code)
+    session.flush()
+
+    assert [row['item_id'] for row in db.fetchall("SELECT item_id FROM checkouts")] == [2]
+    assert (session.summary['checked_out'], session.summary['failed']) == (1, 1)
+
+
+def test_read_scans_returns_and_stops_at_the_end_code(db, session):
+    read_scans(io.StringIO("EMP001\n2*A0002\nIN\nA0002\nEND\nA0001\n"), session)
+
+    assert db.fetchone("SELECT available FROM inventory WHERE id = 2")[0] == 4
+    assert (session.summary['checked_out'], session.summary['returned']) == (1, 1)
+    assert session.mode == 'in'
+
+
+def test_catalog_reloads_only_when_catalog_ids_change(db, db_path, session):
+    catalog = CatalogIndex(db)
+    assert catalog.get(' a0002 ') == (2, 'Martillo de bola')
+    assert catalog.reloads == 1
+
+    other = sqlite3.connect(db_path)
+    other.execute("UPDATE inventory SET available = 0 WHERE id = 1")
+    other.commit()
+    assert catalog.get('A0001') == (1, 'Taladro')
+    assert catalog.reloads == 1
+
+    other.execute("UPDATE inventory SET item_id = 'B0001' WHERE id = 1")
+    other.commit()
+    other.close()
+    assert catalog.get('A0001') is None
+    assert catalog.get('B0001') == (1, 'Taladro')
+    assert catalog.reloads == 2
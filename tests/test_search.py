@@ -0,0 +1,47 @@
+# tests/test_search.py - FTS5 search ranked by bm25
+import pytest
+
+from core.inventory import InventoryManager, build_match_query
+
+
+@pytest.fixture
+def inventory(db):
+    inventory = InventoryManager(db)
+    assert inventory.has_search_index()
+    for name, brand, equipment, notes in [
+        ('Juego de dados', 'Bahco', 'Mecanica', 'incluye llave de trinquete'),
+        ('Llave combinación 13mm', 'Bahco', 'Llaves', ''),
+        ('Llave inglesa', 'Stanley', 'Llaves', ''),
+        ('Taladro percutor', 'Bosch', 'Electricas', ''),
+    ]:
+        inventory.add_item({'item_name': name, 'brand': brand, 'equipment': equipment,
+                            'notes': notes, 'stock': 1})
+    return inventory
+
+
+def names(items):
+    return [item['item_name'] for item in items]
+
+
+def test_match_query_prefixes_every_word():
+    assert build_match_query('llave "13mm"') == '"llave"* "13mm"*'
+    assert build_match_query('  ') == ''
+
+
+def test_name_matches_rank_above_notes(inventory):
+    found = names(inventory.search_items('llave'))
+    assert found[-1] == 'Juego de dados'
+    assert sorted(found[:2]) == ['Llave combinación 13mm', 'Llave inglesa']
+
+
+def test_every_word_as_a_prefix_without_accents(inventory):
+    assert names(inventory.search_items('combinacion ll')) == ['Llave combinación 13mm']
+    assert names(inventory.search_items('bahco llaves')) == ['Llave combinación 13mm']
+
+
+def test_index_follows_updates_and_deletes(db, inventory):
+    db.execute("UPDATE inventory SET item_name = 'Rotomartillo' WHERE item_name = 'Taladro percutor'")
+    db.execute("DELETE FROM inventory WHERE item_name = 'Llave inglesa'")
+    assert names(inventory.search_items('rotomart')) == ['Rotomartillo']
+    assert names(inventory.search_items('taladro')) == []
+    assert names(inventory.search_items('inglesa')) == []
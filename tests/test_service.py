@@ -0,0 +1,126 @@
+# tests/test_service.py - HTTP service endpoints, called through dispatch()
+import asyncio
+import base64
+import json
+
+import pytest
+
+from core.inventory import InventoryManager
+from server.service import InventoryService
+
+
+@pytest.fixture
+def call(db):
+    """call(method, target, body=None) -> (status, payload) against a started service"""
+    loop = asyncio.new_event_loop()
+    service = InventoryService()
+    loop.run_until_complete(service.start())
+
+    def call(method, target, body=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else b''
+        return loop.run_until_complete(service.dispatch(method, target, data))
+
+    call.service = service
+    call.loop = loop
+    yield call
+    loop.run_until_complete(service.writer.stop())
+    service.readers.shutdown()
+    loop.close()
+
+
+@pytest.fixture
+def items(db):
+    # Added before the service starts: queued for the suggestion index, as after a migration
+    inventory = InventoryManager(db)
+    for name, brand in [('Llave combinacion 13mm', 'Bahco'), ('Martillo de bola', 'Stanley'),
+                        ('Taladro percutor', 'Bosch')]:
+        inventory.add_item({'item_name': name, 'brand': brand, 'stock': 2})
+
+
+def test_suggestions_for_items_queued_before_start(items, call):
+    status, payload = call('GET', '/search?q=llave%20combinasion')
+    assert status == 200
+    assert [item['item_name'] for item in payload['suggestions']] == ['Llave combinacion 13mm']
+
+
+def test_suggestions_after_a_write(call, db):
+    InventoryManager(db).add_item({'item_name': 'Sierra caladora', 'brand': 'Makita', 'stock': 1})
+    status, _ = call('POST', '/checkin', {'item_id': 1})
+    assert status == 409  # nothing to check in, but the writer ran
+    _, payload = call('GET', '/search?q=sierra%20caladorra')
+    assert [item['item_name'] for item in payload['suggestions']] == ['Sierra caladora']
+
+
+def cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode('utf-8')).decode('ascii')
+
+
+@pytest.mark.parametrize('target', ['/search', '/search?q=bahco', '/active'])
+def test_pages_round_trip(items, call, target):
+    if target == '/active':
+        for item_id in (1, 2, 3):
+            call('POST', '/checkout', {'employee': 'Ana Perez', 'lines': [{'item_id': item_id}]})
+    key = 'checkouts' if target == '/active' else 'items'
+    _, everything = call('GET', target)
+
+    seen, after = [], None
+    while True:
+        separator = '&' if '?' in target else '?'
+        url = target + separator + 'page_size=1' + (f'&after={after}' if after else '')
+        status, payload = call('GET', url)
+        assert status == 200
+        seen += payload[key]
+        after = payload['next']
+        if after is None:
+            break
+    assert seen == everything[key]
+    assert len(seen) == (1 if target == '/search?q=bahco' else 3)
+
+
+@pytest.mark.parametrize('token', [
+    'NQ==',                      # 5
+    'not base64!',
+    cursor([1]),
+    cursor(['a', 1, 2]),
+    cursor({'id': 1}),
+    cursor([['a'], 1]),
+])
+def test_bad_cursors_are_rejected(call, token):
+    for endpoint in ('/search', '/active'):
+        status, payload = call('GET', f'{endpoint}?after={token}')
+        assert (status, payload) == (400, {'error': "invalid 'after' token"})
+
+
+def test_summary_rebuilds_stale_counters_on_the_writer(items, call, db):
+    db.execute("UPDATE inventory_stats SET low_stock_threshold = -1, low_stock_count = 99")
+    status, payload = call('GET', '/summary')
+    assert status == 200
+    assert payload == {'total_items': 3, 'total_stock': 6, 'total_available': 6,
+                       'low_stock_items': 3}
+    assert call.service.inventory.stats_current()
+    assert call.service.writer.stats()['writes'] == 2  # the start-up refresh, then the rebuild
+
+
+async def raw_request(service, request):
+    """Send raw bytes to a listening service; returns the response status line"""
+    server = await asyncio.start_server(service.handle_connection, '127.0.0.1', 0)
+    reader, writer = await asyncio.open_connection('127.0.0.1', server.sockets[0].getsockname()[1])
+    writer.write(request)
+    status_line = await reader.readline()
+    writer.close()
+    server.close()
+    await server.wait_closed()
+    return status_line.decode('latin-1').strip()
+
+
+@pytest.mark.parametrize('length', ['abc', '-5', '1e3'])
+def test_malformed_content_length(call, length):
+    request = (f"POST /checkin HTTP/1.1\r\nHost: x\r\nContent-Length: {length}\r\n\r\n{{}}"
+               .encode('latin-1'))
+    assert call.loop.run_until_complete(raw_request(call.service, request)) == \
+        "HTTP/1.1 400 Bad Request"
+
+
+def test_keep_alive_request(call):
+    request = b"GET /summary HTTP/1.1\r\nHost: x\r\n\r\n"
+    assert call.loop.run_until_complete(raw_request(call.service, request)) == "HTTP/1.1 200 OK"
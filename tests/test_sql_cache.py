@@ -0,0 +1,55 @@
+# tests/test_sql_cache.py - Persistent question -> SQL cache
+import time
+
+import pytest
+
+from database.connection import DatabaseConnection, close_all
+from llm.sql_cache import SQLCache, normalize_question, prompt_fingerprint
+
+SQL = "SELECT * FROM inventory WHERE available <= 2"
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    yield tmp_path / 'llm_cache.db'
+    close_all()
+
+
+def test_questions_are_normalized():
+    assert normalize_question('¿Qué  herramientas hay?') == normalize_question('que herramientas hay')
+    assert prompt_fingerprint('prompt', 0.1) != prompt_fingerprint('prompt', 0.2)
+
+
+def test_hits_and_misses(cache_path):
+    cache = SQLCache('fp', cache_path)
+    assert cache.get('low stock items') is None
+    cache.put('Low stock items?', SQL)
+    assert cache.contains('low stock items')
+    assert cache.get('low  STOCK items') == SQL
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Persistent, but only for the same prompt fingerprint
+    assert SQLCache('fp', cache_path).get('low stock items') == SQL
+    assert SQLCache('other', cache_path).get('low stock items') is None
+
+
+def test_expiry_and_eviction(cache_path, monkeypatch):
+    cache = SQLCache('fp', cache_path, ttl_seconds=60, max_entries=2)
+    cache.put('one', 'SELECT 1')
+    cache.put('two', 'SELECT 2')
+    cache.get('one')
+    cache.put('three', 'SELECT 3')
+    assert [cache.contains(q) for q in ('one', 'two', 'three')] == [True, False, True]
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, 'time', lambda: later)
+    assert cache.get('one') is None
+    assert not cache.contains('three')
+
+
+def test_schema_change_empties_the_cache(cache_path):
+    SQLCache('fp', cache_path).put('low stock items', SQL)
+    DatabaseConnection(db_path=cache_path).execute(
+        "UPDATE cache_meta SET value = '1' WHERE key = 'schema_version'"
+    )
+    assert SQLCache('fp', cache_path).get('low stock items') is None
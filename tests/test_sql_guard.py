@@ -0,0 +1,70 @@
+# tests/test_sql_guard.py - Sandbox for model-written SQL
+import pytest
+
+from core.inventory import InventoryManager
+from llm.sql_guard import SQLGuard, UnsafeQuery
+
+COUNT_TO = "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < {}) SELECT x FROM n"
+
+
+@pytest.fixture
+def guard(db):
+    inventory = InventoryManager(db)
+    for number in range(20):
+        inventory.add_item({'item_name': f'Llave {number}', 'brand': 'Bahco', 'stock': number})
+    return SQLGuard()
+
+
+@pytest.mark.parametrize('sql, reason', [
+    ("DELETE FROM inventory", "only SELECT queries are allowed"),
+    ("UPDATE inventory SET stock = 0", "only SELECT queries are allowed"),
+    ("DROP TABLE inventory", "only SELECT queries are allowed"),
+    ("PRAGMA writable_schema = 1", "only SELECT queries are allowed"),
+    ("ATTACH DATABASE 'other.db' AS other", "only SELECT queries are allowed"),
+    ("/* select */ INSERT INTO inventory (item_name) VALUES ('x')", "only SELECT queries are allowed"),
+    ("SELECT 1; DELETE FROM inventory", "only one statement at a time"),
+    ("SELECT 1; ATTACH DATABASE 'other.db' AS other", "only one statement at a time"),
+    ("WITH gone AS (SELECT id FROM inventory) DELETE FROM inventory WHERE id IN gone",
+     "the query does more than read data"),
+    ("SELECT load_extension('evil')", "the query does more than read data"),
+    ("SELECT * FROM pragma_table_info('inventory')", "the query does more than read data"),
+])
+def test_anything_but_a_read_is_refused(db, guard, sql, reason):
+    with pytest.raises(UnsafeQuery, match=reason):
+        guard.run(sql)
+    assert guard.refused == 1
+    assert db.fetchone("SELECT COUNT(*) FROM inventory")[0] == 20
+
+
+def test_reads_run(guard):
+    rows, truncated = guard.run("  select item_name from inventory where id = 3;  ")
+    assert ([row['item_name'] for row in rows], truncated) == (['Llave 2'], False)
+    rows, _ = guard.run("SELECT i.item_name FROM inventory_fts JOIN inventory i ON i.id = inventory_fts.rowid "
+                        "WHERE inventory_fts MATCH 'llave' LIMIT 1")
+    assert len(rows) == 1
+
+
+def test_row_cap(db):
+    guard = SQLGuard(max_rows=50)
+    rows, truncated = guard.run(COUNT_TO.format(100000))
+    assert (len(rows), truncated) == (50, True)
+    rows, truncated = guard.run(COUNT_TO.format(50))
+    assert (len(rows), truncated) == (50, False)
+
+
+def test_time_budget(db):
+    guard = SQLGuard(time_budget=0.05)
+    with pytest.raises(UnsafeQuery, match="longer than 0.05s"):
+        guard.run("SELECT COUNT(*) FROM (" + COUNT_TO.format(10 ** 9) + ")")
+    assert guard.interrupted == 1
+
+
+def test_large_scans_and_cross_joins(guard):
+    guard.large_table_rows = 10
+    with pytest.raises(UnsafeQuery, match="full scan of inventory"):
+        guard.run("SELECT * FROM inventory WHERE notes = 'x'")
+    with pytest.raises(UnsafeQuery, match="cross join"):
+        guard.run("SELECT a.id FROM inventory a, employees b WHERE a.id = 1 OR b.id = 1")
+    # Indexed lookups stay allowed
+    rows, _ = guard.run("SELECT * FROM inventory WHERE id = 1")
+    assert len(rows) == 1
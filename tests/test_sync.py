@@ -0,0 +1,108 @@
+# tests/test_sync.py - Delta catalog sync: changes only, resumable runs, missing items
+import pytest
+
+from core.checkout import CheckoutManager
+from core.sync import CatalogSync
+
+CATALOG = [
+    ['BH-13', 'Llave combinacion 13mm', 'Llaves', 'Bahco', '3', ''],
+    ['BH-14', 'Llave combinacion 14mm', 'Llaves', 'Bahco', '2', ''],
+    ['BS-1', 'Taladro', '', 'Bosch', '1', ''],
+    ['', 'Martillo de bola', '', 'Stanley', '2', ''],
+    ['', 'Nivel', '', '', '1', ''],
+]
+
+
+def inventory(db):
+    return {row['item_name']: (row['stock'], row['discontinued'] is not None) for row in db.fetchall(
+        "SELECT item_name, stock, discontinued FROM inventory"
+    )}
+
+
+def counts(summary):
+    return summary['inserted'], summary['updated'], summary['unchanged']
+
+
+def test_second_sync_writes_only_changes(db):
+    sync = CatalogSync(db, chunk_size=2)
+    assert counts(sync.sync_rows(CATALOG)) == (5, 0, 0)
+
+    changed = [row[:] for row in CATALOG]
+    changed[1][4] = '5'
+    changed[3][5] = 'mango fibra'
+    summary = sync.sync_rows(changed)
+    assert counts(summary) == (0, 2, 3)
+    assert (summary['unkeyed'], summary['missing']) == (2, 0)
+    assert inventory(db)['Llave combinacion 14mm'] == (5, False)
+    assert db.fetchone("SELECT notes FROM inventory WHERE item_name = 'Martillo de bola'")[0] == \
+        'mango fibra'
+
+
+def test_local_edits_stand_until_the_supplier_row_changes(db):
+    sync = CatalogSync(db)
+    sync.sync_rows(CATALOG)
+    db.execute("UPDATE inventory SET stock = 9, available = 9 WHERE item_id = 'BS-1'")
+
+    assert counts(sync.sync_rows(CATALOG)) == (0, 0, 5)
+    assert inventory(db)['Taladro'] == (9, False)
+
+
+def test_interrupted_run_resumes_after_its_last_chunk(db):
+    def failing(rows, after):
+        for number, row in enumerate(rows):
+            if number == after:
+                raise OSError("disk went away")
+            yield row
+
+    sync = CatalogSync(db, chunk_size=2)
+    with pytest.raises(OSError):
+        sync.sync_rows(failing(CATALOG, 3), source='catalog.csv', fingerprint='v1')
+    assert len(inventory(db)) == 2
+
+    summary = sync.sync_rows(CATALOG, source='catalog.csv', fingerprint='v1')
+    assert summary['resumed'] == 2
+    assert counts(summary) == (5, 0, 0)
+    assert len(inventory(db)) == 5
+    # Finished: the same file again is a new run
+    assert sync.sync_rows(CATALOG, source='catalog.csv', fingerprint='v1')['resumed'] == 0
+
+
+@pytest.mark.parametrize('missing', ['keep', 'discontinue', 'delete'])
+def test_missing_items_with_and_without_catalog_id(db, missing):
+    CatalogSync(db).sync_rows(CATALOG)
+    # Taladro (BS-1) and Nivel (no Catalog ID) have been checked out
+    for item_id in (3, 5):
+        assert CheckoutManager(db).checkout_item(item_id, 'Ana Perez', 1)[0]
+
+    summary = CatalogSync(db, missing=missing).sync_rows([CATALOG[0], CATALOG[3]])
+    assert summary['missing'] == 3
+    items = inventory(db)
+    if missing == 'keep':
+        assert (summary['discontinued'], summary['deleted']) == (0, 0)
+        assert not any(discontinued for _, discontinued in items.values())
+    elif missing == 'discontinue':
+        assert (summary['discontinued'], summary['deleted']) == (3, 0)
+        assert sorted(name for name, (_, discontinued) in items.items() if discontinued) == \
+            ['Llave combinacion 14mm', 'Nivel', 'Taladro']
+    else:
+        # Checked-out items keep their history
+        assert (summary['discontinued'], summary['deleted']) == (2, 1)
+        assert items == {'Llave combinacion 13mm': (3, False), 'Taladro': (1, True),
+                         'Martillo de bola': (2, False), 'Nivel': (1, True)}
+
+
+def test_discontinued_items_come_back_when_listed_again(db):
+    sync = CatalogSync(db, missing='discontinue')
+    sync.sync_rows(CATALOG)
+    sync.sync_rows(CATALOG[:1])
+    assert sum(discontinued for _, discontinued in inventory(db).values()) == 4
+
+    assert counts(sync.sync_rows(CATALOG)) == (0, 4, 1)
+    assert not any(discontinued for _, discontinued in inventory(db).values())
+
+
+def test_file_without_catalog_ids_leaves_keyed_items(db):
+    CatalogSync(db, missing='discontinue').sync_rows(CATALOG)
+    summary = CatalogSync(db, missing='discontinue').sync_rows(CATALOG[3:4])
+    assert summary['discontinued'] == 1
+    assert [name for name, (_, discontinued) in inventory(db).items() if discontinued] == ['Nivel']
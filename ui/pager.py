@@ -0,0 +1,52 @@
+# ui/pager.py - Page through keyset-paginated results in the terminal
+import sys
+
+
+def page_results(fetch_page, show_page, interactive=None):
+    """Show results one page at a time with next/prev navigation.
+
+    fetch_page(after) returns (rows, next_after) like the managers'
+    *_page methods; show_page(rows, page_number) prints one page. When stdin
+    isn't a terminal every page is printed in turn without prompting, still
+    holding only one page in memory. Returns False if there were no rows.
+    """
+    if interactive is None:
+        interactive = sys.stdin.isatty()
+
+    # `after` key that starts each page visited so far, for going back
+    starts = [None]
+    page = 0
+    shown = 0
+
+    while True:
+        rows, next_after = fetch_page(starts[page])
+        if not rows:
+            return page + shown > 0
+        show_page(rows, page + shown + 1)
+
+        if not interactive:
+            if next_after is None:
+                return True
+            # Only the current position is needed when streaming
+            starts = [next_after]
+            shown += 1
+            continue
+
+        options = []
+        if next_after is not None:
+            options.append("[n]ext")
+        if page > 0:
+            options.append("[p]rev")
+        if not options:
+            return True
+        options.append("[q]uit")
+
+        choice = input(f"Page {page + 1} - " + " ".join(options) + ": ").strip().lower()
+        if choice in ('', 'n', 'next') and next_after is not None:
+            del starts[page + 1:]
+            starts.append(next_after)
+            page += 1
+        elif choice in ('p', 'prev') and page > 0:
+            page -= 1
+        elif choice in ('', 'q', 'quit'):
+            return True
@@ -0,0 +1,16 @@
+# utils/text.py - Text normalization shared by lookups and indexes
+import re
+import unicodedata
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def strip_accents(text):
+    """Remove diacritics: "Martínez" -> "Martinez", "Ñandú" -> "Nandu" """
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def normalize_name(text):
+    """Case-, accent- and spacing-insensitive key for names"""
+    return _WHITESPACE.sub(' ', strip_accents(text or '')).strip().casefold()
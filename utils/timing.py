@@ -0,0 +1,54 @@
+# utils/timing.py - Startup timing breakdown for --startup-profile
+import threading
+import time
+
+
+class StartupProfile:
+    """Records how long each startup step took.
+
+    mark() closes the current step on the main thread. Work done on
+    background threads is recorded with add() and reported separately,
+    since it doesn't hold up the prompt.
+    """
+
+    def __init__(self, started=None, enabled=True):
+        self.started = started or time.perf_counter()
+        self.enabled = enabled
+        self.steps = []
+        self.background = []
+        self._last = self.started
+        self._lock = threading.Lock()
+
+    def mark(self, label):
+        """End the current foreground step"""
+        now = time.perf_counter()
+        self.steps.append((label, now - self._last))
+        self._last = now
+
+    def add(self, label, seconds):
+        """Record a step that ran off the main thread"""
+        with self._lock:
+            self.background.append((label, seconds))
+
+    def elapsed(self):
+        """Seconds since startup began"""
+        return time.perf_counter() - self.started
+
+    def report(self):
+        """Print the foreground breakdown (and any background steps so far)"""
+        if not self.enabled:
+            return
+        print("\n⏱️  STARTUP PROFILE:")
+        for label, seconds in self.steps:
+            print(f"  {label:<24} {seconds * 1000:>8.1f} ms")
+        print(f"  {'total':<24} {(self._last - self.started) * 1000:>8.1f} ms")
+        self.report_background()
+
+    def report_background(self):
+        """Print background steps recorded since the last report"""
+        if not self.enabled:
+            return
+        with self._lock:
+            background, self.background = self.background, []
+        for label, seconds in background:
+            print(f"  {label + ' (background)':<24} {seconds * 1000:>8.1f} ms")